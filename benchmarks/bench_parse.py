@@ -0,0 +1,121 @@
+"""
+Benchmark of "AbsorpPlot.dat" parsing: compares `gleipnir.core.parser` with
+the previous pure Python implementation on synthetic files (see
+`generate.py`).
+
+Usage:
+    python benchmarks/bench_parse.py [--sizes 500 1000 2000] [--format %.6f]
+                                     [--memory] [--workers N]
+
+With `--memory` peak RSS increase (over the interpreter with imported
+modules) of every reader is measured in a separate process (POSIX only).
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import gleipnir.core.parser as parser
+from generate import write_file
+
+
+def legacy_read(file_path):
+    f = open(file_path, "r")
+    f_list = f.read().split("\n")
+    f.close()
+    nR = int(f_list[0].split(" ")[-1])
+    nZ = int(f_list[1].split(" ")[-1])
+    AbsPlot = np.array([float(i) for i in f_list[-2].split(" ")[:-1]])
+    AbsPlot = AbsPlot[::-1].reshape(nR + 1, nZ + 1).T
+    AbsPlot[AbsPlot == 0] = None
+    return AbsPlot
+
+
+def best_time(function, *args, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def peak_rss(reader, file_path):
+    """
+    Returns peak RSS increase (MB) of `reader` (function name) in a new
+    process.
+    """
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_peak_rss, (reader, file_path))
+
+
+def _peak_rss(reader, file_path):
+    function = (legacy_read if reader == "legacy"
+                else parser.read_absorp_plot)
+    before = _max_rss()
+    data = function(file_path)
+    return (_max_rss() - before) / 2**20
+
+
+def _max_rss():
+    """
+    Returns peak RSS (bytes) of the current process.
+    """
+    try:
+        # unlike ru_maxrss, it isn't inherited from the parent process
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 2**10
+    except OSError:
+        pass
+    import resource
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 2**10
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    argument_parser.add_argument("--sizes", type=int, nargs="+",
+                                 default=[500, 1000, 2000])
+    argument_parser.add_argument("--format", default="%.6f")
+    argument_parser.add_argument("--memory", action="store_true")
+    argument_parser.add_argument("--workers", type=int, default=None,
+                                 help="parser threads (default: CPU count)")
+    args = argument_parser.parse_args()
+
+    print(f"{'size':>6} {'MB':>8} {'legacy, s':>10} {'parser, s':>10} "
+          f"{'MB/s':>8} {'speedup':>8}"
+          + (f" {'array MB':>9} {'legacy RSS':>11} {'parser RSS':>11}"
+             if args.memory else ""))
+    with tempfile.TemporaryDirectory() as directory:
+        for n in args.sizes:
+            file_path = os.path.join(directory, f"AbsorpPlot_{n}.dat")
+            write_file(file_path, n, args.format)
+            megabytes = os.path.getsize(file_path) / 2**20
+
+            legacy_time, expected = best_time(legacy_read, file_path)
+            parser_time, data = best_time(parser.read_absorp_plot, file_path,
+                                          None, None, args.workers)
+            assert np.array_equal(expected, data["AbsPlot"], equal_nan=True)
+
+            line = (f"{n:>6} {megabytes:>8.1f} {legacy_time:>10.3f} "
+                    f"{parser_time:>10.3f} {megabytes / parser_time:>8.0f} "
+                    f"{legacy_time / parser_time:>7.1f}x")
+            if args.memory:
+                line += (f" {data['AbsPlot'].nbytes / 2**20:>9.1f}"
+                         f" {peak_rss('legacy', file_path):>11.1f}"
+                         f" {peak_rss('parser', file_path):>11.1f}")
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
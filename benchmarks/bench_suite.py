@@ -0,0 +1,233 @@
+"""
+Benchmark suite of the main data paths on synthetic files (see
+`generate.py`): parsing, the first render and property change redraws of
+`PlotWidget` and image export (`Model.data_write`).
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_suite.py
+        [--sizes 100 500 1000 2000] [--repeat 5] [--no-memory]
+        [--output results.json] [--compare baseline.json]
+
+Results are saved as JSON (by default to `benchmarks/results/`) with Python
+and library versions and git commit, `--compare` prints the ratios to a
+previous run (ratio > 1 is slower, regressions over 10% are marked with "!").
+
+Measured for every grid size:
+    parse_s, parse_mb_s - `parser.read_absorp_plot` time and throughput;
+    cached_read_s - `DataCache.read` of a cached file;
+    peak_rss_mb - peak RSS increase of parsing (in a new process);
+    first_render_s - `PlotWidget.setData` and redraw of a new widget;
+    redraw_s - median redraw latency after a property change;
+    export_s, export_mb_s - `Model.data_write` PNG time and written MB/s;
+    raw_export_s - the same for raw image export (`is_raw_export`).
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import matplotlib
+import numpy as np
+from PyQt6.QtCore import PYQT_VERSION_STR
+from PyQt6.QtWidgets import QApplication
+
+# sets Qt backend of Matplotlib, so it's imported before pyplot (by Model)
+from gleipnir.ui.plot_widget.view import PlotWidget
+
+from bench_parse import best_time
+from bench_parse import peak_rss
+import gleipnir.core.cache as cache
+import gleipnir.core.parser as parser
+from gleipnir.model.model import Model
+from generate import write_file
+
+
+DEFAULT_SIZES = [100, 500, 1000, 2000]
+REGRESSION_THRESHOLD = 1.1
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "results")
+
+# Property changes of the redraw benchmark: setter name, alternating values.
+PROPERTY_CHANGES = (
+    ("setColormap", ("viridis", "magma")),
+    ("setIsCenterLinesDisplayed", (False, True)),
+    ("setTitle", ("Absorption", "Absorption map")),
+    ("setVMax", (0.5, 0.8)),
+)
+
+
+def bench_export(data, directory, repeat):
+    model = Model()
+    model.data_loaded(model.input_file.value, data)
+    file_path = os.path.join(directory, "export.png")
+    seconds, _ = best_time(model.data_write, file_path, repeat=repeat)
+    megabytes = os.path.getsize(file_path) / 2**20
+    model.is_raw_export = True
+    raw_seconds, _ = best_time(model.data_write, file_path, repeat=repeat)
+    return {"export_s": seconds, "export_mb_s": megabytes / seconds,
+            "raw_export_s": raw_seconds}
+
+
+def bench_parse(file_path, directory, repeat, memory):
+    seconds, data = best_time(parser.read_absorp_plot, file_path,
+                              repeat=repeat)
+    megabytes = os.path.getsize(file_path) / 2**20
+    data_cache = cache.DataCache(os.path.join(directory, "cache"))
+    data_cache.read(file_path) # stores the entry
+    result = {
+        "parse_s": seconds,
+        "parse_mb_s": megabytes / seconds,
+        "cached_read_s": best_time(data_cache.read, file_path,
+                                   repeat=repeat)[0]}
+    if memory:
+        result["peak_rss_mb"] = peak_rss("parser", file_path)
+    return result, data
+
+
+def bench_render(data, repeat):
+    first_render = []
+    for _ in range(repeat):
+        widget = PlotWidget()
+        start = time.perf_counter()
+        widget.setData(data)
+        _flush(widget)
+        first_render.append(time.perf_counter() - start)
+        widget.deleteLater()
+
+    redraw = {}
+    for setter, values in PROPERTY_CHANGES:
+        times = []
+        for i in range(2 * repeat):
+            start = time.perf_counter()
+            getattr(widget, setter)(values[i % 2])
+            _flush(widget)
+            times.append(time.perf_counter() - start)
+        redraw[setter] = statistics.median(times)
+    return {"first_render_s": min(first_render), "redraw_s": redraw}
+
+
+def compare(results, baseline):
+    """
+    Prints ratios of `results` metrics to `baseline` ones.
+    """
+    current = _flatten(results["results"])
+    previous = _flatten(baseline["results"])
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'} "
+          f"({baseline['meta'].get('date', '?')}):")
+    print(f"{'metric':<40} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, value in current.items():
+        if name not in previous or not previous[name]:
+            continue
+        # throughputs are better when they are bigger
+        ratio = (previous[name] / value if name.endswith("_mb_s")
+                 else value / previous[name])
+        mark = " !" if ratio > REGRESSION_THRESHOLD else ""
+        print(f"{name:<40} {previous[name]:>10.4g} {value:>10.4g} "
+              f"{ratio:>6.2f}x{mark}")
+
+
+def meta():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+            text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "pyqt": PYQT_VERSION_STR}
+
+
+def run(sizes, repeat, memory):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for n in sizes:
+            file_path = os.path.join(directory, f"AbsorpPlot_{n}.dat")
+            write_file(file_path, n)
+            result, data = bench_parse(file_path, directory, repeat, memory)
+            result.update(bench_render(data, repeat))
+            result.update(bench_export(data, directory, repeat))
+            results[str(n)] = result
+            os.remove(file_path)
+            _print(n, result)
+    return results
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(
+        description=__doc__.split("\n")[1])
+    argument_parser.add_argument("--sizes", type=int, nargs="+",
+                                 default=DEFAULT_SIZES,
+                                 help="grid sizes (from 100 to 5000)")
+    argument_parser.add_argument("--repeat", type=int, default=5)
+    argument_parser.add_argument("--no-memory", action="store_true",
+                                 help="don't measure peak memory")
+    argument_parser.add_argument("--output",
+                                 help="results file (default: "
+                                      "benchmarks/results/<date>.json)")
+    argument_parser.add_argument("--compare",
+                                 help="results file of a previous run")
+    args = argument_parser.parse_args()
+
+    app = QApplication(sys.argv)
+    results = {"meta": meta(),
+               "results": run(args.sizes, args.repeat, not args.no_memory)}
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.datetime.now().strftime(
+            "%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults: {output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(results, json.load(f))
+
+
+def _flatten(results, prefix=""):
+    flat = {}
+    for name, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{name}."))
+        else:
+            flat[prefix + name] = value
+    return flat
+
+
+def _flush(widget):
+    """
+    Processes events until the scheduled redraw of `widget` is done.
+    """
+    redraws = widget.redraws
+    while widget.redraws == redraws:
+        QApplication.processEvents()
+
+
+def _print(n, result):
+    print(f"{n}:")
+    for name, value in _flatten(result).items():
+        print(f"    {name:<36} {value:.4g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Generator of synthetic "AbsorpPlot.dat" files for benchmarks.
+
+Maps look like the simulated ones: a smooth absorption profile of an
+envelope around the center with noise, zero values (no absorption) outside of
+it. Files of big grids are formatted with NumPy, so a 5000 x 5000 map is
+written in seconds.
+
+Usage:
+    python benchmarks/generate.py [--channels N] [--format %.6f]
+                                  output_dir sizes...
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import argparse
+import os
+import re
+
+import numpy as np
+
+import gleipnir.core.parser as parser
+
+
+DEFAULT_FORMAT = "%.6f"
+
+
+def format_values(values, fmt=DEFAULT_FORMAT):
+    """
+    Returns `values` formatted with `fmt` and separated by spaces (bytes).
+    Fixed point formats of values from 0 to 1 are formatted with vectorized
+    operations.
+    """
+    match = re.fullmatch(r"%\.(\d+)f", fmt)
+    if (match is None or int(match[1]) == 0 or values.min() < 0
+            or np.round(values.max(), int(match[1])) >= 1):
+        return (" ".join(fmt % v for v in values) + " ").encode()
+
+    decimals = int(match[1])
+    digits = np.round(values * 10**decimals).astype(np.int64)
+    chars = np.empty((values.size, decimals + 3), dtype=np.uint8)
+    chars[:, 0] = ord("0")
+    chars[:, 1] = ord(".")
+    for i in range(decimals, 0, -1):
+        digits, digit = np.divmod(digits, 10)
+        chars[:, 1 + i] = ord("0") + digit
+    chars[:, -1] = ord(" ")
+    return chars.tobytes()
+
+
+def make_map(n, seed=0):
+    """
+    Returns synthetic (n + 1) x (n + 1) absorption map in file order.
+    """
+    rng = np.random.default_rng(seed)
+    r = np.linspace(-1, 1, n + 1)
+    rr = r[:, None]**2 + r[None, :]**2
+    values = 0.8 * np.exp(-4 * rr) * (1 + 0.1 * rng.standard_normal(rr.shape))
+    values = np.clip(values, 0, 0.99)
+    values[(rr > 0.8) | (values < 0.01)] = 0
+    return values.ravel()
+
+
+def write_file(file_path, n, fmt=DEFAULT_FORMAT, channels=1, seed=0):
+    """
+    Writes synthetic file of n x n grid (`channels` velocity channels, maps
+    of all channels are written if it's greater than 1).
+    """
+    header = (n, n, 0.1, 0.1, -5, -5, -100, -100 + 10 * (channels - 1), 10,
+              90, 1, 1)
+    with open(file_path, "wb") as f:
+        for name, value in zip(parser.HEADER, header):
+            f.write(f"{name} {value}\n".encode())
+        f.write(b"arrays\nAbsPlot\n")
+        for channel in range(channels):
+            f.write(format_values(make_map(n, seed + channel), fmt))
+        f.write(b"\n")
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(
+        description=__doc__.split("\n")[1])
+    argument_parser.add_argument("output_dir")
+    argument_parser.add_argument("sizes", type=int, nargs="+",
+                                 help="grid sizes, e.g. 100 1000 5000")
+    argument_parser.add_argument("--channels", type=int, default=1)
+    argument_parser.add_argument("--format", default=DEFAULT_FORMAT)
+    args = argument_parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for n in args.sizes:
+        file_path = os.path.join(args.output_dir, f"AbsorpPlot_{n}.dat")
+        write_file(file_path, n, args.format, args.channels)
+        print(f"{file_path} {os.path.getsize(file_path) / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
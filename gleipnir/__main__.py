@@ -19,6 +19,23 @@ Compatible file format for parsing (commonly named as "AbsorpPlot.dat"):
     <float values from 0.0 to 1.0 with size (nR + 1) x (nZ + 1),
      each value separated by space>
     <empty string>
+"AbsPlot" section can also contain a map for every velocity channel (from V1
+to V2 with dV step), one after another.
+
+Data files can be also rendered to images without GUI (see
+utils/render.py):
+    python -m gleipnir render [-s style.json] [-o output_dir] files...
+Animations of velocity channels or of file sequences (see
+utils/animation.py):
+    python -m gleipnir animate [-s style.json] -o movie.gif files...
+
+Timings of application stages are shown in the status bar, they can be also
+written to a trace file and an action can be profiled (see
+utils/instrumentation.py):
+    python -m gleipnir [--trace trace.jsonl] [--profile TIMER]
+Startup time (from `main` to the first paint and the first plot draw) is
+printed with:
+    python -m gleipnir --benchmark-startup
 
 Development notes:
     Application architecture based on "MVP Passive View" pattern with some
@@ -34,24 +51,74 @@ License: GPLv3
 Repository: https://github.com/deverte/gleipnir
 """
 
+import argparse
+import os
 import sys
+import time
 
-from PyQt6.QtWidgets import QApplication
-
-import gleipnir.ui.presenter as presenter
-import gleipnir.ui.view as view
-import gleipnir.model.model as model
+import gleipnir.utils.instrumentation as instrumentation
 
 
 def main():
-    app = QApplication(sys.argv)
+    start = time.perf_counter()
+
+    # headless rendering doesn't import Qt
+    if len(sys.argv) > 1 and sys.argv[1] == "render":
+        import gleipnir.utils.render as render
+        sys.exit(render.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "animate":
+        import gleipnir.utils.animation as animation
+        sys.exit(animation.main(sys.argv[2:]))
+
+    argument_parser = argparse.ArgumentParser(prog="gleipnir")
+    argument_parser.add_argument(
+        "--trace", default=os.environ.get("GLEIPNIR_TRACE"),
+        help="append timers of application stages to JSON lines file")
+    argument_parser.add_argument(
+        "--profile", default=os.environ.get("GLEIPNIR_PROFILE"),
+        metavar="TIMER",
+        help="profile the first action of the timer with cProfile (e.g. "
+             "load, parse, draw, export)")
+    argument_parser.add_argument(
+        "--benchmark-startup", action="store_true",
+        help="print time to the first paint of the window and to the first "
+             "plot draw, then quit")
+    args, qt_args = argument_parser.parse_known_args()
+    instrumentation.configure(args.trace, args.profile)
+
+    from PyQt6.QtWidgets import QApplication
+
+    import gleipnir.ui.presenter as presenter
+    import gleipnir.ui.view as view
+    import gleipnir.model.model as model
+
+    app = QApplication(sys.argv[:1] + qt_args)
 
     app_model = model.Model()
     app_view = view.MainWindowView()
     app_presenter = presenter.MainWindowPresenter(app_model, app_view)
+    if args.benchmark_startup:
+        _benchmark_startup(app, app_view, start)
 
     sys.exit(app.exec())
 
 
+def _benchmark_startup(app, window, start):
+    times = {}
+
+    def on_drawn():
+        times["first plot draw"] = time.perf_counter() - start
+        for name, seconds in times.items():
+            print(f"{name}: {seconds:.3f} s")
+        app.quit()
+
+    def on_painted():
+        times["first paint"] = time.perf_counter() - start
+
+    window.painted.connect(on_painted)
+    window.plotWidgetCreated.connect(
+        lambda : window.plotWidget.drawn.connect(on_drawn))
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
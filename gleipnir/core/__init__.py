@@ -0,0 +1,27 @@
+"""
+Core is a package of data processing and rendering that doesn't depend on Qt,
+so it can be used on computing nodes without GUI and display:
+    import gleipnir.core
+
+    data = gleipnir.core.load("AbsorpPlot.dat")
+    gleipnir.core.render(data, "style.json", "AbsorpPlot.png")
+
+The application (`gleipnir/model`, `gleipnir/ui`) is a GUI on top of it.
+Modules:
+    dataset - data container with cached coordinate axes and statistics;
+    parser, cache, channels - reading of data files;
+    style - plot style properties;
+    plotter, pyramid - drawing of data on Matplotlib figures;
+    colormaps, raster - colormaps and raw image export;
+    histogram, profiles - histogram of values and profiles of the disk.
+Matplotlib is imported only when figures are drawn (or colormaps are used).
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+from gleipnir.core.api import load
+from gleipnir.core.api import render
+from gleipnir.core.dataset import Dataset
+from gleipnir.core.style import DEFAULT_STYLE
+from gleipnir.core.style import load_style
@@ -0,0 +1,61 @@
+"""
+API is a module with the main functions of the core library: loading of data
+files and rendering of data to images.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import os
+
+import gleipnir.core.cache as cache
+from gleipnir.core.dataset import Dataset
+import gleipnir.core.parser as parser
+import gleipnir.core.raster as raster
+from gleipnir.core.style import load_style
+
+
+def load(file_path, use_cache=True, progress=None, dtype=None, workers=None):
+    """
+    Returns `Dataset` of "AbsorpPlot.dat" file `file_path` (header
+    parameters and "AbsPlot" array, and "Channels" array for velocity
+    channels, see `gleipnir/core/dataset.py`). The file is read through the
+    binary cache (see `gleipnir/core/cache.py`) if `use_cache` is enabled.
+    `dtype` converts arrays (e.g. `np.float32` halves memory).
+    `progress(stage, done, total)` is called while the file is read.
+    `workers` is the number of parser threads (see `parser.read_absorp_plot`).
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(file_path)
+    if use_cache:
+        data = cache.read(file_path, progress, workers=workers)
+    else:
+        data = parser.read_absorp_plot(file_path, progress, workers=workers)
+    return data.astype(dtype) if dtype else data
+
+
+def render(data, style, file_path, raw=False, view=None):
+    """
+    Renders `data` (`Dataset`, dict or path of data file) with `style` (dict of
+    style properties, path of JSON style config or None for defaults, see
+    `DEFAULT_STYLE`) to image `file_path`. `raw` writes only the colormapped
+    image at grid resolution (see `gleipnir/core/raster.py`), `view` is the
+    visible area of the plot (see `Plotter.set_view`).
+    """
+    if isinstance(data, dict):
+        data = Dataset.from_dict(data)
+    elif not isinstance(data, Dataset):
+        data = load(data)
+    style = load_style(style)
+    if raw:
+        raster.write_raster(file_path, data, style["colormap"],
+                            style["v_min"], style["v_max"])
+        return
+    # Matplotlib is imported only for rendering of figures
+    from gleipnir.core.plotter import Plotter
+
+    plotter = Plotter.offscreen(style)
+    plotter.set_data(data)
+    if view:
+        plotter.set_view(*view)
+    plotter.save(file_path, style["dpi"], style["is_background_transparent"])
@@ -0,0 +1,262 @@
+"""
+Cache is a module for storing parsed data files in a binary form, so the same
+file is parsed only once.
+
+Every cached file is stored as two files inside cache directory (by default
+`$XDG_CACHE_HOME/gleipnir/data`, can be changed with `GLEIPNIR_CACHE_DIR`
+environment variable, empty value disables cache):
+    <key>.npy - "AbsPlot" array or 3D "Channels" array of velocity channel
+    maps (opened as a memory map, so channels are read lazily);
+    <key>.json - header parameters and source file path, size and mtime (and
+    optional content hash).
+Key is a hash of the absolute source file path. Entries are validated by
+source file size and mtime (and content hash if `verify_hash` is enabled,
+`GLEIPNIR_CACHE_VERIFY_HASH=1` enables it for the default cache) and evicted
+in least recently used order when cache size exceeds `max_size`.
+Cache directory also keeps "colormaps.txt" with colormap names and
+"colormap_thumbnails.npz" (see `gleipnir/core/colormaps.py`).
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from gleipnir.core.dataset import Dataset
+import gleipnir.core.parser as parser
+import gleipnir.utils.instrumentation as instrumentation
+
+
+DEFAULT_MAX_SIZE = 1 << 30 # 1 GiB
+VERSION = 1
+
+_default_cache = None
+
+
+class DataCache:
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE,
+                 verify_hash=False):
+        self.directory = directory
+        self.max_size = max_size
+        self.verify_hash = verify_hash
+
+
+    def clear(self):
+        for name in self._entries():
+            self._remove(name)
+
+
+    @instrumentation.timed("cache.get")
+    def get(self, file_path):
+        """
+        Returns cached `Dataset` of `file_path` (arrays are memory maps) or
+        None if there is no valid cache entry.
+        """
+        key = self._key(file_path)
+        try:
+            with open(self._path(key, ".json"), "r") as f:
+                meta = json.load(f)
+            stat = os.stat(file_path)
+            if (meta["version"] != VERSION or meta["size"] != stat.st_size
+                    or meta["mtime_ns"] != stat.st_mtime_ns):
+                return None
+            if self.verify_hash and meta.get("hash") != _file_hash(file_path):
+                return None
+            array = np.load(self._path(key, ".npy"), mmap_mode="r")
+            os.utime(self._path(key, ".json")) # mark as recently used
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if array.ndim == 3:
+            return Dataset(meta["header"], array[0], array)
+        return Dataset(meta["header"], array)
+
+
+    def put(self, file_path, data, stat=None):
+        """
+        Stores `Dataset` `data` of `file_path`. Errors are ignored (cache is optional).
+        `stat` is `os.stat` of the file taken before it was read, nothing is
+        stored if the file is changed since then (e.g. it's being written).
+        """
+        key = self._key(file_path)
+        tmp_path = None
+        try:
+            current_stat = os.stat(file_path)
+            if stat is None:
+                stat = current_stat
+            elif ((stat.st_size, stat.st_mtime_ns)
+                  != (current_stat.st_size, current_stat.st_mtime_ns)):
+                return
+            meta = {
+                "version": VERSION,
+                "path": os.path.abspath(file_path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "header": data.header}
+            if self.verify_hash:
+                meta["hash"] = _file_hash(file_path)
+
+            os.makedirs(self.directory, exist_ok=True)
+            array = (data.abs_plot if data.channels is None
+                     else data.channels)
+            for ext, write in ((".npy", lambda f: np.save(f, array)),
+                               (".json", lambda f: f.write(
+                                   json.dumps(meta).encode()))):
+                tmp_path = self._path(key, ext + f".{os.getpid()}.tmp")
+                with open(tmp_path, "wb") as f:
+                    write(f)
+                os.replace(tmp_path, self._path(key, ext))
+                tmp_path = None
+            self._evict()
+        except OSError:
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+
+    def read(self, file_path, progress=None, is_cancelled=None, workers=None):
+        """
+        Returns data of `file_path` from cache or reads it with
+        `parser.read_absorp_plot` (with `workers` threads) and stores the
+        result.
+        """
+        data = self.get(file_path)
+        if data is None:
+            # the file can be changed while it's parsed (e.g. by a running
+            # simulation), the entry is stored only for the parsed version
+            stat = os.stat(file_path)
+            data = parser.read_absorp_plot(file_path, progress, is_cancelled,
+                                           workers)
+            self.put(file_path, data, stat)
+            if data.channels is not None:
+                # use memory map of the stored cube instead of parsed one
+                data = self.get(file_path) or data
+        return data
+
+
+    def _entries(self):
+        """
+        Returns list of entry keys, sorted from the least recently used.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        keys = [name[:-5] for name in names if name.endswith(".json")]
+        return sorted(keys, key=lambda key: _mtime(self._path(key, ".json")))
+
+
+    def _evict(self):
+        entries = self._entries()
+        sizes = [sum(_size(self._path(key, ext)) for ext in (".npy", ".json"))
+                 for key in entries]
+        total = sum(sizes)
+        for key, size in zip(entries, sizes):
+            if total <= self.max_size:
+                break
+            self._remove(key)
+            total -= size
+
+
+    def _key(self, file_path):
+        return hashlib.sha1(
+            os.path.abspath(file_path).encode(errors="surrogateescape")
+        ).hexdigest()
+
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, key + ext)
+
+
+    def _remove(self, key):
+        for ext in (".json", ".npy"):
+            try:
+                os.remove(self._path(key, ext))
+            except OSError:
+                pass
+
+
+def cache_directory():
+    directory = os.environ.get("GLEIPNIR_CACHE_DIR")
+    if directory is not None:
+        return directory
+    xdg_cache_home = (os.environ.get("XDG_CACHE_HOME")
+                      or os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(xdg_cache_home, "gleipnir", "data")
+
+
+def colormap_thumbnails_file():
+    """
+    Returns path of the colormap thumbnails cache (see
+    `colormaps.ThumbnailCache`) or None if cache is disabled.
+    """
+    return _cache_file("colormap_thumbnails.npz")
+
+
+def colormaps_file():
+    """
+    Returns path of the colormap names cache (see `colormaps.colormap_names`)
+    or None if cache is disabled.
+    """
+    return _cache_file("colormaps.txt")
+
+
+def default_cache():
+    """
+    Returns application-wide `DataCache` or None if cache is disabled.
+    """
+    global _default_cache
+    directory = cache_directory()
+    if not directory:
+        return None
+    verify_hash = os.environ.get("GLEIPNIR_CACHE_VERIFY_HASH", "") not in (
+        "", "0")
+    if (_default_cache is None or _default_cache.directory != directory
+            or _default_cache.verify_hash != verify_hash):
+        _default_cache = DataCache(directory, verify_hash=verify_hash)
+    return _default_cache
+
+
+@instrumentation.timed("load")
+def read(file_path, progress=None, is_cancelled=None, workers=None):
+    """
+    Reads `file_path` through the default cache (if it's enabled).
+    """
+    data_cache = default_cache()
+    if data_cache is None:
+        return parser.read_absorp_plot(file_path, progress, is_cancelled,
+                                       workers)
+    return data_cache.read(file_path, progress, is_cancelled, workers)
+
+
+def _cache_file(name):
+    directory = cache_directory()
+    return os.path.join(directory, name) if directory else None
+
+
+def _file_hash(file_path):
+    digest = hashlib.blake2b()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(parser.CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _size(path):
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
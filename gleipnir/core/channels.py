@@ -0,0 +1,96 @@
+"""
+Channels is a module with a cache of velocity channel maps. Cube of channels
+is usually a memory map (see `gleipnir/core/cache.py`), so a channel is read
+from disk only when it's requested. Read ("decoded") channels are kept in
+memory in least recently used order, neighbor channels can be prefetched by a
+background thread, so scrolling through channels doesn't wait for disk.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import collections
+import concurrent.futures
+import threading
+
+import numpy as np
+
+
+DEFAULT_MAX_SIZE = 1 << 28 # 256 MiB
+
+
+class ChannelCache:
+    def __init__(self, channels, max_size=DEFAULT_MAX_SIZE):
+        self.channels = channels
+        self.max_size = max_size
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = {} # index: future
+        self._size = 0
+        self._slices = collections.OrderedDict() # index: channel map
+
+
+    def __len__(self):
+        return len(self.channels)
+
+
+    def get(self, index):
+        """
+        Returns map of channel `index` (waits for prefetching if it's in
+        progress).
+        """
+        with self._lock:
+            if index in self._slices:
+                self._slices.move_to_end(index)
+                return self._slices[index]
+            future = self._pending.get(index)
+        if future:
+            try:
+                return future.result()
+            except concurrent.futures.CancelledError:
+                pass
+        return self._load(index)
+
+
+    def prefetch(self, indices):
+        """
+        Loads channels `indices` (out of range ones are skipped) in a
+        background thread.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    1, thread_name_prefix="ChannelCache")
+            for index in indices:
+                if (0 <= index < len(self.channels)
+                        and index not in self._slices
+                        and index not in self._pending):
+                    self._pending[index] = self._executor.submit(self._load,
+                                                                 index)
+
+
+    def shutdown(self):
+        """
+        Cancels prefetching (doesn't wait for the current channel).
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._pending.clear()
+
+
+    def _load(self, index):
+        array = np.array(self.channels[index]) # reads memory map
+        with self._lock:
+            self._pending.pop(index, None)
+            if index not in self._slices:
+                self._slices[index] = array
+                self._size += array.nbytes
+            self._slices.move_to_end(index)
+            array = self._slices[index]
+            while self._size > self.max_size and len(self._slices) > 1:
+                evicted_index, evicted = self._slices.popitem(last=False)
+                self._size -= evicted.nbytes
+        return array
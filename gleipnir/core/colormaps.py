@@ -0,0 +1,175 @@
+"""
+Colormaps is a module with additional colormaps ("ViewerStandard") and a list
+of colormap names.
+
+Names are needed to fill the colormap list at startup, but importing
+Matplotlib to get them takes most of startup time. So the list can be cached
+in a text file (the first line is a key with Matplotlib and application
+versions, then a name per line) and Matplotlib is imported only when the
+cache is missing or outdated.
+
+Thumbnails of colormaps (`ThumbnailCache`) are rows of colormap LUT colors
+(no figure is drawn), they are made on demand, kept in memory and stored to a
+NumPy .npz file. Full lookup tables (`make_lut`) are used by raw image export
+(see `gleipnir/core/raster.py`).
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import importlib.metadata
+import os
+
+import numpy as np
+
+from gleipnir.__init__ import __version__
+
+
+# Number of colors of a lookup table.
+LUT_SIZE = 256
+
+# Number of colors of a thumbnail.
+THUMBNAIL_WIDTH = 64
+
+
+class ThumbnailCache:
+    def __init__(self, file_path=None, width=THUMBNAIL_WIDTH):
+        self.file_path = file_path
+        self.width = width
+
+        self._is_changed = False
+        self._stored = None # thumbnails of the file
+        self._thumbnails = {} # name: RGBA row
+
+
+    @property
+    def is_changed(self):
+        """
+        Whether there are thumbnails that aren't saved to the file.
+        """
+        return self._is_changed
+
+
+    def get(self, name):
+        """
+        Returns thumbnail of colormap `name`: uint8 RGBA array of `width`
+        colors from the beginning to the end of the colormap.
+        """
+        thumbnail = self._thumbnails.get(name)
+        if thumbnail is None:
+            if self._stored is None:
+                self._stored = self._load()
+            thumbnail = self._stored.get(name)
+            if thumbnail is None:
+                thumbnail = make_thumbnail(name, self.width)
+                self._is_changed = True
+            self._thumbnails[name] = thumbnail
+        return thumbnail
+
+
+    def save(self):
+        """
+        Stores thumbnails to the file (with the ones stored before). Errors
+        are ignored (cache is optional).
+        """
+        if not self.file_path or not self._is_changed:
+            return
+        thumbnails = dict(self._stored or {}, **self._thumbnails)
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            tmp_path = f"{self.file_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, __key__=np.array(_cache_key()), **thumbnails)
+            os.replace(tmp_path, self.file_path)
+            self._stored = thumbnails
+            self._is_changed = False
+        except OSError:
+            pass
+
+
+    def _load(self):
+        if not self.file_path:
+            return {}
+        try:
+            with np.load(self.file_path) as stored:
+                if (str(stored["__key__"]) != _cache_key()
+                        or stored["__key__"].ndim != 0):
+                    return {}
+                return {name: stored[name] for name in stored.files
+                        if name != "__key__"
+                        and stored[name].shape == (self.width, 4)}
+        except (OSError, ValueError, KeyError):
+            return {}
+
+
+def add_viewer_standard_colormap():
+    import matplotlib
+    import matplotlib.colors
+
+    if "ViewerStandard" in matplotlib.colormaps:
+        return
+    # red, yellow, green, cyan, blue
+    colors = [(1, 0, 0), (1, 1, 0), (0, 1, 0), (0, 1, 1), (0, 0, 1)]
+    matplotlib.colormaps.register(matplotlib.colors.LinearSegmentedColormap.from_list("ViewerStandard", colors))
+
+
+def colormap_names(cache_file=None):
+    """
+    Returns sorted list of colormap names (like `pyplot.colormaps()`). The
+    list is read from and stored to `cache_file` if it's specified.
+    """
+    key = _cache_key()
+    if cache_file:
+        try:
+            with open(cache_file, "r") as f:
+                lines = f.read().splitlines()
+            if lines and lines[0] == key and len(lines) > 1:
+                return lines[1:]
+        except OSError:
+            pass
+
+    import matplotlib
+
+    add_viewer_standard_colormap()
+    names = sorted(matplotlib.colormaps)
+    if cache_file:
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write("\n".join([key] + names) + "\n")
+            os.replace(tmp_path, cache_file)
+        except OSError:
+            pass
+    return names
+
+
+def make_lut(name, size=LUT_SIZE):
+    """
+    Returns uint8 RGBA lookup table of colormap `name`: `size` colors of
+    equal parts of [0, 1] range (the colors Matplotlib uses for values of
+    these parts).
+    """
+    import matplotlib
+
+    add_viewer_standard_colormap()
+    return matplotlib.colormaps[name]((np.arange(size) + 0.5) / size,
+                                      bytes=True)
+
+
+def make_thumbnail(name, width=THUMBNAIL_WIDTH):
+    """
+    Returns uint8 RGBA array of `width` colors of colormap `name`.
+    """
+    import matplotlib
+
+    add_viewer_standard_colormap()
+    return matplotlib.colormaps[name](np.linspace(0, 1, width), bytes=True)
+
+
+def _cache_key():
+    try:
+        matplotlib_version = importlib.metadata.version("matplotlib")
+    except importlib.metadata.PackageNotFoundError:
+        matplotlib_version = "unknown"
+    return f"matplotlib {matplotlib_version}, gleipnir {__version__}"
@@ -0,0 +1,319 @@
+"""
+Dataset is a module with a compact container of "AbsorpPlot.dat" data: header
+parameters as attributes (`__slots__`, no per-instance dict) and "AbsPlot"
+map (and "Channels" cube of velocity channel maps) as NumPy arrays.
+
+Derived values are computed on the first request and kept with the dataset:
+coordinate axes `r`, `z`, `v`, physical `extent`, axes ticks and statistics
+of the map (`min`, `max`, `nan_count`, `percentile` and `histogram` for
+quick approximate percentiles). A dataset is treated as
+immutable, use `with_abs_plot` to get a dataset with another map (e.g. a
+velocity channel), it shares the header, the cube and the axes.
+
+Memory-mapped sources are used without copying: `from_buffer` wraps a buffer
+(e.g. `mmap` or memoryview) in read-only arrays, memory maps of the cache are
+kept as is (see `gleipnir/core/cache.py`). `astype(np.float32)` halves the
+memory of the arrays (values keep about 7 significant digits).
+
+Item access (`data["nR"]`, `data["AbsPlot"]`, `"Channels" in data`) works
+like for dicts of older versions.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import warnings
+
+import numpy as np
+
+from gleipnir.core.histogram import Histogram
+
+
+HEADER = ("nR", "nZ", "dr", "dz", "r0", "z0", "V1", "V2", "dV", "Incl", "ENA",
+          "Coeff")
+INT_PARAMETERS = ("nR", "nZ")
+
+# Number of intervals between axes ticks.
+TICK_INTERVALS = 4
+
+# Values of the cache that depend only on the grid (shared by channels).
+_GRID_VALUES = ("r", "z", "v", "extent", "r_ticks", "z_ticks")
+
+
+class Dataset:
+    __slots__ = HEADER + ("abs_plot", "channels", "_cache")
+
+
+    def __init__(self, header, abs_plot, channels=None):
+        for name in HEADER:
+            setattr(self, name, header[name])
+        self.abs_plot = abs_plot
+        self.channels = channels
+        self._cache = {}
+
+
+    def __contains__(self, key):
+        return (key in HEADER or key == "AbsPlot"
+                or (key == "Channels" and self.channels is not None))
+
+
+    def __getitem__(self, key):
+        if key == "AbsPlot":
+            return self.abs_plot
+        if key == "Channels" and self.channels is not None:
+            return self.channels
+        if key in HEADER:
+            return getattr(self, key)
+        raise KeyError(key)
+
+
+    def __repr__(self):
+        channels = (f", {len(self.channels)} channels"
+                    if self.channels is not None else "")
+        return (f"<Dataset {self.abs_plot.shape[1]}x{self.abs_plot.shape[0]} "
+                f"{self.abs_plot.dtype}{channels}>")
+
+
+    def astype(self, dtype):
+        """
+        Returns dataset with arrays of `dtype` (e.g. `np.float32` to halve
+        memory) or the dataset itself if they already have it. Memory-mapped
+        cube is read into memory.
+        """
+        if self.abs_plot.dtype == dtype:
+            return self
+        return self._derive(self.abs_plot.astype(dtype),
+                            None if self.channels is None
+                            else self.channels.astype(dtype))
+
+
+    @property
+    def channel_count(self):
+        return channel_count(self)
+
+
+    @property
+    def extent(self):
+        """
+        (left, right, bottom, top) physical bounds of the map.
+        """
+        return self._cached("extent", lambda: tuple(
+            float(value) for value in (self.r[0], self.r[-1], self.z[0],
+                                       self.z[-1])))
+
+
+    @classmethod
+    def from_buffer(cls, header, buffer, dtype=np.float64):
+        """
+        Returns dataset of `header` with arrays in `buffer` (bytes-like
+        object, e.g. `mmap` or memoryview, of a map or a cube of channel maps
+        in C order) without copying. Arrays are read-only.
+        Raises ValueError if the buffer size doesn't match the header.
+        """
+        array = np.frombuffer(buffer, dtype=dtype)
+        array.flags.writeable = False
+        shape = (header["nZ"] + 1, header["nR"] + 1)
+        channels = channel_count(header)
+        if array.size == shape[0] * shape[1]:
+            return cls(header, array.reshape(shape))
+        if array.size == shape[0] * shape[1] * channels and channels > 1:
+            cube = array.reshape((channels,) + shape)
+            return cls(header, cube[0], cube)
+        raise ValueError(
+            f"Buffer has {array.size} values, {shape[0] * shape[1]} "
+            + (f"or {shape[0] * shape[1] * channels} " if channels > 1
+               else "")
+            + "values are expected")
+
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Returns dataset of dict `data` with header parameters, "AbsPlot" and
+        optional "Channels" arrays.
+        """
+        return cls(data, data["AbsPlot"], data.get("Channels"))
+
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+    @property
+    def header(self):
+        """
+        Dict of header parameters.
+        """
+        return {name: getattr(self, name) for name in HEADER}
+
+
+    @property
+    def histogram(self):
+        """
+        `Histogram` of the map values for auto-contrast (sampled for big
+        maps, see `gleipnir/core/histogram.py`).
+        """
+        return self._cached("histogram", lambda: Histogram.of(self.abs_plot))
+
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+
+    def keys(self):
+        return HEADER + (("AbsPlot", "Channels") if self.channels is not None
+                         else ("AbsPlot",))
+
+
+    @property
+    def max(self):
+        return self._stats()["max"]
+
+
+    @property
+    def min(self):
+        return self._stats()["min"]
+
+
+    @property
+    def nan_count(self):
+        return self._stats()["nan_count"]
+
+
+    @property
+    def nbytes(self):
+        """
+        Size of the arrays (the map is a part of the cube if there are
+        channels).
+        """
+        if self.channels is not None:
+            return self.channels.nbytes
+        return self.abs_plot.nbytes
+
+
+    def percentile(self, q):
+        """
+        Returns `q` percentile(s) (0 to 100) of the map values, NaN values are
+        ignored.
+        """
+        key = ("percentile", tuple(np.ravel(q)))
+        value = self._cached(key, lambda: _without_nan_warnings(
+            np.nanpercentile, self.abs_plot, q))
+        return value.copy() if isinstance(value, np.ndarray) else value
+
+
+    @property
+    def r(self):
+        """
+        Radial coordinates of the map columns.
+        """
+        return self._cached("r", lambda: _read_only(
+            self.r0 + np.arange(self.nR + 1) * self.dr))
+
+
+    @property
+    def r_ticks(self):
+        """
+        (positions, labels) of radial axis ticks (positions are map columns).
+        """
+        return self._cached("r_ticks", lambda: _ticks(self.nR, self.r))
+
+
+    def with_abs_plot(self, abs_plot):
+        """
+        Returns dataset with map `abs_plot` on the same grid (e.g. a velocity
+        channel of the cube).
+        """
+        return self._derive(abs_plot, self.channels)
+
+
+    @property
+    def v(self):
+        """
+        Velocities of the channels.
+        """
+        return self._cached("v", lambda: _read_only(
+            self.V1 + np.arange(channel_count(self)) * self.dV))
+
+
+    @property
+    def z(self):
+        """
+        Axial coordinates of the map rows (from the bottom row).
+        """
+        return self._cached("z", lambda: _read_only(
+            self.z0 + np.arange(self.nZ + 1) * self.dz))
+
+
+    @property
+    def z_ticks(self):
+        """
+        (positions, labels) of axial axis ticks (positions are map rows, top
+        row is the last coordinate).
+        """
+        return self._cached("z_ticks", lambda: _ticks(self.nZ, self.z,
+                                                     reverse=True))
+
+
+    def _cached(self, key, compute):
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = compute()
+            return value
+
+
+    def _derive(self, abs_plot, channels=None):
+        """
+        Returns dataset of the same header with other arrays, grid values of
+        the cache are reused.
+        """
+        data = Dataset(self, abs_plot, channels)
+        data._cache = {key: value for key, value in self._cache.items()
+                       if key in _GRID_VALUES}
+        return data
+
+
+    def _stats(self):
+        return self._cached("stats", lambda: {
+            "min": float(_without_nan_warnings(np.nanmin, self.abs_plot)),
+            "max": float(_without_nan_warnings(np.nanmax, self.abs_plot)),
+            "nan_count": int(np.count_nonzero(np.isnan(self.abs_plot)))})
+
+
+def channel_count(data):
+    """
+    Returns number of velocity channels described by header `data`.
+    """
+    if not data["dV"] or (data["V2"] - data["V1"]) / data["dV"] < 0:
+        return 1
+    return int(round((data["V2"] - data["V1"]) / data["dV"])) + 1
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+def _ticks(size, coordinates, reverse=False):
+    """
+    Returns (positions, labels) of ticks that split `size` pixels into
+    `TICK_INTERVALS` intervals, labels are `coordinates` of the positions
+    (`reverse` for axes that go from the last coordinate).
+    """
+    step = size / TICK_INTERVALS
+    label_step = (coordinates[-1] - coordinates[0]) / TICK_INTERVALS
+    labels = np.arange(coordinates[0], coordinates[-1] + label_step,
+                       label_step)
+    return (_read_only(np.arange(0, size + step, step)),
+            _read_only(labels[::-1] if reverse else labels))
+
+
+def _without_nan_warnings(function, array, *args):
+    # all-NaN maps (e.g. empty channels) give NaN without a warning
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return function(array, *args)
@@ -0,0 +1,91 @@
+"""
+Histogram is a module with a histogram of data map values for auto-contrast:
+the histogram is computed once per dataset (see `Dataset.histogram`), then
+percentiles and color limits are interpolated from its cumulative counts
+without passes over the map.
+
+NaN values are skipped. Maps bigger than `SAMPLE_SIZE` values are sampled
+with a regular stride in both directions (a view of the map, nothing is
+copied), so the histogram costs about the same for any grid size. Values are
+counted into `BINS` bins between the smallest and the biggest sampled value,
+so percentiles are accurate to 1/`BINS` of the value range.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import math
+
+import numpy as np
+
+
+BINS = 1024
+
+# The biggest number of map values that are counted, bigger maps are sampled.
+SAMPLE_SIZE = 1 << 20
+
+
+class Histogram:
+    def __init__(self, counts, edges, nan_count=0, is_sampled=False):
+        self.counts = counts
+        self.edges = edges
+        self.nan_count = nan_count # of the counted (sampled) values
+        self.is_sampled = is_sampled
+
+        self._cumulative = np.concatenate(([0], np.cumsum(counts)))
+
+
+    def limits(self, percent):
+        """
+        Returns (v_min, v_max) color limits that keep `percent` of values
+        inside, the rest is cut equally from both ends (100 gives the range
+        of values).
+        """
+        cut = (100 - percent) / 2
+        low, high = self.percentile([cut, 100 - cut])
+        return float(low), float(high)
+
+
+    @classmethod
+    def of(cls, array, bins=BINS, sample_size=SAMPLE_SIZE):
+        """
+        Returns histogram of 2D `array` values (NaN values are skipped).
+        """
+        step = max(1, math.ceil(math.sqrt(array.size / sample_size)))
+        sample = array[::step, ::step] if step > 1 else array
+        values = sample[~np.isnan(sample)]
+        if values.size:
+            value_range = (values.min(), values.max())
+        else:
+            value_range = (0.0, 1.0)
+        if value_range[0] == value_range[1]:
+            value_range = (value_range[0] - 0.5, value_range[1] + 0.5)
+        counts, edges = np.histogram(values, bins, value_range)
+        return cls(counts, edges, sample.size - values.size, step > 1)
+
+
+    def percentile(self, q):
+        """
+        Returns `q` percentile(s) (0 to 100) of values interpolated inside
+        bins, NaN if there are no values.
+        """
+        if not self.total:
+            return np.full(np.shape(q), np.nan)[()]
+        # the first non-empty bin that reaches the rank
+        rank = np.clip(np.asarray(q, dtype=np.float64) / 100 * self.total,
+                       0, self.total)
+        index = np.searchsorted(self._cumulative, rank)
+        index = np.where(rank > 0, index,
+                         np.searchsorted(self._cumulative, 0, "right"))
+        start = self._cumulative[index - 1]
+        fraction = (rank - start) / (self._cumulative[index] - start)
+        return (self.edges[index - 1]
+                + fraction * (self.edges[index] - self.edges[index - 1]))
+
+
+    @property
+    def total(self):
+        """
+        Number of the counted (sampled) values, NaN values aren't counted.
+        """
+        return int(self._cumulative[-1])
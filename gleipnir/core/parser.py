@@ -0,0 +1,648 @@
+"""
+Parser is a module for reading "AbsorpPlot.dat" files (see `gleipnir/__main__.py`
+for the format description).
+
+The float block is not parsed token by token in Python. Instead, the raw bytes
+are split into tokens with NumPy, tokens of the same shape (length and
+position of sign, dot and exponent) are grouped into 2D character matrices and
+every group is converted with a couple of vectorized operations. Decimal
+mantissas up to 15 digits with a decimal exponent up to 22 are converted
+exactly (the result is bit-identical to Python's `float`), other tokens fall
+back to NumPy's C parser. Big files are parsed by several threads (NumPy
+releases the GIL inside vectorized operations).
+
+"AbsPlot" section can hold either one map or a map for every velocity channel
+of the header (V1 to V2 with dV step), maps follow one another. Channels are
+returned as a 3D "Channels" array.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import concurrent.futures
+import mmap
+import os
+import threading
+import time
+import warnings
+
+import numpy as np
+
+from gleipnir.core.dataset import channel_count
+from gleipnir.core.dataset import Dataset
+from gleipnir.core.dataset import HEADER
+from gleipnir.core.dataset import INT_PARAMETERS
+import gleipnir.utils.instrumentation as instrumentation
+
+
+CHUNK_SIZE = 1 << 24
+MAX_WORKERS = 16
+PARALLEL_MIN_SIZE = 1 << 25
+RANGES_PER_WORKER = 4
+
+# Character classes of the float tokens
+_DIGIT = 0
+_DOT = 1
+_EXP = 2
+_SIGN = 3
+_OTHER = 4
+
+_CHAR_CLASS = np.full(256, _OTHER, dtype=np.uint8)
+_CHAR_CLASS[ord("0"):ord("9") + 1] = _DIGIT
+_CHAR_CLASS[ord(".")] = _DOT
+_CHAR_CLASS[ord("e")] = _EXP
+_CHAR_CLASS[ord("E")] = _EXP
+_CHAR_CLASS[ord("-")] = _SIGN
+_CHAR_CLASS[ord("+")] = _SIGN
+
+_MAX_EXACT_DIGITS = 15 # 10**15 < 2**53
+_MAX_EXACT_POWER = 22 # 10**22 is the largest power of ten exact in float64
+_MAX_TOKEN_LENGTH = 255
+_BLOCK_ROWS = 1 << 15
+_POWERS_OF_TEN = np.array([float(10 ** i) for i in
+                           range(_MAX_EXACT_POWER + 1)])
+
+
+class Cancelled(Exception):
+    """Reading is cancelled."""
+
+
+class FormatError(Exception):
+    """Invalid "AbsorpPlot.dat" file format."""
+
+
+def parse_floats(buffer):
+    """
+    Parses whitespace separated float values from `buffer` (bytes-like).
+    Returns 1D float64 array. Raises `FormatError` if a token is not a float.
+    """
+    chars = np.frombuffer(buffer, dtype=np.uint8)
+    values = _parse_fixed_width(chars)
+    if values is not None:
+        return values
+
+    spaces = np.concatenate(([-1], np.flatnonzero(chars <= 32), [chars.size]))
+    gaps = np.diff(spaces)
+    is_token = gaps > 1
+    starts = spaces[:-1][is_token] + 1
+    lengths = gaps[is_token] - 1
+    if starts.size == 0:
+        return np.empty(0, dtype=np.float64)
+
+    # leading signs are parsed separately, so "-0.5" and "0.25" have the same
+    # layout
+    negative = chars[starts] == ord("-")
+    signed = negative | (chars[starts] == ord("+"))
+    if signed.any():
+        starts += signed
+        lengths -= signed
+        if (lengths == 0).any() or (_CHAR_CLASS[chars[starts[signed]]]
+                                    == _SIGN).any():
+            raise FormatError("Invalid float value in AbsPlot: misplaced sign")
+
+    if lengths.max() > _MAX_TOKEN_LENGTH:
+        raise FormatError("Invalid float value in AbsPlot: token of "
+                          f"{lengths.max()} characters")
+
+    values = np.empty(starts.size, dtype=np.float64)
+    if (lengths == lengths[0]).all():
+        _parse_group(chars, starts, int(lengths[0]), values, None)
+    else:
+        # stable sort of 8-bit integers is a linear time radix sort
+        order = np.argsort(lengths.astype(np.uint8), kind="stable")
+        counts = np.bincount(lengths)
+        bounds = np.cumsum(counts)
+        for length in np.flatnonzero(counts):
+            index = order[bounds[length] - counts[length]:bounds[length]]
+            _parse_group(chars, starts[index], int(length), values, index)
+    np.negative(values, where=negative, out=values)
+    return values
+
+
+def default_workers():
+    return min(os.cpu_count() or 1, MAX_WORKERS)
+
+
+def is_complete(file_path):
+    """
+    Returns True if `file_path` ends with the line break of the trailing
+    empty line of the format (a file that is still being written usually
+    ends in the middle of the float block). It's a cheap check, the number
+    of values is validated while reading.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+    except OSError:
+        return False
+
+
+@instrumentation.timed("parse")
+def read_absorp_plot(file_path, progress=None, is_cancelled=None,
+                     workers=None):
+    """
+    Reads "AbsorpPlot.dat" file. Returns `Dataset` with header parameters and
+    "AbsPlot" 2D array (flipped, transposed, zero values are set to NaN). If
+    the file has maps of all velocity channels, "Channels" 3D array of maps is
+    added, "AbsPlot" is the first channel.
+    Raises `FormatError` if file has an incompatible format.
+
+    The float block is parsed by chunks of `CHUNK_SIZE` bytes straight into
+    the array preallocated with nR, nZ and channels header values (memory of
+    the array is allocated by OS only when it's written), so peak memory is
+    close to the size of the resulting array. Blocks bigger than
+    `PARALLEL_MIN_SIZE` are split into byte ranges that are parsed by
+    `workers` threads (`default_workers()` by default, 1 disables threads).
+
+    Optional `progress(stage, done, total)` callback is called with stage
+    "read" or "parse" and the number of processed bytes of the float block.
+    Optional `is_cancelled()` callback is checked between chunks, `Cancelled`
+    is raised if it returns True.
+    """
+    if workers is None:
+        workers = default_workers()
+
+    with open(file_path, "rb") as f:
+        header = _read_header(f)
+        offset = f.tell()
+        total = os.fstat(f.fileno()).st_size - offset
+        values = np.empty((header["nR"] + 1) * (header["nZ"] + 1)
+                          * channel_count(header), dtype=np.float64)
+        if workers > 1 and total >= PARALLEL_MIN_SIZE:
+            count = _read_parallel(f, offset, total, values, workers,
+                                   progress, is_cancelled)
+        else:
+            count = _read_stream(f, total, values, progress, is_cancelled)
+
+    return _make_data(header, values[:count])
+
+
+def _check_cancelled(is_cancelled):
+    if is_cancelled and is_cancelled():
+        raise Cancelled
+
+
+def _count_tokens(buffer, start, end, is_cancelled):
+    """
+    Returns number of tokens in `buffer[start:end]` (`start` must be at the
+    beginning of a token or at a whitespace character).
+    """
+    count = 0
+    is_previous_space = True
+    for chunk_start in range(start, end, CHUNK_SIZE):
+        _check_cancelled(is_cancelled)
+        chars = np.frombuffer(buffer, dtype=np.uint8, offset=chunk_start,
+                              count=min(CHUNK_SIZE, end - chunk_start))
+        is_token = chars > 32
+        count += np.count_nonzero(is_token[1:] & ~is_token[:-1])
+        count += bool(is_token[0] and is_previous_space)
+        is_previous_space = not is_token[-1]
+    return count
+
+
+def _last_separator(buffer, end, start=0):
+    """
+    Returns position after the last whitespace character of
+    `buffer[start:end]` or None if there is no whitespace.
+    """
+    position = max(buffer.rfind(c, start, end)
+                   for c in (b" ", b"\n", b"\r", b"\t", b"\v", b"\f"))
+    return position + 1 if position >= 0 else None
+
+
+def _parse_range(buffer, start, end, values, is_cancelled):
+    """
+    Parses `buffer[start:end]` into `values` by chunks (`start` and `end` must
+    be at whitespace characters or at the buffer bounds). Returns number of
+    parsed values.
+    """
+    count = 0
+    while start < end:
+        _check_cancelled(is_cancelled)
+        chunk_end = end
+        if start + CHUNK_SIZE < end:
+            chunk_end = _last_separator(buffer, start + CHUNK_SIZE, start)
+            if chunk_end is None:
+                raise FormatError("Invalid float value in AbsPlot: "
+                                  "token is too long")
+        chunk = parse_floats(np.frombuffer(buffer, dtype=np.uint8,
+                                           offset=start,
+                                           count=chunk_end - start))
+        if count + chunk.size > values.size:
+            raise FormatError(_too_many_values(values.size))
+        chunk[chunk == 0] = np.nan
+        values[count:count + chunk.size] = chunk
+        count += chunk.size
+        start = chunk_end
+    return count
+
+
+def _read_parallel(f, offset, total, values, workers, progress, is_cancelled):
+    """
+    Parses float block of `total` bytes at `offset` of the file `f` into
+    `values` with a pool of `workers` threads. The block is split into byte
+    ranges aligned on whitespace; the first pass counts tokens of each range,
+    the second one parses ranges into their slices of `values`. Returns
+    number of parsed values.
+    """
+    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        end = offset + total
+        bounds = [offset]
+        for i in range(1, workers * RANGES_PER_WORKER):
+            position = max(offset + total * i // (workers
+                                                  * RANGES_PER_WORKER),
+                           bounds[-1])
+            while position < end and buffer[position] > 32:
+                position += 1
+            if position > bounds[-1]:
+                bounds.append(position)
+        bounds.append(end)
+        ranges = list(zip(bounds[:-1], bounds[1:]))
+
+        cancelled = threading.Event()
+        is_range_cancelled = cancelled.is_set
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            with instrumentation.timer("parse.count"):
+                counts = _run_ranges(
+                    executor, ranges, "read", total, progress, is_cancelled,
+                    cancelled,
+                    lambda start, end: _count_tokens(buffer, start, end,
+                                                     is_range_cancelled))
+            offsets = np.concatenate(([0], np.cumsum(counts)))
+            if offsets[-1] > values.size:
+                raise FormatError(_too_many_values(values.size))
+            slices = {r: values[offsets[i]:offsets[i + 1]]
+                      for i, r in enumerate(ranges)}
+            with instrumentation.timer("parse.tokenize"):
+                parsed = _run_ranges(
+                    executor, ranges, "parse", total, progress, is_cancelled,
+                    cancelled,
+                    lambda start, end: _parse_range(buffer, start, end,
+                                                    slices[(start, end)],
+                                                    is_range_cancelled))
+        if parsed != counts:
+            raise FormatError("Invalid float values in AbsPlot")
+        return int(offsets[-1])
+    finally:
+        try:
+            buffer.close()
+        except BufferError:
+            pass # chunks are referenced by the exception, closed by GC
+
+
+def _read_stream(f, total, values, progress, is_cancelled):
+    """
+    Parses float block of `total` bytes from the current position of the file
+    `f` into `values`. Returns number of parsed values.
+    """
+    count = 0
+    done = 0
+    buffer = bytearray(min(CHUNK_SIZE, total) + 1)
+    times = {"parse.read": 0.0, "parse.tokenize": 0.0, "parse.mask": 0.0}
+    with memoryview(buffer) as view:
+        carry = 0
+        while True:
+            _check_cancelled(is_cancelled)
+            start = time.perf_counter()
+            size = f.readinto(view[carry:])
+            times["parse.read"] += time.perf_counter() - start
+            done += size
+            if progress:
+                progress("read", done, total)
+            end = carry + size
+            chunk_end = end if size == 0 else _last_separator(buffer, end)
+            if chunk_end is None:
+                if end == len(buffer):
+                    raise FormatError("Invalid float value in AbsPlot: "
+                                      "token is too long")
+                carry = end
+                continue
+
+            start = time.perf_counter()
+            chunk = parse_floats(view[:chunk_end])
+            times["parse.tokenize"] += time.perf_counter() - start
+            if count + chunk.size > values.size:
+                raise FormatError(_too_many_values(values.size))
+            start = time.perf_counter()
+            chunk[chunk == 0] = np.nan
+            values[count:count + chunk.size] = chunk
+            times["parse.mask"] += time.perf_counter() - start
+            count += chunk.size
+            del chunk
+            if progress:
+                progress("parse", done - (end - chunk_end), total)
+
+            if size == 0:
+                for name, seconds in times.items():
+                    instrumentation.add_time(name, seconds)
+                return count
+            carry = end - chunk_end
+            view[:carry] = view[chunk_end:end]
+
+
+def _run_ranges(executor, ranges, stage, total, progress, is_cancelled,
+                cancelled, function):
+    """
+    Runs `function(start, end)` for every byte range at the `executor`,
+    reports `progress` and checks cancellation at the calling thread. Returns
+    list of results in the order of `ranges`.
+    """
+    futures = {executor.submit(function, start, end): (start, end)
+               for start, end in ranges}
+    done_bytes = 0
+    pending = set(futures)
+    try:
+        while pending:
+            finished, pending = concurrent.futures.wait(
+                pending, timeout=0.1,
+                return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                future.result() # raise worker exception
+                start, end = futures[future]
+                done_bytes += end - start
+            if finished and progress:
+                progress(stage, done_bytes, total)
+            _check_cancelled(is_cancelled)
+    except BaseException:
+        cancelled.set()
+        concurrent.futures.wait(pending)
+        raise
+    return [future.result() for future in futures]
+
+
+@instrumentation.timed("parse.reshape")
+def _make_data(header, values):
+    size = (header["nR"] + 1) * (header["nZ"] + 1)
+    channels = channel_count(header)
+    if values.size not in (size, size * channels):
+        raise FormatError(
+            f"AbsPlot has {values.size} values, (nR + 1) x (nZ + 1) = {size} "
+            + (f"or {size * channels} ({channels} channels) " if channels > 1
+               else "")
+            + "values are expected")
+
+    # zero values are already set to NaN
+    if values.size == size:
+        return Dataset(header, values[::-1].reshape(header["nR"] + 1,
+                                                    header["nZ"] + 1).T)
+    # every channel is flipped and transposed like a single map
+    cube = values.reshape(channels, header["nR"] + 1, header["nZ"] + 1)
+    cube = cube[:, ::-1, ::-1].transpose(0, 2, 1)
+    return Dataset(header, cube[0], cube)
+
+
+def _parse_fixed_width(chars):
+    """
+    Fast path for tokens of the same width separated by the same number of
+    whitespace characters (the usual layout of generated files). Returns None
+    if the layout is not fixed width.
+    """
+    non_space = np.flatnonzero(chars[:64] > 32)
+    if non_space.size == 0:
+        return None
+    first = non_space[0]
+    length = np.argmax(chars[first:first + 64] <= 32)
+    step = length + np.argmax(chars[first + length:first + length + 64] > 32)
+    if length == 0 or step == length:
+        return None
+
+    last = chars.size
+    while last > first and chars[last - 1] <= 32:
+        last -= 1
+    body = chars[first:last]
+    count, remainder = divmod(body.size + step - length, step)
+    if remainder or count < 2:
+        return None
+
+    as_strided = np.lib.stride_tricks.as_strided
+    separators = as_strided(body[length:], shape=(count - 1, step - length),
+                            strides=(step, 1), writeable=False)
+    if not (separators <= 32).all():
+        return None
+    matrix = as_strided(body, shape=(count, length), strides=(step, 1),
+                        writeable=False)
+    # tokens of other widths can line up with the stride by chance
+    if not (matrix > 32).all():
+        return None
+    return _parse_matrix(matrix)
+
+
+def _parse_group(chars, starts, length, values, index):
+    """
+    Parses tokens with the same `length`, writes results to `values` (at
+    `index` positions, if specified).
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(chars, length)
+    matrix = windows[starts]
+    if index is None:
+        values[:] = _parse_matrix(matrix)
+    else:
+        values[index] = _parse_matrix(matrix)
+
+
+def _parse_matrix(matrix):
+    """
+    Parses character `matrix` (each row is a token of the same length). Rows
+    are processed by blocks that fit into CPU cache.
+    """
+    result = np.empty(matrix.shape[0], dtype=np.float64)
+    for start in range(0, matrix.shape[0], _BLOCK_ROWS):
+        block = matrix[start:start + _BLOCK_ROWS]
+        block_result = _parse_pattern(block, _CHAR_CLASS[block[0]].tolist())
+        if block_result is None:
+            block_result = _parse_mixed(block)
+        result[start:start + block.shape[0]] = block_result
+    return result
+
+
+def _parse_mixed(matrix):
+    """
+    Parses character `matrix` whose rows have different patterns (or the
+    pattern can't be parsed exactly).
+    """
+    # group rows by positions of dot, exponent and signs (patterns are
+    # validated by `_parse_pattern`)
+    is_exp = (matrix | 32) == ord("e")
+    exp_pos = np.where(is_exp.any(axis=1), np.argmax(is_exp, axis=1),
+                       matrix.shape[1])
+    exp_sign = np.take_along_axis(
+        np.pad(matrix, ((0, 0), (0, 2))), exp_pos[:, None] + 1, axis=1)[:, 0]
+    keys = (np.argmax(matrix == ord("."), axis=1).astype(np.uint16)
+            | np.minimum(exp_pos, 31).astype(np.uint16) << 5
+            | _CHAR_CLASS[matrix[:, 0]].astype(np.uint16) << 10
+            | _CHAR_CLASS[exp_sign].astype(np.uint16) << 13)
+    order = np.argsort(keys, kind="stable")
+    bounds = np.flatnonzero(np.diff(keys[order])) + 1
+
+    result = np.empty(matrix.shape[0], dtype=np.float64)
+    for rows in np.split(order, bounds):
+        sub_matrix = matrix[rows]
+        sub_result = _parse_pattern(sub_matrix,
+                                    _CHAR_CLASS[sub_matrix[0]].tolist())
+        if sub_result is None:
+            sub_result = _parse_fallback(sub_matrix)
+        result[rows] = sub_result
+    return result
+
+
+def _parse_pattern(matrix, pattern):
+    """
+    Parses character `matrix` whose rows are expected to have the same
+    character class `pattern`. Returns None if some rows don't match the
+    pattern or the pattern can't be converted exactly.
+    """
+    if _OTHER in pattern or _DIGIT not in pattern:
+        return None
+
+    exp_pos = pattern.index(_EXP) if _EXP in pattern else len(pattern)
+    mantissa, exponent = pattern[:exp_pos], pattern[exp_pos + 1:]
+
+    mantissa_start = 1 if mantissa and mantissa[0] == _SIGN else 0
+    body = mantissa[mantissa_start:]
+    if body.count(_DOT) > 1 or any(c not in (_DIGIT, _DOT) for c in body):
+        return None
+    dot_pos = body.index(_DOT) if _DOT in body else len(body)
+    digit_columns = [mantissa_start + j for j, c in enumerate(body)
+                     if c == _DIGIT]
+    fraction_digits = sum(1 for c in body[dot_pos + 1:] if c == _DIGIT)
+    if not digit_columns or len(digit_columns) > _MAX_EXACT_DIGITS:
+        return None
+
+    exp_columns = []
+    exp_sign = bool(exponent) and exponent[0] == _SIGN
+    if exp_pos < len(pattern):
+        exp_columns = list(range(exp_pos + 1 + exp_sign, len(pattern)))
+        if not exp_columns or any(pattern[j] != _DIGIT for j in exp_columns):
+            return None
+    elif fraction_digits > _MAX_EXACT_POWER:
+        return None
+
+    # check that all rows match the pattern
+    if dot_pos < len(body):
+        if not (matrix[:, mantissa_start + dot_pos] == ord(".")).all():
+            return None
+    if exp_columns and not ((matrix[:, exp_pos] | 32) == ord("e")).all():
+        return None
+    negative = _sign_column(matrix, 0) if mantissa_start else False
+    exp_negative = _sign_column(matrix, exp_pos + 1) if exp_sign else False
+    if negative is None or exp_negative is None:
+        return None
+    mantissa_value = _digits_value(matrix, digit_columns)
+    if mantissa_value is None:
+        return None
+
+    if exp_columns:
+        power = _digits_value(matrix, exp_columns)
+        if power is None:
+            return None
+        power = power.astype(np.int64)
+        if exp_sign:
+            np.negative(power, where=exp_negative, out=power)
+        power -= fraction_digits
+        power_min, power_max = power.min(), power.max()
+        if max(-power_min, power_max) > _MAX_EXACT_POWER:
+            return None
+        if power_max <= 0:
+            result = mantissa_value
+            result /= _POWERS_OF_TEN[-power]
+        elif power_min >= 0:
+            result = mantissa_value
+            result *= _POWERS_OF_TEN[power]
+        else:
+            scale = _POWERS_OF_TEN[np.abs(power)]
+            result = np.where(power >= 0, mantissa_value * scale,
+                              mantissa_value / scale)
+    else:
+        result = mantissa_value
+        result /= _POWERS_OF_TEN[fraction_digits]
+
+    if mantissa_start:
+        np.negative(result, where=negative, out=result)
+    return result
+
+
+def _sign_column(matrix, column):
+    """
+    Returns mask of "-" signs in the `column` of the `matrix` or None if some
+    characters are not signs.
+    """
+    negative = matrix[:, column] == ord("-")
+    if not (negative | (matrix[:, column] == ord("+"))).all():
+        return None
+    return negative
+
+
+def _digits_value(matrix, columns):
+    """
+    Returns decimal value of digit `columns` of the `matrix` (each row is
+    a number) or None if some characters are not digits.
+    """
+    digits = matrix[:, columns] - np.uint8(ord("0"))
+    if digits.max() > 9:
+        return None
+    value = digits[:, 0].astype(np.float64)
+    for j in range(1, len(columns)):
+        value *= 10
+        value += digits[:, j]
+    return value
+
+
+def _parse_fallback(matrix):
+    """
+    Parses character `matrix` (each row is a token) with NumPy's C parser.
+    """
+    buffer = np.empty((matrix.shape[0], matrix.shape[1] + 1), dtype=np.uint8)
+    buffer[:, :-1] = matrix
+    buffer[:, -1] = ord(" ")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            result = np.fromstring(buffer.tobytes(), sep=" ")
+        except (DeprecationWarning, ValueError):
+            result = None
+    if result is None or result.size != matrix.shape[0]:
+        for row in matrix:
+            try:
+                float(row.tobytes())
+            except ValueError:
+                raise FormatError(
+                    "Invalid float value in AbsPlot: "
+                    f"{row.tobytes().decode(errors='replace')!r}") from None
+        raise FormatError("Invalid float values in AbsPlot")
+    return result
+
+
+def _too_many_values(size):
+    return (f"AbsPlot has more than {size} values ((nR + 1) x (nZ + 1) for "
+            "every velocity channel)")
+
+
+def _read_header(f):
+    data = {}
+    for i, name in enumerate(HEADER):
+        line = f.readline()
+        try:
+            value = line.split()[-1]
+            data[name] = (int(value) if name in INT_PARAMETERS
+                          else float(value))
+        except (IndexError, ValueError):
+            kind = "int" if name in INT_PARAMETERS else "float"
+            raise FormatError(
+                f"Line {i + 1}: \"{name} <{kind}>\" is expected, got "
+                f"{line.strip()[:80].decode(errors='replace')!r}") from None
+
+    for name in INT_PARAMETERS:
+        if data[name] < 0:
+            raise FormatError(f"{name} must be non-negative, got {data[name]}")
+
+    while True: # skip "arrays" line, look for "AbsPlot" section
+        line = f.readline()
+        if not line:
+            raise FormatError("\"AbsPlot\" section is missing")
+        if line.strip() == b"AbsPlot":
+            return data
@@ -0,0 +1,627 @@
+"""
+Plotter is a helper class that draws data on a Matplotlib figure. It doesn't
+depend on Qt, so it's used both by `PlotWidget` and by headless rendering
+(see `gleipnir/utils/render.py`).
+
+Every `set_*` method returns True if the figure is changed and should be
+redrawn by the canvas.
+
+Plotter keeps handles of the image, colorbar, center lines and frame artists,
+so style changes update only the affected artists. Axes are cleared and drawn
+from scratch only when data grid is changed.
+
+With `lod` enabled, image is drawn from a level of detail `Pyramid` that fits
+the current view (see `set_view` and `zoom`) and the axes size, so redraw
+costs about the same for any grid size. Full resolution is used only for the
+visible part of zoomed in data.
+
+`save` renders PNG and TIFF images bigger than `TILE_SIZE` pixels (e.g.
+posters at high DPI) by tiles into a memory-mapped temporary file, so the
+renderer memory doesn't grow with DPI.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import collections
+import io
+import os
+import tempfile
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle
+from matplotlib.transforms import Bbox
+from matplotlib.transforms import BboxBase
+import mpl_toolkits.axes_grid1
+from mpl_toolkits.axes_grid1.anchored_artists import AnchoredDrawingArea
+import numpy as np
+
+import gleipnir.core.colormaps as cmap
+from gleipnir.core.pyramid import Pyramid
+import gleipnir.core.raster as raster
+from gleipnir.core.style import DEFAULT_STYLE
+import gleipnir.utils.instrumentation as instrumentation
+
+
+# Number of pyramids kept for recently drawn maps of the current data (e.g.
+# velocity channels of a cube).
+PYRAMID_CACHE_SIZE = 8
+
+# The smallest view size (data pixels) for zooming in.
+MIN_VIEW_SIZE = 4
+
+# The biggest size (pixels) of image rendered at once (see `Plotter.save`).
+TILE_SIZE = 4096
+
+# Data values that define image grid (axes ticks).
+GRID = ("nR", "nZ", "dr", "dz", "r0", "z0")
+
+# Style properties that are drawn by `Plotter` (others are export settings).
+PLOT_STYLE = ("axes_color", "axes_labels_color", "background_color",
+              "center_lines_color", "colormap", "frame_color",
+              "is_background_transparent", "is_center_lines_displayed",
+              "is_show_frame", "ticks_color", "title", "title_color", "v_max",
+              "v_min", "x_axis_name", "y_axis_name")
+
+
+class Plotter:
+    def __init__(self, figure, lod=False):
+        cmap.add_viewer_standard_colormap()
+
+        self.figure = figure
+        self.ax = self.figure.add_subplot(1, 1, 1)
+        self.lod = lod
+
+        self._axes_color = None
+        self._axes_labels_color = None
+        self._background_color = None
+        self._center_lines = []
+        self._center_lines_color = None
+        self._colorbar_axes = None
+        self._colormap = None
+        self._data = None
+        self._frame = None
+        self._frame_circle = None
+        self._frame_color = None
+        self._image = None
+        self._is_background_transparent = None
+        self._is_center_lines_displayed = None
+        self._is_show_frame = None
+        self._pyramid = None
+        self._pyramid_source = None # cube or map of `_pyramids`
+        self._pyramids = collections.OrderedDict() # id(array): (array, pyramid)
+        self._ticks_color = None
+        self._title = None
+        self._title_color = None
+        self._v_max = None
+        self._v_min = None
+        self._view = None # (xlim, ylim) or None for the whole image
+        self._x_axis_name = None
+        self._y_axis_name = None
+
+
+    @classmethod
+    def offscreen(cls, style=None):
+        """
+        Creates plotter with a new figure attached to Agg canvas (doesn't need
+        display), `style` is applied if specified.
+        """
+        style = dict(DEFAULT_STYLE, **(style or {}))
+        figure = Figure(figsize=style["figsize"], dpi=style["dpi"])
+        FigureCanvasAgg(figure)
+        plotter = cls(figure)
+        plotter.set_style(style)
+        return plotter
+
+
+    def reset_view(self):
+        if self._view is None:
+            return False
+        self._view = None
+        self._draw_view()
+        return True
+
+
+    def save(self, file_path, dpi, is_background_transparent,
+             tile_size=TILE_SIZE):
+        """
+        Saves figure to `file_path` at `dpi`. PNG and TIFF images bigger
+        than `tile_size` pixels are rendered by tiles.
+        """
+        width, height = (int(size * dpi)
+                         for size in self.figure.get_size_inches())
+        image_format = os.path.splitext(file_path)[1][1:].lower()
+        if (max(width, height) <= tile_size
+                or image_format not in raster.FORMATS):
+            self.figure.savefig(file_path, dpi=dpi,
+                                transparent=is_background_transparent)
+            return
+        from PIL import Image
+
+        # image is resampled only for the rendered tile, not for whole axes
+        clip_box = self._image.get_clip_box() if self._image else None
+        if self._image:
+            self._image.set_clip_box(_RenderedBbox(self.ax.bbox, self.figure))
+        try:
+            with tempfile.TemporaryFile() as f:
+                image = np.memmap(f, np.uint8, "w+", shape=(height, width, 4))
+                for top in range(0, height, tile_size):
+                    for left in range(0, width, tile_size):
+                        bottom = min(top + tile_size, height)
+                        right = min(left + tile_size, width)
+                        image[top:bottom, left:right] = self._render_tile(
+                            dpi, is_background_transparent, left, top,
+                            right, bottom, height)
+                Image.frombuffer("RGBA", (width, height), image, "raw",
+                                 "RGBA", 0, 1).save(
+                    file_path, raster.FORMATS[image_format], dpi=(dpi, dpi))
+                del image
+        finally:
+            if self._image:
+                self._image.set_clip_box(clip_box)
+
+
+    def set_axes_color(self, axes_color):
+        if self._axes_color != axes_color:
+            self._axes_color = axes_color
+            self._draw_axes_color()
+            return True
+        return False
+
+
+    def set_axes_labels_color(self, axes_labels_color):
+        if self._axes_labels_color != axes_labels_color:
+            self._axes_labels_color = axes_labels_color
+            self._draw_axes_labels_color()
+            return True
+        return False
+
+
+    def set_background_color(self, background_color):
+        if self._background_color != background_color:
+            self._background_color = background_color
+            self._draw_background()
+            return True
+        return False
+
+
+    def set_center_lines_color(self, center_lines_color):
+        if self._center_lines_color != center_lines_color:
+            self._center_lines_color = center_lines_color
+            self._draw_center_lines_color()
+            return True
+        return False
+
+
+    def set_colormap(self, colormap):
+        if self._colormap != colormap:
+            self._colormap = colormap
+            if self._image:
+                self._image.set_cmap(self._colormap) # updates colorbar too
+            return True
+        return False
+
+
+    def set_data(self, data):
+        if self._data is not data:
+            # pyramids of replaced data (another file, a reload) are dropped,
+            # only channels of the same cube share them
+            source = _pyramid_source(data)
+            if source is not self._pyramid_source:
+                self._pyramids.clear()
+                self._pyramid_source = source
+            self._pyramid = (self._get_pyramid(data.abs_plot)
+                             if self.lod and data else None)
+            if self._image and data and _is_same_grid(self._data, data):
+                # only image values are changed, other artists are reused
+                self._data = data
+                if self._pyramid:
+                    self._draw_view()
+                else:
+                    self._image.set_data(self._data.abs_plot)
+            else:
+                self._clear()
+                self._data = data
+                self._view = None
+                self._draw_full()
+            return True
+        return False
+
+
+    def set_frame_color(self, frame_color):
+        if self._frame_color != frame_color:
+            self._frame_color = frame_color
+            if self._frame_circle:
+                self._frame_circle.set_edgecolor(self._frame_color)
+            return True
+        return False
+
+
+    def set_is_background_transparent(self, is_background_transparent):
+        if self._is_background_transparent != is_background_transparent:
+            self._is_background_transparent = is_background_transparent
+            self._draw_background()
+            return True
+        return False
+
+
+    def set_is_center_lines_displayed(self, is_center_lines_displayed):
+        if self._is_center_lines_displayed != is_center_lines_displayed:
+            self._is_center_lines_displayed = is_center_lines_displayed
+            for line in self._center_lines:
+                line.set_visible(self._is_center_lines_displayed)
+            return True
+        return False
+
+
+    def set_is_show_frame(self, is_show_frame):
+        if self._is_show_frame != is_show_frame:
+            self._is_show_frame = is_show_frame
+            if self._frame:
+                self._frame.set_visible(self._is_show_frame)
+            return True
+        return False
+
+
+    def set_style(self, style):
+        """
+        Sets plot properties from `style` dict (see `DEFAULT_STYLE`), only
+        the artists of changed properties are updated.
+        """
+        changed = False
+        for name in PLOT_STYLE:
+            if name in style:
+                changed = getattr(self, "set_" + name)(style[name]) or changed
+        return changed
+
+
+    def set_ticks_color(self, ticks_color):
+        if self._ticks_color != ticks_color:
+            self._ticks_color = ticks_color
+            self._draw_ticks_color()
+            return True
+        return False
+
+
+    def set_title(self, title):
+        if self._title != title:
+            self._title = title
+            try:
+                self._draw_title()
+                return True
+            except:
+                pass
+        return False
+
+
+    def set_title_color(self, title_color):
+        if self._title_color != title_color:
+            self._title_color = title_color
+            self._draw_title_color()
+            return True
+        return False
+
+
+    def set_v_max(self, v_max):
+        if self._v_max != v_max:
+            self._v_max = v_max
+            if self._image:
+                self._image.set_clim(self._v_min, self._v_max)
+            return True
+        return False
+
+
+    def set_v_min(self, v_min):
+        if self._v_min != v_min:
+            self._v_min = v_min
+            if self._image:
+                self._image.set_clim(self._v_min, self._v_max)
+            return True
+        return False
+
+
+    def set_view(self, xlim, ylim):
+        """
+        Sets visible area of the image (in pixel coordinates of data array,
+        `ylim` is inverted like `imshow` draws it), it's limited by image size.
+        """
+        if not self._data:
+            return False
+        (x_min, x_max), (y_max, y_min) = self._full_limits()
+        x0, x1 = _fit_range(min(xlim), max(xlim), x_min, x_max)
+        y0, y1 = _fit_range(min(ylim), max(ylim), y_min, y_max)
+        view = ((x0, x1), (y1, y0))
+        if view == self._full_limits():
+            view = None
+        if view == self._view:
+            return False
+        self._view = view
+        self._draw_view()
+        return True
+
+
+    def set_x_axis_name(self, x_axis_name):
+        if self._x_axis_name != x_axis_name:
+            self._x_axis_name = x_axis_name
+            try:
+                self._draw_x_axis_name()
+                return True
+            except:
+                pass
+        return False
+
+
+    def set_y_axis_name(self, y_axis_name):
+        if self._y_axis_name != y_axis_name:
+            self._y_axis_name = y_axis_name
+            try:
+                self._draw_y_axis_name()
+                return True
+            except:
+                pass
+        return False
+
+
+    @property
+    def view(self):
+        """
+        Visible area of the image (xlim, ylim) or None for the whole image.
+        """
+        return self._view
+
+
+    def zoom(self, factor, x, y):
+        """
+        Zooms view in `factor` times (zooms out if `factor` < 1) around
+        (`x`, `y`) point.
+        """
+        if not self._data:
+            return False
+        xlim, ylim = self._visible_limits()
+        return self.set_view([x + (value - x) / factor for value in xlim],
+                             [y + (value - y) / factor for value in ylim])
+
+
+    def _clear(self):
+        self.ax.clear()
+        self._center_lines = []
+        self._frame = None
+        self._frame_circle = None
+        self._image = None
+
+
+    def _draw_axes_color(self):
+        if self._axes_color:
+            for axes in self.figure.axes:
+                for spines in axes.spines.keys():
+                    axes.spines[spines].set_color(self._axes_color)
+
+
+    def _draw_axes_labels_color(self):
+        if self._axes_labels_color:
+            self.ax.xaxis.label.set_color(self._axes_labels_color)
+            self.ax.yaxis.label.set_color(self._axes_labels_color)
+
+
+    def _draw_background(self):
+        self.figure.patch.set_facecolor(self._background_color)
+        if self._is_background_transparent:
+            self.ax.patch.set_alpha(0)
+        else:
+            self.figure.patch.set_alpha(1)
+            self.ax.patch.set_facecolor(self._background_color)
+            self.ax.patch.set_alpha(1)
+
+
+    def _draw_center_lines(self):
+        # lines are created hidden, so they can be shown without full redraw
+        props = {"xycoords": "axes fraction", "textcoords": "axes fraction",
+                 "arrowprops": {"color": self._center_lines_color,
+                 "arrowstyle": "-", "connectionstyle": "arc3"}}
+        self._center_lines = [
+            self.ax.annotate("", xy=(0, 0.5), xytext=(1, 0.5), **props),
+            self.ax.annotate("", xy=(0.5, 0), xytext=(0.5, 1), **props)]
+        for line in self._center_lines:
+            line.set_visible(bool(self._is_center_lines_displayed))
+
+
+    def _draw_center_lines_color(self):
+        for line in self._center_lines:
+            line.arrow_patch.set_color(self._center_lines_color)
+
+
+    def _draw_frame(self):
+        if self._data:
+            # circle frame (hidden if it isn't shown)
+            ada = AnchoredDrawingArea(0, 0, 0, 0, loc='center', pad=0.)
+            c = Circle((0, 0), 154, fill=False,
+                       edgecolor=self._frame_color, linewidth=5)
+            ada.drawing_area.add_artist(c)
+            ada.set_visible(bool(self._is_show_frame))
+            self.ax.add_artist(ada)
+            self._frame = ada
+            self._frame_circle = c
+
+
+    @instrumentation.timed("plot.full")
+    def _draw_full(self):
+        self._draw_axes_color()
+        self._draw_axes_labels_color()
+        self._draw_background()
+        self._draw_center_lines()
+        self._draw_frame()
+        self._draw_image()
+        self._draw_ticks_color()
+        self._draw_title()
+        self._draw_title_color()
+        self._draw_x_axis_name()
+        self._draw_y_axis_name()
+
+
+    @instrumentation.timed("plot.image")
+    def _draw_image(self):
+        if self._data:
+            array, extent = self._image_tile()
+            im = self.ax.imshow(array, cmap=self._colormap, extent=extent,
+                                vmin=self._v_min, vmax=self._v_max)
+            if extent or self._view:
+                self.ax.set_xlim(self._visible_limits()[0])
+                self.ax.set_ylim(self._visible_limits()[1])
+            with instrumentation.timer("plot.colorbar"):
+                if self._colorbar_axes is None:
+                    self._colorbar_axes = (
+                        mpl_toolkits.axes_grid1.make_axes_locatable(self.ax)
+                        .append_axes("right", size="5%", pad=0.05))
+                else: # reuse colorbar axes (removing them breaks the layout)
+                    self._colorbar_axes.clear()
+                self.figure.colorbar(im, cax=self._colorbar_axes)
+            # ticks are computed once per grid (see `Dataset.r_ticks`)
+            xticks, xticklabels = self._data.r_ticks
+            yticks, yticklabels = self._data.z_ticks
+            self.ax.set_xticks(xticks)
+            self.ax.set_yticks(yticks)
+            self.ax.set_xticklabels(xticklabels)
+            self.ax.set_yticklabels(yticklabels)
+
+            # cut border pixels
+            patch = Circle(raster.clip_center(self._data),
+                           radius=raster.CLIP_RADIUS,
+                           transform=self.ax.transData)
+            im.set_clip_path(patch)
+            self._image = im
+
+
+    @instrumentation.timed("plot.view")
+    def _draw_view(self):
+        if self._image:
+            xlim, ylim = self._visible_limits()
+            self.ax.set_xlim(xlim)
+            self.ax.set_ylim(ylim)
+            array, extent = self._image_tile()
+            self._image.set_data(array)
+            if extent:
+                self._image.set_extent(extent)
+
+
+    def _draw_ticks_color(self):
+        if self._ticks_color:
+            for axes in self.figure.axes:
+                axes.tick_params(axis="x", colors=self._ticks_color)
+                axes.tick_params(axis="y", colors=self._ticks_color)
+
+
+    def _draw_title(self):
+        self.ax.set_title(self._title, fontsize=14)
+
+
+    def _draw_title_color(self):
+        if self._title_color:
+            self.ax.title.set_color(self._title_color)
+
+
+    def _draw_x_axis_name(self):
+        self.ax.set_xlabel(self._x_axis_name, fontsize=14)
+
+
+    def _draw_y_axis_name(self):
+        self.ax.set_ylabel(self._y_axis_name, fontsize=14)
+
+
+    def _full_limits(self):
+        height, width = self._data.abs_plot.shape
+        return (-0.5, width - 0.5), (height - 0.5, -0.5)
+
+
+    def _get_pyramid(self, array):
+        # arrays are kept with their pyramids, so their ids aren't reused
+        key = id(array)
+        if key in self._pyramids and self._pyramids[key][0] is array:
+            self._pyramids.move_to_end(key)
+        else:
+            with instrumentation.timer("plot.pyramid"):
+                self._pyramids[key] = (array, Pyramid(array))
+            if len(self._pyramids) > PYRAMID_CACHE_SIZE:
+                self._pyramids.popitem(last=False)
+        return self._pyramids[key][1]
+
+
+    def _image_tile(self):
+        """
+        Returns array to draw and its extent (None for the whole data array).
+        """
+        if not self._pyramid:
+            return self._data.abs_plot, None
+        xlim, ylim = self._visible_limits()
+        bbox = self.ax.get_window_extent()
+        level = self._pyramid.level_for(abs(xlim[1] - xlim[0]),
+                                        abs(ylim[1] - ylim[0]),
+                                        bbox.width, bbox.height)
+        return self._pyramid.tile(level, xlim, ylim)
+
+
+    @instrumentation.timed("plot.tile")
+    def _render_tile(self, dpi, is_background_transparent, left, top, right,
+                     bottom, height):
+        """
+        Returns RGBA array of figure pixels [top:bottom, left:right] at
+        `dpi` (`height` is figure height in pixels).
+        """
+        # figure coordinates start at the bottom, bounds get a small margin,
+        # so the renderer size isn't rounded down
+        margin = 1e-3
+        bbox = Bbox([[left / dpi, (height - bottom) / dpi],
+                     [(right + margin) / dpi, (height - top + margin) / dpi]])
+        buffer = io.BytesIO()
+        self.figure.savefig(buffer, format="rgba", dpi=dpi,
+                            transparent=is_background_transparent,
+                            bbox_inches=bbox)
+        return np.frombuffer(buffer.getbuffer(), np.uint8).reshape(
+            bottom - top, right - left, 4)
+
+
+    def _visible_limits(self):
+        return self._view or self._full_limits()
+
+
+class _RenderedBbox(BboxBase):
+    """
+    Part of `bbox` inside the rendered area of `figure` (figure bbox is
+    replaced while a tile is saved).
+    """
+    def __init__(self, bbox, figure):
+        super().__init__()
+        self._bbox = bbox
+        self._figure = figure
+
+
+    def get_points(self):
+        bbox = Bbox.intersection(self._bbox, self._figure.bbox)
+        if bbox is None: # nothing is drawn (the box has no area)
+            return np.zeros((2, 2))
+        return bbox.get_points()
+
+
+def _fit_range(start, end, minimum, maximum):
+    """
+    Returns (start, end) range moved and shrinked to fit into
+    [minimum, maximum].
+    """
+    size = min(max(end - start, MIN_VIEW_SIZE), maximum - minimum)
+    start = min(max(start, minimum), maximum - size)
+    return start, start + size
+
+
+def _is_same_grid(data, other):
+    return (all(getattr(data, name) == getattr(other, name) for name in GRID)
+            and data.abs_plot.shape == other.abs_plot.shape)
+
+
+def _pyramid_source(data):
+    """
+    Returns array that `data` map belongs to: the cube of channels or the map
+    itself (None for no data).
+    """
+    if not data:
+        return None
+    return data.channels if data.channels is not None else data.abs_plot
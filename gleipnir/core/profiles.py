@@ -0,0 +1,178 @@
+"""
+Profiles is a module for radial and azimuthal profiles of the data disk (the
+pixels inside the circle clip of the plot, see `gleipnir/core/raster.py`):
+    profile = profiles.profile(data, profiles.RADIAL)
+    profile.save("profile.csv")
+
+Pixels are binned by their physical coordinates (`Dataset.r`, `Dataset.z`)
+relative to the disk center: by distance for radial profiles, by angle
+(degrees counterclockwise from the r axis) for azimuthal ones. Bin index of
+every pixel depends only on the grid, so it's computed once per grid, kind,
+number of bins and center and cached (`BINNING_CACHE_SIZE` recent
+binnings) with pixels sorted by bins. A profile then reads only the pixels
+of the disk in that order: counts and means are computed with
+`np.bincount`, medians over contiguous runs of bins. NaN values are
+skipped.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import collections
+import os
+import warnings
+
+import numpy as np
+
+import gleipnir.core.raster as raster
+import gleipnir.utils.instrumentation as instrumentation
+
+
+AZIMUTHAL = "azimuthal"
+RADIAL = "radial"
+
+# Number of binnings (bin index maps) kept for recently used grids.
+BINNING_CACHE_SIZE = 8
+
+# Coordinate name of profile bins by profile kind.
+COORDINATES = {AZIMUTHAL: "angle", RADIAL: "radius"}
+
+# Default number of bins by profile kind (a bin per pixel for radial ones).
+DEFAULT_BINS = {AZIMUTHAL: 36, RADIAL: raster.CLIP_RADIUS}
+
+# Profile file formats by extension.
+FORMATS = ("csv", "npy")
+
+_binnings = collections.OrderedDict() # key: _Binning
+
+
+class Profile:
+    def __init__(self, kind, edges, count, mean, median):
+        self.kind = kind
+        self.edges = edges
+        self.count = count
+        self.mean = mean
+        self.median = median
+
+
+    @property
+    def centers(self):
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+
+    def save(self, file_path):
+        """
+        Writes the profile to CSV or NPY (structured array) `file_path`.
+        Raises ValueError for other extensions.
+        """
+        extension = os.path.splitext(file_path)[1][1:].lower()
+        if extension not in FORMATS:
+            raise ValueError(f"Unknown profile format {extension!r}, "
+                             f"supported: {', '.join(FORMATS)}")
+        table = self.to_array()
+        if extension == "npy":
+            np.save(file_path, table)
+        else:
+            np.savetxt(file_path, table, delimiter=",", comments="",
+                       header=",".join(table.dtype.names),
+                       fmt=("%.10g", "%.10g", "%.10g", "%d", "%.10g",
+                            "%.10g"))
+
+
+    def to_array(self):
+        """
+        Returns structured array with a row per bin: coordinate of the bin
+        center, bin edges, number of values, mean and median.
+        """
+        coordinate = COORDINATES[self.kind]
+        table = np.empty(len(self.count), dtype=[
+            (coordinate, np.float64), (f"{coordinate}_min", np.float64),
+            (f"{coordinate}_max", np.float64), ("count", np.int64),
+            ("mean", np.float64), ("median", np.float64)])
+        table[coordinate] = self.centers
+        table[f"{coordinate}_min"] = self.edges[:-1]
+        table[f"{coordinate}_max"] = self.edges[1:]
+        table["count"] = self.count
+        table["mean"] = self.mean
+        table["median"] = self.median
+        return table
+
+
+def disk_center(data):
+    """
+    Returns physical center (r, z) of the disk of `data` (the center of the
+    circle clip).
+    """
+    x, y = raster.clip_center(data)
+    return float(data.r[x]), float(data.z[::-1][y])
+
+
+@instrumentation.timed("profile")
+def profile(data, kind=RADIAL, bins=None, center=None):
+    """
+    Returns `Profile` of `kind` (`RADIAL` or `AZIMUTHAL`) of `data` disk
+    with `bins` bins (see `DEFAULT_BINS`) around physical `center` (r, z),
+    `disk_center` by default.
+    """
+    if kind not in DEFAULT_BINS:
+        raise ValueError(f"Unknown profile kind {kind!r}")
+    bins = bins or DEFAULT_BINS[kind]
+    center = tuple(map(float, center)) if center else disk_center(data)
+    binning = _get_binning(data, kind, bins, center)
+
+    # only pixels of the disk are read, they are sorted by bins
+    values = data.abs_plot[binning.rows, binning.columns]
+    is_nan = np.isnan(values)
+    index = np.where(is_nan, bins, binning.index) # NaN goes to the extra bin
+    count = np.bincount(index, minlength=bins + 1)[:bins]
+    sums = np.bincount(index, weights=np.where(is_nan, 0, values),
+                       minlength=bins + 1)[:bins]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = sums / count
+
+    median = np.full(bins, np.nan) # empty bins give NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for i in np.flatnonzero(count):
+            median[i] = np.nanmedian(
+                values[binning.splits[i]:binning.splits[i + 1]])
+    return Profile(kind, binning.edges, count, mean, median)
+
+
+class _Binning:
+    """
+    Pixels of the disk (`rows`, `columns`) sorted by their bin `index`,
+    `splits` are the first pixels of bins.
+    """
+    def __init__(self, data, kind, bins, center):
+        rows, columns = np.nonzero(raster.clip_mask(data))
+        r = data.r[columns] - center[0]
+        z = data.z[::-1][rows] - center[1] # the first row is the top
+        if kind == RADIAL:
+            coordinate = np.hypot(r, z)
+            self.edges = np.linspace(0, coordinate.max(initial=0.0) or 1.0,
+                                     bins + 1)
+        else:
+            coordinate = np.degrees(np.arctan2(z, r)) % 360
+            self.edges = np.linspace(0, 360, bins + 1)
+        index = np.minimum(
+            (coordinate / self.edges[-1] * bins).astype(np.intp), bins - 1)
+        order = np.argsort(index, kind="stable")
+        self.rows = rows[order]
+        self.columns = columns[order]
+        self.index = index[order]
+        self.splits = np.searchsorted(self.index, np.arange(bins + 1))
+
+
+def _get_binning(data, kind, bins, center):
+    key = (tuple(getattr(data, name) for name in ("nR", "nZ", "dr", "dz",
+                                                  "r0", "z0")),
+           kind, bins, center)
+    if key in _binnings:
+        _binnings.move_to_end(key)
+    else:
+        with instrumentation.timer("profile.binning"):
+            _binnings[key] = _Binning(data, kind, bins, center)
+        if len(_binnings) > BINNING_CACHE_SIZE:
+            _binnings.popitem(last=False)
+    return _binnings[key]
@@ -0,0 +1,74 @@
+"""
+Pyramid is a helper class with multi-resolution (level of detail) versions of
+a 2-D array, so an image can be drawn from the data of screen resolution
+instead of resampling the whole array on every redraw.
+
+Level 0 is the array itself, every next level is 2 times smaller: its values
+are NaN-aware means of 2x2 blocks of the previous level (exact means of the
+not NaN values of the whole block of the original array).
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import math
+
+import numpy as np
+
+
+# Levels are built until both sides are not greater than this size.
+MIN_LEVEL_SIZE = 256
+
+
+class Pyramid:
+    def __init__(self, array, min_level_size=MIN_LEVEL_SIZE):
+        self.shape = array.shape
+        self.levels = [array]
+
+        sums = np.where(np.isnan(array), 0, array)
+        counts = (~np.isnan(array)).astype(np.int32)
+        while max(sums.shape) > min_level_size:
+            sums = _block_sum(sums)
+            counts = _block_sum(counts)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.levels.append(sums / counts)
+
+
+    def level_for(self, width, height, width_px, height_px):
+        """
+        Returns the coarsest level that has at least `width_px` x `height_px`
+        values over `width` x `height` area of the original array.
+        """
+        level = 0
+        while (level + 1 < len(self.levels)
+               and width / 2**(level + 1) >= width_px
+               and height / 2**(level + 1) >= height_px):
+            level += 1
+        return level
+
+
+    def tile(self, level, xlim, ylim):
+        """
+        Returns part of `level` that covers `xlim` x `ylim` area (in pixel
+        coordinates of the original array, as `imshow` draws it) and its
+        extent for `imshow`.
+        """
+        scale = 2**level
+        array = self.levels[level]
+        # one value margin, so the edges are drawn without gaps
+        c0 = max(math.floor((min(xlim) + 0.5) / scale) - 1, 0)
+        c1 = min(math.ceil((max(xlim) + 0.5) / scale) + 1, array.shape[1])
+        r0 = max(math.floor((min(ylim) + 0.5) / scale) - 1, 0)
+        r1 = min(math.ceil((max(ylim) + 0.5) / scale) + 1, array.shape[0])
+        extent = (c0 * scale - 0.5, c1 * scale - 0.5,
+                  r1 * scale - 0.5, r0 * scale - 0.5)
+        return array[r0:r1, c0:c1], extent
+
+
+def _block_sum(array):
+    """
+    Returns sums of 2x2 blocks of `array` (odd sides are padded with zeros).
+    """
+    h, w = array.shape
+    array = np.pad(array, ((0, h % 2), (0, w % 2)))
+    return array.reshape((h + 1) // 2, 2, (w + 1) // 2, 2).sum(axis=(1, 3))
@@ -0,0 +1,113 @@
+"""
+Raster is a module for raw export of the data image: colormapped "AbsPlot"
+values at native grid resolution (a pixel per value) without axes, title and
+colorbar. It doesn't draw a figure, so it's much faster than `Plotter.save`:
+    write_raster("map.png", data, "CMRmap", 0.0, 0.2)
+
+Values are normalized with `v_min` and `v_max` and mapped to colors with a
+lookup table of the colormap (see `make_lut` at
+`gleipnir/core/colormaps.py`), values outside the range get the first or
+the last color like in Matplotlib. NaN values and pixels outside the circle
+clip (the same as the plot's one) are transparent. Images are written with
+Pillow as RGBA PNG or TIFF.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import functools
+import os
+
+import numpy as np
+
+import gleipnir.core.colormaps as cmap
+import gleipnir.utils.instrumentation as instrumentation
+
+
+# Radius (pixels) of the circle clip of the image (border pixels are cut).
+CLIP_RADIUS = 47
+
+# Image formats of raw export by file extension (Pillow format names).
+FORMATS = {"png": "PNG", "tif": "TIFF", "tiff": "TIFF"}
+
+# zlib compression level of PNG (the fastest, the image is mostly flat).
+PNG_COMPRESS_LEVEL = 1
+
+
+def clip_center(data):
+    """
+    Returns center (x, y) of the circle clip of `data` image in pixels.
+    """
+    return data["nR"] // 2, data["nZ"] // 2
+
+
+def clip_mask(data):
+    """
+    Returns bool array of `data` image pixels inside the circle clip.
+    """
+    return _clip_mask(data["AbsPlot"].shape[-2:], clip_center(data))
+
+
+def colorize(array, colormap, v_min, v_max, mask=None):
+    """
+    Returns uint8 RGBA image of `array` values mapped to `colormap` colors.
+    NaN values and values outside `mask` (bool array of visible pixels) are
+    transparent.
+    """
+    lut = _lut(colormap)
+    size = len(lut) - 1 # the last color is transparent
+    scale = size / (v_max - v_min) if v_max > v_min else 0.0
+    index = np.subtract(array, v_min, dtype=np.float32)
+    index *= scale
+    np.clip(index, 0, size - 1, out=index)
+    hidden = np.isnan(index)
+    if mask is not None:
+        hidden |= ~mask
+    np.copyto(index, size, where=hidden)
+    return lut[index.astype(np.uint16)]
+
+
+def is_raster_file(file_path):
+    return _extension(file_path) in FORMATS
+
+
+@instrumentation.timed("export.raw")
+def write_raster(file_path, data, colormap, v_min, v_max):
+    """
+    Writes colormapped "AbsPlot" image of `data` to PNG or TIFF `file_path`.
+    """
+    extension = _extension(file_path)
+    if extension not in FORMATS:
+        raise ValueError(f"Raw image format must be one of "
+                         f"{', '.join(FORMATS)}, not {extension!r}")
+    if v_min > v_max:
+        raise ValueError("v_min must be less than or equal to v_max")
+    from PIL import Image # isn't imported at application startup
+
+    image = colorize(data["AbsPlot"], colormap, v_min, v_max,
+                     clip_mask(data))
+    options = ({"compress_level": PNG_COMPRESS_LEVEL}
+               if FORMATS[extension] == "PNG" else {})
+    Image.fromarray(image, "RGBA").save(file_path, FORMATS[extension],
+                                        **options)
+
+
+@functools.lru_cache(maxsize=8)
+def _clip_mask(shape, center):
+    height, width = shape
+    x, y = center
+    mask = ((np.arange(width) - x) ** 2
+            + (np.arange(height)[:, np.newaxis] - y) ** 2 <= CLIP_RADIUS ** 2)
+    mask.flags.writeable = False
+    return mask
+
+
+def _extension(file_path):
+    return os.path.splitext(file_path)[1][1:].lower()
+
+
+@functools.lru_cache(maxsize=16)
+def _lut(colormap):
+    lut = np.zeros((cmap.LUT_SIZE + 1, 4), np.uint8)
+    lut[:-1] = cmap.make_lut(colormap, cmap.LUT_SIZE)
+    return lut
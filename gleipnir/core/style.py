@@ -0,0 +1,72 @@
+"""
+Style is a module with plot style properties: their default values and
+reading of style configs (JSON files). It doesn't import Matplotlib, so the
+model can use it without slowing down application startup.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import json
+
+
+# Default values of the plot style properties (names match `Model`
+# properties).
+DEFAULT_STYLE = {
+    "axes_color": "#344291",
+    "axes_labels_color": "#4e63e3",
+    "background_color": "#0f1016",
+    "center_lines_color": "#344291",
+    "colormap": "CMRmap",
+    "dpi": 100,
+    "figsize": (6, 6),
+    "frame_color": "#0f1016",
+    "is_background_transparent": True,
+    "is_center_lines_displayed": True,
+    "is_show_frame": False,
+    "ticks_color": "#4e63e3",
+    "title": "Title",
+    "title_color": "#4e63e3",
+    "v_max": 0.2,
+    "v_min": 0.0,
+    "x_axis_name": "X Axis Name",
+    "y_axis_name": "Y Axis Name"}
+
+
+def check_style(style):
+    """
+    Raises ValueError if `style` dict has properties not in `DEFAULT_STYLE`.
+    """
+    unknown = set(style) - set(DEFAULT_STYLE)
+    if unknown:
+        raise ValueError("Unknown style properties: "
+                         + ", ".join(sorted(unknown)))
+
+
+def load_style(style=None):
+    """
+    Returns full style dict: default values updated with `style` (dict or
+    path of JSON file).
+    """
+    full_style = dict(DEFAULT_STYLE)
+    if isinstance(style, dict):
+        check_style(style)
+        full_style.update(style)
+    elif style:
+        full_style.update(read_style(style))
+    return full_style
+
+
+def read_style(file_path):
+    """
+    Returns style dict (only properties specified in the file) from JSON
+    `file_path`.
+    """
+    with open(file_path, "r") as f:
+        style = json.load(f)
+    if not isinstance(style, dict):
+        raise ValueError("Style must be a JSON object")
+    check_style(style)
+    if "figsize" in style:
+        style["figsize"] = tuple(style["figsize"])
+    return style
@@ -0,0 +1,131 @@
+"""
+Exporter is a module for saving images in a background thread, so the window
+stays responsive (and plot can be edited) while big or high DPI images are
+saved.
+
+Export doesn't use the figure of the plot widget, `ExportJob` is a snapshot
+of the data, style and view at the moment of the request (see
+`Model.export_job`), it's drawn on its own off-screen figure (see
+`gleipnir.core.render`). Jobs are queued and run one after another in the
+order of requests, results are delivered to the GUI thread with queued
+signals.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+from PyQt6.QtCore import pyqtSignal as Signal
+from PyQt6.QtCore import QObject
+from PyQt6.QtCore import QRunnable
+from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QThreadPool
+
+import gleipnir.core as core
+import gleipnir.utils.instrumentation as instrumentation
+
+
+class ExportJob:
+    def __init__(self, file_path, data, style, view=None, is_raw=False):
+        self.file_path = file_path
+        self.data = data
+        self.style = style
+        self.view = view
+        self.is_raw = is_raw
+
+
+    @instrumentation.timed("export")
+    def run(self):
+        core.render(self.data, self.style, self.file_path, self.is_raw,
+                    self.view)
+
+
+class DataExporter(QObject):
+    failed = Signal(str, object) # file path, exception
+    finished = Signal(str) # file path
+    progress = Signal(int, int) # finished jobs, all jobs of the queue
+    started = Signal(str) # file path
+
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        # a single thread runs jobs in the order of requests
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._done = 0
+        self._total = 0
+
+        self._signals = _ExportTaskSignals()
+        connection = Qt.ConnectionType.QueuedConnection
+        self._signals.failed.connect(self._on_failed, connection)
+        self._signals.finished.connect(self._on_finished, connection)
+        self._signals.started.connect(self.started, connection)
+
+
+    @property
+    def is_exporting(self):
+        return self._done < self._total
+
+
+    @property
+    def queued(self):
+        """
+        Number of jobs that aren't finished yet.
+        """
+        return self._total - self._done
+
+
+    def export(self, job):
+        self._total += 1
+        self._pool.start(_ExportTask(job, self._signals))
+        self.progress.emit(self._done, self._total)
+
+
+    def wait(self, msecs=-1):
+        """
+        Waits until all jobs are finished (or `msecs` ms), returns True if
+        they are finished.
+        """
+        return self._pool.waitForDone(msecs)
+
+
+    def _on_failed(self, file_path, exception):
+        self._step()
+        self.failed.emit(file_path, exception)
+
+
+    def _on_finished(self, file_path):
+        self._step()
+        self.finished.emit(file_path)
+
+
+    def _step(self):
+        self._done += 1
+        self.progress.emit(self._done, self._total)
+        if self._done == self._total: # the queue is empty, start counting anew
+            self._done = 0
+            self._total = 0
+
+
+class _ExportTaskSignals(QObject):
+    failed = Signal(str, object)
+    finished = Signal(str)
+    started = Signal(str)
+
+
+class _ExportTask(QRunnable):
+    def __init__(self, job, signals):
+        super().__init__()
+
+        self._job = job
+        self._signals = signals
+
+
+    def run(self):
+        self._signals.started.emit(self._job.file_path)
+        try:
+            self._job.run()
+        except Exception as e:
+            self._signals.failed.emit(self._job.file_path, e)
+        else:
+            self._signals.finished.emit(self._job.file_path)
@@ -0,0 +1,119 @@
+"""
+Loader is a module for reading data files in a background thread, so the
+window stays responsive while big files are loading.
+
+`DataLoader.load` starts reading at the thread pool and cancels the previous
+request (if it isn't finished yet). Results of the worker thread are
+delivered to the GUI thread with queued signals.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import os
+import threading
+
+from PyQt6.QtCore import pyqtSignal as Signal
+from PyQt6.QtCore import QObject
+from PyQt6.QtCore import QRunnable
+from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QThreadPool
+
+import gleipnir.core.cache as cache
+import gleipnir.core.parser as parser
+
+
+class DataLoader(QObject):
+    failed = Signal(str, object) # file path, exception
+    loaded = Signal(str, object) # file path, data
+    progress = Signal(str, object, object) # stage, done bytes, total bytes
+
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._pool = QThreadPool(self)
+        self._request_id = 0
+        self._task = None
+
+        self._signals = _LoadTaskSignals()
+        connection = Qt.ConnectionType.QueuedConnection
+        self._signals.failed.connect(self._on_failed, connection)
+        self._signals.finished.connect(self._on_finished, connection)
+        self._signals.progress.connect(self._on_progress, connection)
+
+
+    @property
+    def is_loading(self):
+        return self._task is not None
+
+
+    def cancel(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+    def load(self, file_path):
+        self.cancel()
+        self._request_id += 1
+        self._task = _LoadTask(self._request_id, file_path, self._signals)
+        self._pool.start(self._task)
+
+
+    def _on_failed(self, request_id, file_path, exception):
+        if request_id == self._request_id:
+            self._task = None
+            self.failed.emit(file_path, exception)
+
+
+    def _on_finished(self, request_id, file_path, data):
+        if request_id == self._request_id:
+            self._task = None
+            self.loaded.emit(file_path, data)
+
+
+    def _on_progress(self, request_id, stage, done, total):
+        if request_id == self._request_id:
+            self.progress.emit(stage, done, total)
+
+
+class _LoadTaskSignals(QObject):
+    failed = Signal(int, str, object)
+    finished = Signal(int, str, object)
+    progress = Signal(int, str, object, object)
+
+
+class _LoadTask(QRunnable):
+    def __init__(self, request_id, file_path, signals):
+        super().__init__()
+
+        self._cancelled = threading.Event()
+        self._file_path = file_path
+        self._request_id = request_id
+        self._signals = signals
+
+
+    def cancel(self):
+        self._cancelled.set()
+
+
+    def run(self):
+        try:
+            if not os.path.exists(self._file_path):
+                raise FileNotFoundError(self._file_path)
+            data = cache.read(self._file_path, progress=self._on_progress,
+                              is_cancelled=self._cancelled.is_set)
+            data.histogram # auto-contrast histogram isn't computed by GUI
+        except parser.Cancelled:
+            return
+        except Exception as e:
+            self._signals.failed.emit(self._request_id, self._file_path, e)
+        else:
+            if not self._cancelled.is_set():
+                self._signals.finished.emit(self._request_id, self._file_path,
+                                            data)
+
+
+    def _on_progress(self, stage, done, total):
+        self._signals.progress.emit(self._request_id, stage, done, total)
@@ -8,20 +8,57 @@ Development notes:
     1) Mention it inside `Model._init_properties` function as Property.
     2) Add setter and getter of this property.
 
+    Several properties can be changed at once with `Model.batch` (e.g. style
+    preset loading): `changed` signals are emitted once after the batch, only
+    for changed properties (the plot widget merges them into a single
+    redraw).
+
+    `is_input_file_watched` enables reloading of the input file when it's
+    changed (see `gleipnir/model/watcher.py`).
+
+    `auto_contrast` (percent of data values inside of the color limits or
+    None) sets `v_min` and `v_max` from the histogram of every loaded file
+    (see `gleipnir/core/histogram.py`), so they aren't tuned by hand.
+
+    `is_raw_export` makes `data_write` save only the colormapped image at grid
+    resolution instead of the figure (see `gleipnir/core/raster.py`).
+
+    `export_job` makes a snapshot of the current data and style for saving in
+    background (see `gleipnir/model/exporter.py`). Images are drawn on an
+    off-screen figure at `dpi`, the plot widget is a preview at screen
+    resolution.
+
+    Data with velocity channels has `channel_count` > 1, `channel` property
+    selects a channel to display (`data` value is `Dataset` with "AbsPlot" of
+    the selected channel, see `gleipnir/core/dataset.py`). Channels are
+    loaded through `ChannelCache`, neighbors of the selected channel are
+    prefetched in background.
+
 Author: Artem Shepelin
 License: GPLv3
 """
 
+import contextlib
 import os
 
-import matplotlib.pyplot
 import numpy as np
 from PyQt6.QtCore import pyqtSignal as Signal
 
-import gleipnir.utils.colormaps as cmap
+import gleipnir.core.cache as cache
+from gleipnir.core.channels import ChannelCache
+import gleipnir.core.colormaps as cmap
+from gleipnir.core.style import check_style
+from gleipnir.core.style import DEFAULT_STYLE
+from gleipnir.core.style import read_style
+from gleipnir.model.exporter import ExportJob
+import gleipnir.utils.instrumentation as instrumentation
 from gleipnir.utils.property import Property
 
 
+# Number of channels prefetched on both sides of the selected channel.
+PREFETCH_CHANNELS = 2
+
+
 class Model:
     def __init__(self):
         super().__init__()
@@ -29,34 +66,73 @@ class Model:
 
 
     def _init_properties(self):
-        cmap.add_viewer_standard_colormap()
-        self._colormaps = matplotlib.pyplot.colormaps()
-
-        self._axes_color = Property("#344291")
-        self._axes_labels_color = Property("#4e63e3")
-        self._background_color = Property("#0f1016")
-        self._center_lines_color = Property("#344291")
-        self._colormap = Property("CMRmap")
+        # Matplotlib isn't imported if names are cached
+        self._colormaps = cmap.colormap_names(cache.colormaps_file())
+        self._colormap_thumbnails = cmap.ThumbnailCache(
+            cache.colormap_thumbnails_file())
+        style = DEFAULT_STYLE
+
+        self._auto_contrast = Property(None)
+        self._axes_color = Property(style["axes_color"])
+        self._axes_labels_color = Property(style["axes_labels_color"])
+        self._background_color = Property(style["background_color"])
+        self._center_lines_color = Property(style["center_lines_color"])
+        self._channel = Property(0)
+        self._channel_count = Property(1)
+        self._colormap = Property(style["colormap"])
         self._data = Property(None)
-        self._dpi = Property(100)
-        self._figsize = Property((6, 6))
-        self._frame_color = Property("#0f1016")
+        self._dpi = Property(style["dpi"])
+        self._figsize = Property(style["figsize"])
+        self._frame_color = Property(style["frame_color"])
         self._input_file = Property("")
-        self._is_background_transparent = Property(True)
-        self._is_center_lines_displayed = Property(True)
-        self._is_show_frame = Property(False)
+        self._is_background_transparent = Property(style["is_background_transparent"])
+        self._is_center_lines_displayed = Property(style["is_center_lines_displayed"])
+        self._is_input_file_watched = Property(False)
+        self._is_raw_export = Property(False)
+        self._is_show_frame = Property(style["is_show_frame"])
         self._output_file = Property("")
-        self._ticks_color = Property("#4e63e3")
-        self._title = Property("Title")
-        self._title_color = Property("#4e63e3")
-        self._v_max = Property(0.2)
-        self._v_min = Property(0.0)
-        self._x_axis_name = Property("X Axis Name")
-        self._y_axis_name = Property("Y Axis Name")
-
+        self._ticks_color = Property(style["ticks_color"])
+        self._title = Property(style["title"])
+        self._title_color = Property(style["title_color"])
+        self._v_max = Property(style["v_max"])
+        self._v_min = Property(style["v_min"])
+        self._x_axis_name = Property(style["x_axis_name"])
+        self._y_axis_name = Property(style["y_axis_name"])
+
+        self._batch_depth = 0
+        self._channels = None
+        self._cube_data = None
+
+        self.auto_contrast.changed.connect(self.apply_auto_contrast)
         self.data.changed.connect(self._on_file_open)
 
 
+    def apply_auto_contrast(self):
+        """
+        Sets `v_min` and `v_max` that keep `auto_contrast` percent of the
+        current data values inside (see `Dataset.histogram`).
+        """
+        data = self.data.value
+        if self.auto_contrast.value is None or not data:
+            return
+        v_min, v_max = data.histogram.limits(self.auto_contrast.value)
+        if np.isnan(v_min): # no values, e.g. an empty channel
+            return
+        with self.batch():
+            self.v_min = v_min
+            self.v_max = v_max
+
+
+    @property
+    def auto_contrast(self):
+        return self._auto_contrast
+
+
+    @auto_contrast.setter
+    def auto_contrast(self, value):
+        self._auto_contrast.setValue(value)
+
+
     @property
     def axes_color(self):
         return self._axes_color
@@ -87,6 +163,24 @@ class Model:
         self._background_color.setValue(value)
 
 
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Context manager that defers `changed` signals of all properties until
+        the end of (outermost) batch.
+        """
+        if self._batch_depth == 0:
+            for prop in self._properties().values():
+                prop.defer()
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._commit()
+
+
     @property
     def center_lines_color(self):
         return self._center_lines_color
@@ -97,6 +191,27 @@ class Model:
         self._center_lines_color.setValue(value)
 
 
+    @property
+    def channel(self):
+        return self._channel
+
+
+    @channel.setter
+    def channel(self, value):
+        if self._channels is None or not 0 <= value < len(self._channels):
+            return
+        self._data.setValue(self._channel_data(value))
+        self._channel.setValue(value)
+        self._channels.prefetch(
+            index for offset in range(1, PREFETCH_CHANNELS + 1)
+            for index in (value + offset, value - offset))
+
+
+    @property
+    def channel_count(self):
+        return self._channel_count
+
+
     @property
     def colormap(self):
         return self._colormap
@@ -107,6 +222,11 @@ class Model:
         self._colormap.setValue(value)
 
 
+    @property
+    def colormap_thumbnails(self):
+        return self._colormap_thumbnails
+
+
     @property
     def colormaps(self):
         return self._colormaps
@@ -122,60 +242,48 @@ class Model:
         if self.input_file.value != file_path:
             self.input_file = file_path
         if os.path.exists(file_path):
-            f = open(file_path, "r")
-            f_list = f.read().split("\n")
-            f.close()
-
-            get_parameter = lambda lst, i: lst[i].split(" ")[-1]
-            get_int = lambda lst, i: int(get_parameter(lst, i))
-            get_float = lambda lst, i: float(get_parameter(lst, i))
-
-            try:
-                nR = get_int(f_list, 0)
-                nZ = get_int(f_list, 1)
-                dr = get_float(f_list, 2)
-                dz = get_float(f_list, 3)
-                r0 = get_float(f_list, 4)
-                z0 = get_float(f_list, 5)
-                V1 = get_float(f_list, 6)
-                V2 = get_float(f_list, 7)
-                dV = get_float(f_list, 8)
-                Incl = get_float(f_list, 9)
-                ENA = get_float(f_list, 10)
-                Coeff = get_float(f_list, 11)
-
-                AbsPlot = np.array([float(i) for i in f_list[-2].split(" ")[:-1]])
-                AbsPlot = AbsPlot[::-1].reshape(nR + 1, nZ + 1).T
-                AbsPlot[AbsPlot == 0] = None # Set all 0 values to None
-
-                input_data = {
-                    "nR": nR,
-                    "nZ": nZ,
-                    "dr": dr,
-                    "dz": dz,
-                    "r0": r0,
-                    "z0": z0,
-                    "V1": V1,
-                    "V2": V2,
-                    "dV": dV,
-                    "Incl": Incl,
-                    "ENA": ENA,
-                    "Coeff": Coeff,
-                    "AbsPlot": AbsPlot}
-
-                self._data.setValue(input_data)
-            except:
-                raise Exception # Invalid File Format
-                return
+            self.data_loaded(file_path, cache.read(file_path))
         else:
             raise FileNotFoundError
 
 
-    def data_write(self, file_path, figure):
-        if self.output_file.value != file_path:
-            self.output_file = file_path
-        figure.savefig(self.output_file.value, dpi=self.dpi.value,
-                       transparent=self.is_background_transparent.value)
+    @instrumentation.timed("model.data")
+    def data_loaded(self, file_path, data):
+        """
+        Sets loaded `data` of `file_path`. The selected channel is kept if
+        the same file is loaded again (e.g. watched file is updated).
+        """
+        channel = 0
+        if (self.input_file.value == file_path and self._channels is not None
+                and data.channels is not None
+                and len(data.channels) == len(self._channels)):
+            channel = self._channel.value
+        if self.input_file.value != file_path:
+            self.input_file = file_path
+        if self._channels is not None:
+            self._channels.shutdown()
+        if data.channels is not None:
+            self._channels = ChannelCache(data.channels)
+            self._cube_data = data
+        else:
+            self._channels = None
+            self._cube_data = None
+        if self._channels is not None:
+            self._channel_count.setValue(len(self._channels))
+            self.channel = channel
+        else:
+            self._channel_count.setValue(1)
+            self._channel.setValue(0)
+            self._data.setValue(data)
+        self.apply_auto_contrast()
+
+
+    def data_write(self, file_path, view=None):
+        """
+        Saves the current data with the current style to `file_path` in the
+        current thread (see `export_job`).
+        """
+        self.export_job(file_path, view).run()
 
 
     @property
@@ -188,6 +296,17 @@ class Model:
         self._dpi.setValue(value)
 
 
+    def export_job(self, file_path, view=None):
+        """
+        Returns `ExportJob` that saves the current data with the current style
+        (and visible area `view` of the plot) to `file_path`.
+        """
+        if self.output_file.value != file_path:
+            self.output_file = file_path
+        return ExportJob(file_path, self.data.value, self.get_style(), view,
+                         self.is_raw_export.value)
+
+
     @property
     def figsize(self):
         return self._figsize
@@ -208,6 +327,10 @@ class Model:
         self._frame_color.setValue(value)
 
 
+    def get_style(self):
+        return {name: getattr(self, name).value for name in DEFAULT_STYLE}
+
+
     @property
     def input_file(self):
         return self._input_file
@@ -238,6 +361,26 @@ class Model:
         self._is_center_lines_displayed.setValue(value)
 
 
+    @property
+    def is_input_file_watched(self):
+        return self._is_input_file_watched
+
+
+    @is_input_file_watched.setter
+    def is_input_file_watched(self, value):
+        self._is_input_file_watched.setValue(value)
+
+
+    @property
+    def is_raw_export(self):
+        return self._is_raw_export
+
+
+    @is_raw_export.setter
+    def is_raw_export(self, value):
+        self._is_raw_export.setValue(value)
+
+
     @property
     def is_show_frame(self):
         return self._is_show_frame
@@ -258,6 +401,23 @@ class Model:
         self._output_file.setValue(value)
 
 
+    def set_style(self, style):
+        """
+        Sets style properties from `style` dict (see `DEFAULT_STYLE`) in a
+        single batch.
+        """
+        check_style(style)
+        if "colormap" in style and style["colormap"] not in self._colormaps:
+            raise ValueError(f"Unknown colormap {style['colormap']}")
+        with self.batch():
+            for name, value in style.items():
+                getattr(self, name).setValue(value)
+
+
+    def style_read(self, file_path):
+        self.set_style(read_style(file_path))
+
+
     @property
     def ticks_color(self):
         return self._ticks_color
@@ -328,7 +488,27 @@ class Model:
         self._y_axis_name.setValue(value)
 
 
+    def _channel_data(self, index):
+        return self._cube_data.with_abs_plot(self._channels.get(index))
+
+
+    def _commit(self):
+        # all properties are committed before handlers see the new values
+        changed = [prop for prop in self._properties().values()
+                   if prop.commit()]
+        for prop in changed:
+            prop.emit()
+
+
     def _on_file_open(self):
         path_head, path_tail = os.path.split(self.input_file.value)
         name, ext = os.path.splitext(path_tail)
-        self.output_file = os.path.join(path_head, name + ".png")
\ No newline at end of file
+        self.output_file = os.path.join(path_head, name + ".png")
+
+
+    def _properties(self):
+        """
+        Returns dict of data properties by their names.
+        """
+        return {name[1:]: value for name, value in vars(self).items()
+                if isinstance(value, Property)}
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Watcher is a module for watching a data file that is written by a running
+simulation, so the plot follows the simulation without reopening the file.
+
+`FileWatcher` is notified by `QFileSystemWatcher` (inotify on Linux). The
+file and its directory are watched, so files that are replaced (written to a
+temporary file and renamed) or deleted and created again are still tracked.
+Notifications aren't delivered on some file systems (e.g. NFS of computing
+clusters), so the file is also polled with `os.stat` at a slow rate.
+
+Notifications are debounced: `changed` signal is emitted only when the file
+hasn't changed for `debounce` milliseconds and it's complete (see
+`parser.is_complete`), so partially written files aren't read.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import os
+
+from PyQt6.QtCore import pyqtSignal as Signal
+from PyQt6.QtCore import QFileSystemWatcher
+from PyQt6.QtCore import QObject
+from PyQt6.QtCore import QTimer
+
+import gleipnir.core.parser as parser
+
+
+DEBOUNCE_INTERVAL = 500 # ms
+POLL_INTERVAL = 2000 # ms
+
+
+class FileWatcher(QObject):
+    changed = Signal(str) # file path
+
+
+    def __init__(self, parent=None, debounce=DEBOUNCE_INTERVAL,
+                 poll=POLL_INTERVAL):
+        super().__init__(parent)
+
+        self._emitted = None # signature of the last emitted version
+        self._file_path = ""
+        self._last = None # signature at the last check
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_changed)
+        self._watcher.fileChanged.connect(self._on_changed)
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setInterval(debounce)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.timeout.connect(self._check)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll)
+        self._poll_timer.timeout.connect(self._poll)
+
+
+    @property
+    def file_path(self):
+        return self._file_path
+
+
+    @property
+    def is_watching(self):
+        return bool(self._file_path)
+
+
+    def start(self, file_path):
+        """
+        Starts watching `file_path` (instead of the previous file). `changed`
+        is emitted for the current version of the file too.
+        """
+        self.stop()
+        self._file_path = file_path
+        self._last = _signature(file_path)
+        self._add_paths()
+        self._poll_timer.start()
+        self._debounce_timer.start()
+
+
+    def stop(self):
+        paths = self._watcher.files() + self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
+        self._debounce_timer.stop()
+        self._poll_timer.stop()
+        self._emitted = None
+        self._file_path = ""
+        self._last = None
+
+
+    def _add_paths(self):
+        """
+        Adds the file (if it exists) and its directory to the watcher.
+        """
+        directory = os.path.dirname(os.path.abspath(self._file_path))
+        for path in (self._file_path, directory):
+            if (os.path.exists(path) and path not in self._watcher.files()
+                    and path not in self._watcher.directories()):
+                self._watcher.addPath(path)
+
+
+    def _check(self):
+        signature = _signature(self._file_path)
+        if signature != self._last:
+            # still being written, wait for the next quiet period
+            self._last = signature
+            self._debounce_timer.start()
+            return
+        if (signature is not None and signature != self._emitted
+                and parser.is_complete(self._file_path)):
+            self._emitted = signature
+            self.changed.emit(self._file_path)
+
+
+    def _on_changed(self, path):
+        # renamed or recreated file is removed from the watcher
+        self._add_paths()
+        if not self._debounce_timer.isActive():
+            self._last = _signature(self._file_path)
+        self._debounce_timer.start()
+
+
+    def _poll(self):
+        signature = _signature(self._file_path)
+        if signature != self._emitted and not self._debounce_timer.isActive():
+            self._add_paths()
+            self._last = signature
+            self._debounce_timer.start()
+
+
+def _signature(file_path):
+    """
+    Returns (size, mtime) of `file_path` or None if it doesn't exist.
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
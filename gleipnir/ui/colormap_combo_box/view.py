@@ -0,0 +1,115 @@
+"""
+ColormapComboBox View is a view class for combo box of colormaps with
+gradient thumbnails of colormaps.
+
+Thumbnails are made only for visible items (they are requested by the item
+delegate when an item is painted) from `ThumbnailCache` (see
+`gleipnir/core/colormaps.py`), new thumbnails are saved to the cache file
+after a while.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import numpy as np
+from PyQt6.QtCore import QSize
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QIcon
+from PyQt6.QtGui import QImage
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QComboBox
+from PyQt6.QtWidgets import QStyleOptionViewItem
+from PyQt6.QtWidgets import QStyledItemDelegate
+
+from gleipnir.core.colormaps import ThumbnailCache
+
+
+# Delay (ms) of saving of new thumbnails to the cache file.
+SAVE_INTERVAL = 2000
+
+THUMBNAIL_SIZE = QSize(64, 12)
+
+
+class ColormapComboBox(QComboBox):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._icons = {} # colormap name: QIcon
+        self._thumbnails = ThumbnailCache()
+
+        self._save_timer = QTimer(self)
+        self._save_timer.setInterval(SAVE_INTERVAL)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.timeout.connect(self._save_thumbnails)
+
+        self.setIconSize(THUMBNAIL_SIZE)
+        self.view().setItemDelegate(_ThumbnailDelegate(self))
+        self.currentIndexChanged.connect(self._on_current_index_changed)
+
+
+    def colormapIcon(self, name):
+        """
+        Returns icon with thumbnail of colormap `name` (None for unknown
+        colormaps).
+        """
+        icon = self._icons.get(name)
+        if icon is None:
+            try:
+                thumbnail = self._thumbnails.get(name)
+            except (KeyError, ValueError):
+                return None
+            rows = np.ascontiguousarray(np.broadcast_to(
+                thumbnail, (self.iconSize().height(),) + thumbnail.shape))
+            height, width = rows.shape[:2]
+            image = QImage(rows.data, width, height, 4 * width,
+                           QImage.Format.Format_RGBA8888)
+            icon = QIcon(QPixmap.fromImage(image.scaled(self.iconSize())))
+            self._icons[name] = icon
+            if self._thumbnails.is_changed:
+                self._save_timer.start()
+        return icon
+
+
+    def setThumbnailCache(self, thumbnails):
+        self._icons.clear()
+        self._thumbnails = thumbnails
+        self._on_current_index_changed(self.currentIndex())
+
+
+    def _on_current_index_changed(self, index):
+        # closed combo box shows icon of the current item
+        if index >= 0 and self.itemIcon(index).isNull():
+            icon = self.colormapIcon(self.itemText(index))
+            if icon:
+                self.setItemIcon(index, icon)
+
+
+    def _save_thumbnails(self):
+        self._thumbnails.save()
+
+
+class _ThumbnailDelegate(QStyledItemDelegate):
+    def __init__(self, combo_box):
+        super().__init__(combo_box)
+        self._combo_box = combo_box
+        self._is_size_hint = False
+
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        option.decorationSize = self._combo_box.iconSize()
+        option.features |= QStyleOptionViewItem.ViewItemFeature.HasDecoration
+        if not self._is_size_hint:
+            icon = self._combo_box.colormapIcon(index.data())
+            if icon:
+                option.icon = icon
+
+
+    def sizeHint(self, option, index):
+        # size hints of all items are requested for the popup size, icons
+        # are made only when items are painted
+        self._is_size_hint = True
+        try:
+            return super().sizeHint(option, index)
+        finally:
+            self._is_size_hint = False
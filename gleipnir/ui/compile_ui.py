@@ -0,0 +1,42 @@
+"""
+Compile UI is a module that compiles main window form (main.ui) into Python
+module main_ui.py with pyuic6, so the form isn't parsed by `uic.loadUi` at
+every application start.
+
+The compiled module stores hash of the form (`FORM_HASH`), the view uses it
+only if the hash matches, so an edited form is loaded from main.ui until it's
+compiled again:
+    python -m gleipnir.ui.compile_ui
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import hashlib
+import os
+import subprocess
+import sys
+
+
+FORM_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "main.ui")
+MODULE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "main_ui.py")
+
+
+def form_hash(file_path=FORM_FILE):
+    with open(file_path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def main():
+    subprocess.run([sys.executable, "-m", "PyQt6.uic.pyuic",
+                    os.path.relpath(FORM_FILE), "-o", MODULE_FILE],
+                   check=True)
+    with open(MODULE_FILE, "a") as f:
+        f.write(f"\n\nFORM_HASH = \"{form_hash()}\"\n")
+    print(MODULE_FILE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+HistogramWidget View is a view class for a histogram of data values with the
+color limits (V Min and V Max) that can be dragged with the mouse.
+
+Histogram is taken from the data (see `Dataset.histogram`), it's computed
+once per dataset, the widget only merges its bins into pixel columns
+(heights are in log scale). It's painted with QPainter, so dragging doesn't
+wait for Matplotlib: only the plot image is redrawn with new limits.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import numpy as np
+from PyQt6.QtCore import pyqtSignal as Signal
+from PyQt6.QtCore import QLineF
+from PyQt6.QtCore import QRectF
+from PyQt6.QtCore import QSize
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor
+from PyQt6.QtGui import QPainter
+from PyQt6.QtGui import QPalette
+from PyQt6.QtWidgets import QSizePolicy
+from PyQt6.QtWidgets import QStyle
+from PyQt6.QtWidgets import QStyleOption
+from PyQt6.QtWidgets import QWidget
+
+
+# Opacity (0 to 255) of histogram bars and of shade outside of the limits.
+BAR_ALPHA = 160
+SHADE_ALPHA = 160
+
+# The largest distance (pixels) from a limit line to start dragging it.
+DRAG_DISTANCE = 6
+
+HEIGHT = 60
+
+
+class HistogramWidget(QWidget):
+    vMaxChanged = Signal(float)
+    vMinChanged = Signal(float)
+
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._columns = None # cached column heights, see `_column_heights`
+        self._columns_key = None
+        self._drag = None # "v_min" or "v_max"
+        self._drag_range = None # value range is fixed while dragging
+        self._histogram = None
+        self._v_max = 0.0
+        self._v_min = 0.0
+
+        self.setMouseTracking(True)
+        self.setSizePolicy(QSizePolicy.Policy.Preferred,
+                           QSizePolicy.Policy.Fixed)
+        self.setToolTip("Histogram of values, drag lines to change V Min and "
+                        "V Max")
+
+
+    def mouseMoveEvent(self, event):
+        x = event.position().x()
+        if self._drag:
+            self._set_limit(self._drag, self._value(x))
+        elif self._histogram:
+            self.setCursor(Qt.CursorShape.SizeHorCursor
+                           if self._nearest_limit(x)[1] <= DRAG_DISTANCE
+                           else Qt.CursorShape.ArrowCursor)
+
+
+    def mousePressEvent(self, event):
+        if (event.button() != Qt.MouseButton.LeftButton
+                or not self._histogram):
+            return
+        x = event.position().x()
+        self._drag_range = self._range()
+        # a click away from the lines moves the nearest one
+        self._drag = self._nearest_limit(x)[0]
+        self._set_limit(self._drag, self._value(x))
+
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton and self._drag:
+            self._drag = None
+            self._drag_range = None
+            self.update()
+
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        # background and border of the style sheet (see "dark_theme.qss")
+        option = QStyleOption()
+        option.initFrom(self)
+        self.style().drawPrimitive(QStyle.PrimitiveElement.PE_Widget, option,
+                                   painter, self)
+        if not self._histogram:
+            return
+
+        palette = self.palette()
+        bar_color = QColor(palette.color(QPalette.ColorRole.WindowText))
+        bar_color.setAlpha(BAR_ALPHA)
+        painter.setPen(bar_color)
+        bottom = self.height()
+        painter.drawLines([QLineF(x + 0.5, bottom, x + 0.5,
+                                  bottom * (1 - height))
+                           for x, height in enumerate(self._column_heights())
+                           if height])
+
+        # values outside of the limits are shaded
+        x_min = self._position(self._v_min)
+        x_max = self._position(self._v_max)
+        shade = QColor(palette.color(QPalette.ColorRole.Window))
+        shade.setAlpha(SHADE_ALPHA)
+        painter.fillRect(QRectF(0, 0, max(x_min, 0), bottom), shade)
+        painter.fillRect(QRectF(x_max, 0, max(self.width() - x_max, 0),
+                                bottom), shade)
+        painter.setPen(palette.color(QPalette.ColorRole.Highlight))
+        for x in (x_min, x_max):
+            painter.drawLine(QLineF(x, 0, x, bottom))
+
+
+    def setData(self, data):
+        histogram = data.histogram if data else None
+        if self._histogram is not histogram:
+            self._histogram = histogram
+            self.update()
+
+
+    def setVMax(self, v_max):
+        if self._v_max != v_max:
+            self._v_max = v_max
+            self.update()
+
+
+    def setVMin(self, v_min):
+        if self._v_min != v_min:
+            self._v_min = v_min
+            self.update()
+
+
+    def sizeHint(self):
+        return QSize(200, HEIGHT)
+
+
+    def _column_heights(self):
+        """
+        Returns heights (0 to 1) of pixel columns, bins are merged into the
+        column of their centers.
+        """
+        width = max(self.width(), 1)
+        low, high = self._range()
+        key = (self._histogram, width, low, high)
+        if self._columns_key != key:
+            edges = self._histogram.edges
+            centers = (edges[:-1] + edges[1:]) / 2
+            columns = np.clip(((centers - low) / (high - low) * width)
+                              .astype(int), 0, width - 1)
+            counts = np.log1p(np.bincount(columns,
+                                          weights=self._histogram.counts,
+                                          minlength=width))
+            self._columns = counts / counts.max() if counts.max() else counts
+            self._columns_key = key
+        return self._columns
+
+
+    def _nearest_limit(self, x):
+        """
+        Returns name of the limit line nearest to `x` and the distance to it.
+        """
+        distances = {name: abs(self._position(value) - x) for name, value
+                     in (("v_min", self._v_min), ("v_max", self._v_max))}
+        name = min(distances, key=distances.get)
+        return name, distances[name]
+
+
+    def _position(self, value):
+        low, high = self._range()
+        return (value - low) / (high - low) * self.width()
+
+
+    def _range(self):
+        """
+        Returns range of values shown by the widget: the histogram range
+        extended to the limits.
+        """
+        if self._drag_range:
+            return self._drag_range
+        edges = self._histogram.edges
+        return (float(min(edges[0], self._v_min)),
+                float(max(edges[-1], self._v_max)))
+
+
+    def _set_limit(self, name, value):
+        low, high = self._range()
+        value = min(max(value, low), high)
+        if name == "v_min":
+            value = min(value, self._v_max)
+            if value != self._v_min:
+                self.setVMin(value)
+                self.vMinChanged.emit(value)
+        else:
+            value = max(value, self._v_min)
+            if value != self._v_max:
+                self.setVMax(value)
+                self.vMaxChanged.emit(value)
+
+
+    def _value(self, x):
+        low, high = self._range()
+        return low + x / max(self.width(), 1) * (high - low)
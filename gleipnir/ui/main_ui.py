@@ -0,0 +1,418 @@
+# Form implementation generated from reading ui file 'gleipnir/ui/main.ui'
+#
+# Created by: PyQt6 UI code generator 6.11.0
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(850, 800)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Preferred, QtWidgets.QSizePolicy.Policy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(MainWindow.sizePolicy().hasHeightForWidth())
+        MainWindow.setSizePolicy(sizePolicy)
+        self.centralwidget = QtWidgets.QWidget(parent=MainWindow)
+        self.centralwidget.setObjectName("centralwidget")
+        self.verticalLayout = QtWidgets.QVBoxLayout(self.centralwidget)
+        self.verticalLayout.setSizeConstraint(QtWidgets.QLayout.SizeConstraint.SetDefaultConstraint)
+        self.verticalLayout.setContentsMargins(12, 0, 12, 0)
+        self.verticalLayout.setSpacing(6)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.topHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.topHorizontalLayout.setObjectName("topHorizontalLayout")
+        self.inputFileLineEdit = FileLineEdit(parent=self.centralwidget)
+        self.inputFileLineEdit.setObjectName("inputFileLineEdit")
+        self.topHorizontalLayout.addWidget(self.inputFileLineEdit)
+        self.openFilePushButton = QtWidgets.QPushButton(parent=self.centralwidget)
+        self.openFilePushButton.setObjectName("openFilePushButton")
+        self.topHorizontalLayout.addWidget(self.openFilePushButton)
+        self.openAsFilePushButton = QtWidgets.QPushButton(parent=self.centralwidget)
+        self.openAsFilePushButton.setObjectName("openAsFilePushButton")
+        self.topHorizontalLayout.addWidget(self.openAsFilePushButton)
+        self.isInputFileWatchedCheckBox = QtWidgets.QCheckBox(parent=self.centralwidget)
+        self.isInputFileWatchedCheckBox.setObjectName("isInputFileWatchedCheckBox")
+        self.topHorizontalLayout.addWidget(self.isInputFileWatchedCheckBox)
+        self.verticalLayout.addLayout(self.topHorizontalLayout)
+        self.centralHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.centralHorizontalLayout.setSpacing(6)
+        self.centralHorizontalLayout.setObjectName("centralHorizontalLayout")
+        self.plotWidgetPlaceholder = QtWidgets.QWidget(parent=self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.plotWidgetPlaceholder.sizePolicy().hasHeightForWidth())
+        self.plotWidgetPlaceholder.setSizePolicy(sizePolicy)
+        self.plotWidgetPlaceholder.setMinimumSize(QtCore.QSize(600, 600))
+        self.plotWidgetPlaceholder.setObjectName("plotWidgetPlaceholder")
+        self.centralHorizontalLayout.addWidget(self.plotWidgetPlaceholder)
+        self.rightPanelVerticalLayout = QtWidgets.QVBoxLayout()
+        self.rightPanelVerticalLayout.setContentsMargins(6, -1, -1, -1)
+        self.rightPanelVerticalLayout.setObjectName("rightPanelVerticalLayout")
+        self.titleHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.titleHorizontalLayout.setObjectName("titleHorizontalLayout")
+        self.titleLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.titleLabel.setObjectName("titleLabel")
+        self.titleHorizontalLayout.addWidget(self.titleLabel)
+        self.titleLineEdit = QtWidgets.QLineEdit(parent=self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.titleLineEdit.sizePolicy().hasHeightForWidth())
+        self.titleLineEdit.setSizePolicy(sizePolicy)
+        self.titleLineEdit.setObjectName("titleLineEdit")
+        self.titleHorizontalLayout.addWidget(self.titleLineEdit)
+        self.titleHorizontalLayout.setStretch(0, 1)
+        self.titleHorizontalLayout.setStretch(1, 2)
+        self.rightPanelVerticalLayout.addLayout(self.titleHorizontalLayout)
+        self.titleColorHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.titleColorHorizontalLayout.setObjectName("titleColorHorizontalLayout")
+        self.titleColorLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.titleColorLabel.setObjectName("titleColorLabel")
+        self.titleColorHorizontalLayout.addWidget(self.titleColorLabel)
+        self.titleColorColorButton = ColorButton(parent=self.centralwidget)
+        self.titleColorColorButton.setText("")
+        self.titleColorColorButton.setObjectName("titleColorColorButton")
+        self.titleColorHorizontalLayout.addWidget(self.titleColorColorButton)
+        self.rightPanelVerticalLayout.addLayout(self.titleColorHorizontalLayout)
+        self.titleGroupLine = QtWidgets.QFrame(parent=self.centralwidget)
+        self.titleGroupLine.setFrameShape(QtWidgets.QFrame.Shape.HLine)
+        self.titleGroupLine.setFrameShadow(QtWidgets.QFrame.Shadow.Sunken)
+        self.titleGroupLine.setObjectName("titleGroupLine")
+        self.rightPanelVerticalLayout.addWidget(self.titleGroupLine)
+        self.xAxisNameHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.xAxisNameHorizontalLayout.setObjectName("xAxisNameHorizontalLayout")
+        self.xAxisNameLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.xAxisNameLabel.setObjectName("xAxisNameLabel")
+        self.xAxisNameHorizontalLayout.addWidget(self.xAxisNameLabel)
+        self.xAxisNameLineEdit = QtWidgets.QLineEdit(parent=self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.xAxisNameLineEdit.sizePolicy().hasHeightForWidth())
+        self.xAxisNameLineEdit.setSizePolicy(sizePolicy)
+        self.xAxisNameLineEdit.setObjectName("xAxisNameLineEdit")
+        self.xAxisNameHorizontalLayout.addWidget(self.xAxisNameLineEdit)
+        self.xAxisNameHorizontalLayout.setStretch(0, 1)
+        self.xAxisNameHorizontalLayout.setStretch(1, 2)
+        self.rightPanelVerticalLayout.addLayout(self.xAxisNameHorizontalLayout)
+        self.yAxisNameHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.yAxisNameHorizontalLayout.setObjectName("yAxisNameHorizontalLayout")
+        self.yAxisNameLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.yAxisNameLabel.setObjectName("yAxisNameLabel")
+        self.yAxisNameHorizontalLayout.addWidget(self.yAxisNameLabel)
+        self.yAxisNameLineEdit = QtWidgets.QLineEdit(parent=self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.MinimumExpanding, QtWidgets.QSizePolicy.Policy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.yAxisNameLineEdit.sizePolicy().hasHeightForWidth())
+        self.yAxisNameLineEdit.setSizePolicy(sizePolicy)
+        self.yAxisNameLineEdit.setObjectName("yAxisNameLineEdit")
+        self.yAxisNameHorizontalLayout.addWidget(self.yAxisNameLineEdit)
+        self.yAxisNameHorizontalLayout.setStretch(0, 1)
+        self.yAxisNameHorizontalLayout.setStretch(1, 2)
+        self.rightPanelVerticalLayout.addLayout(self.yAxisNameHorizontalLayout)
+        self.axesLabelsColorHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.axesLabelsColorHorizontalLayout.setObjectName("axesLabelsColorHorizontalLayout")
+        self.axesLabelsColorLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.axesLabelsColorLabel.setObjectName("axesLabelsColorLabel")
+        self.axesLabelsColorHorizontalLayout.addWidget(self.axesLabelsColorLabel)
+        self.axesLabelsColorColorButton = ColorButton(parent=self.centralwidget)
+        self.axesLabelsColorColorButton.setText("")
+        self.axesLabelsColorColorButton.setObjectName("axesLabelsColorColorButton")
+        self.axesLabelsColorHorizontalLayout.addWidget(self.axesLabelsColorColorButton)
+        self.rightPanelVerticalLayout.addLayout(self.axesLabelsColorHorizontalLayout)
+        self.axesColorHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.axesColorHorizontalLayout.setObjectName("axesColorHorizontalLayout")
+        self.axesColorLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.axesColorLabel.setObjectName("axesColorLabel")
+        self.axesColorHorizontalLayout.addWidget(self.axesColorLabel)
+        self.axesColorColorButton = ColorButton(parent=self.centralwidget)
+        self.axesColorColorButton.setText("")
+        self.axesColorColorButton.setObjectName("axesColorColorButton")
+        self.axesColorHorizontalLayout.addWidget(self.axesColorColorButton)
+        self.rightPanelVerticalLayout.addLayout(self.axesColorHorizontalLayout)
+        self.ticksColorHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.ticksColorHorizontalLayout.setObjectName("ticksColorHorizontalLayout")
+        self.ticksColorLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.ticksColorLabel.setObjectName("ticksColorLabel")
+        self.ticksColorHorizontalLayout.addWidget(self.ticksColorLabel)
+        self.ticksColorColorButton = ColorButton(parent=self.centralwidget)
+        self.ticksColorColorButton.setText("")
+        self.ticksColorColorButton.setObjectName("ticksColorColorButton")
+        self.ticksColorHorizontalLayout.addWidget(self.ticksColorColorButton)
+        self.rightPanelVerticalLayout.addLayout(self.ticksColorHorizontalLayout)
+        self.axesGroupLine = QtWidgets.QFrame(parent=self.centralwidget)
+        self.axesGroupLine.setFrameShape(QtWidgets.QFrame.Shape.HLine)
+        self.axesGroupLine.setFrameShadow(QtWidgets.QFrame.Shadow.Sunken)
+        self.axesGroupLine.setObjectName("axesGroupLine")
+        self.rightPanelVerticalLayout.addWidget(self.axesGroupLine)
+        self.isBackgroundTransparentCheckBox = QtWidgets.QCheckBox(parent=self.centralwidget)
+        self.isBackgroundTransparentCheckBox.setObjectName("isBackgroundTransparentCheckBox")
+        self.rightPanelVerticalLayout.addWidget(self.isBackgroundTransparentCheckBox)
+        self.backgroundColorHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.backgroundColorHorizontalLayout.setObjectName("backgroundColorHorizontalLayout")
+        self.backgroundColorLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.backgroundColorLabel.setObjectName("backgroundColorLabel")
+        self.backgroundColorHorizontalLayout.addWidget(self.backgroundColorLabel)
+        self.backgroundColorColorButton = ColorButton(parent=self.centralwidget)
+        self.backgroundColorColorButton.setText("")
+        self.backgroundColorColorButton.setObjectName("backgroundColorColorButton")
+        self.backgroundColorHorizontalLayout.addWidget(self.backgroundColorColorButton)
+        self.rightPanelVerticalLayout.addLayout(self.backgroundColorHorizontalLayout)
+        self.backgroundGroupLine = QtWidgets.QFrame(parent=self.centralwidget)
+        self.backgroundGroupLine.setFrameShape(QtWidgets.QFrame.Shape.HLine)
+        self.backgroundGroupLine.setFrameShadow(QtWidgets.QFrame.Shadow.Sunken)
+        self.backgroundGroupLine.setObjectName("backgroundGroupLine")
+        self.rightPanelVerticalLayout.addWidget(self.backgroundGroupLine)
+        self.isShowFrameCheckBox = QtWidgets.QCheckBox(parent=self.centralwidget)
+        self.isShowFrameCheckBox.setObjectName("isShowFrameCheckBox")
+        self.rightPanelVerticalLayout.addWidget(self.isShowFrameCheckBox)
+        self.frameColorHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.frameColorHorizontalLayout.setObjectName("frameColorHorizontalLayout")
+        self.frameColorLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.frameColorLabel.setObjectName("frameColorLabel")
+        self.frameColorHorizontalLayout.addWidget(self.frameColorLabel)
+        self.frameColorColorButton = ColorButton(parent=self.centralwidget)
+        self.frameColorColorButton.setText("")
+        self.frameColorColorButton.setObjectName("frameColorColorButton")
+        self.frameColorHorizontalLayout.addWidget(self.frameColorColorButton)
+        self.rightPanelVerticalLayout.addLayout(self.frameColorHorizontalLayout)
+        self.frameGroupLine = QtWidgets.QFrame(parent=self.centralwidget)
+        self.frameGroupLine.setFrameShape(QtWidgets.QFrame.Shape.HLine)
+        self.frameGroupLine.setFrameShadow(QtWidgets.QFrame.Shadow.Sunken)
+        self.frameGroupLine.setObjectName("frameGroupLine")
+        self.rightPanelVerticalLayout.addWidget(self.frameGroupLine)
+        self.isCenterLinesDisplayedCheckBox = QtWidgets.QCheckBox(parent=self.centralwidget)
+        self.isCenterLinesDisplayedCheckBox.setObjectName("isCenterLinesDisplayedCheckBox")
+        self.rightPanelVerticalLayout.addWidget(self.isCenterLinesDisplayedCheckBox)
+        self.centerLinesColorHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.centerLinesColorHorizontalLayout.setObjectName("centerLinesColorHorizontalLayout")
+        self.centerLinesColorLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.centerLinesColorLabel.setObjectName("centerLinesColorLabel")
+        self.centerLinesColorHorizontalLayout.addWidget(self.centerLinesColorLabel)
+        self.centerLinesColorColorButton = ColorButton(parent=self.centralwidget)
+        self.centerLinesColorColorButton.setText("")
+        self.centerLinesColorColorButton.setObjectName("centerLinesColorColorButton")
+        self.centerLinesColorHorizontalLayout.addWidget(self.centerLinesColorColorButton)
+        self.rightPanelVerticalLayout.addLayout(self.centerLinesColorHorizontalLayout)
+        self.centerLinesGroupLine = QtWidgets.QFrame(parent=self.centralwidget)
+        self.centerLinesGroupLine.setFrameShape(QtWidgets.QFrame.Shape.HLine)
+        self.centerLinesGroupLine.setFrameShadow(QtWidgets.QFrame.Shadow.Sunken)
+        self.centerLinesGroupLine.setObjectName("centerLinesGroupLine")
+        self.rightPanelVerticalLayout.addWidget(self.centerLinesGroupLine)
+        self.colormapHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.colormapHorizontalLayout.setObjectName("colormapHorizontalLayout")
+        self.colormapLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.colormapLabel.setObjectName("colormapLabel")
+        self.colormapHorizontalLayout.addWidget(self.colormapLabel)
+        self.colormapComboBox = ColormapComboBox(parent=self.centralwidget)
+        self.colormapComboBox.setObjectName("colormapComboBox")
+        self.colormapHorizontalLayout.addWidget(self.colormapComboBox)
+        self.rightPanelVerticalLayout.addLayout(self.colormapHorizontalLayout)
+        self.vMinHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.vMinHorizontalLayout.setObjectName("vMinHorizontalLayout")
+        self.vMinLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.vMinLabel.setObjectName("vMinLabel")
+        self.vMinHorizontalLayout.addWidget(self.vMinLabel)
+        self.vMinDoubleSpinBox = QtWidgets.QDoubleSpinBox(parent=self.centralwidget)
+        self.vMinDoubleSpinBox.setDecimals(4)
+        self.vMinDoubleSpinBox.setMaximum(1.0)
+        self.vMinDoubleSpinBox.setSingleStep(0.01)
+        self.vMinDoubleSpinBox.setObjectName("vMinDoubleSpinBox")
+        self.vMinHorizontalLayout.addWidget(self.vMinDoubleSpinBox)
+        self.rightPanelVerticalLayout.addLayout(self.vMinHorizontalLayout)
+        self.vMaxHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.vMaxHorizontalLayout.setObjectName("vMaxHorizontalLayout")
+        self.vMaxLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.vMaxLabel.setObjectName("vMaxLabel")
+        self.vMaxHorizontalLayout.addWidget(self.vMaxLabel)
+        self.vMaxDoubleSpinBox = QtWidgets.QDoubleSpinBox(parent=self.centralwidget)
+        self.vMaxDoubleSpinBox.setDecimals(4)
+        self.vMaxDoubleSpinBox.setMaximum(1.0)
+        self.vMaxDoubleSpinBox.setSingleStep(0.01)
+        self.vMaxDoubleSpinBox.setObjectName("vMaxDoubleSpinBox")
+        self.vMaxHorizontalLayout.addWidget(self.vMaxDoubleSpinBox)
+        self.rightPanelVerticalLayout.addLayout(self.vMaxHorizontalLayout)
+        self.autoContrastHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.autoContrastHorizontalLayout.setObjectName("autoContrastHorizontalLayout")
+        self.autoContrastLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.autoContrastLabel.setObjectName("autoContrastLabel")
+        self.autoContrastHorizontalLayout.addWidget(self.autoContrastLabel)
+        self.autoContrastComboBox = QtWidgets.QComboBox(parent=self.centralwidget)
+        self.autoContrastComboBox.setObjectName("autoContrastComboBox")
+        self.autoContrastHorizontalLayout.addWidget(self.autoContrastComboBox)
+        self.rightPanelVerticalLayout.addLayout(self.autoContrastHorizontalLayout)
+        self.histogramWidget = HistogramWidget(parent=self.centralwidget)
+        self.histogramWidget.setObjectName("histogramWidget")
+        self.rightPanelVerticalLayout.addWidget(self.histogramWidget)
+        self.colormapGroupLine = QtWidgets.QFrame(parent=self.centralwidget)
+        self.colormapGroupLine.setFrameShape(QtWidgets.QFrame.Shape.HLine)
+        self.colormapGroupLine.setFrameShadow(QtWidgets.QFrame.Shadow.Sunken)
+        self.colormapGroupLine.setObjectName("colormapGroupLine")
+        self.rightPanelVerticalLayout.addWidget(self.colormapGroupLine)
+        self.dpiHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.dpiHorizontalLayout.setObjectName("dpiHorizontalLayout")
+        self.dpiLabel = QtWidgets.QLabel(parent=self.centralwidget)
+        self.dpiLabel.setObjectName("dpiLabel")
+        self.dpiHorizontalLayout.addWidget(self.dpiLabel)
+        self.dpiSpinBox = QtWidgets.QSpinBox(parent=self.centralwidget)
+        self.dpiSpinBox.setMinimum(1)
+        self.dpiSpinBox.setMaximum(100000)
+        self.dpiSpinBox.setSingleStep(10)
+        self.dpiSpinBox.setObjectName("dpiSpinBox")
+        self.dpiHorizontalLayout.addWidget(self.dpiSpinBox)
+        self.rightPanelVerticalLayout.addLayout(self.dpiHorizontalLayout)
+        self.channelWidget = QtWidgets.QWidget(parent=self.centralwidget)
+        self.channelWidget.setObjectName("channelWidget")
+        self.channelVerticalLayout = QtWidgets.QVBoxLayout(self.channelWidget)
+        self.channelVerticalLayout.setContentsMargins(0, 0, 0, 0)
+        self.channelVerticalLayout.setObjectName("channelVerticalLayout")
+        self.channelGroupLine = QtWidgets.QFrame(parent=self.channelWidget)
+        self.channelGroupLine.setFrameShape(QtWidgets.QFrame.Shape.HLine)
+        self.channelGroupLine.setFrameShadow(QtWidgets.QFrame.Shadow.Sunken)
+        self.channelGroupLine.setObjectName("channelGroupLine")
+        self.channelVerticalLayout.addWidget(self.channelGroupLine)
+        self.channelHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.channelHorizontalLayout.setObjectName("channelHorizontalLayout")
+        self.channelLabel = QtWidgets.QLabel(parent=self.channelWidget)
+        self.channelLabel.setObjectName("channelLabel")
+        self.channelHorizontalLayout.addWidget(self.channelLabel)
+        self.channelValueLabel = QtWidgets.QLabel(parent=self.channelWidget)
+        self.channelValueLabel.setAlignment(QtCore.Qt.AlignmentFlag.AlignRight|QtCore.Qt.AlignmentFlag.AlignVCenter)
+        self.channelValueLabel.setObjectName("channelValueLabel")
+        self.channelHorizontalLayout.addWidget(self.channelValueLabel)
+        self.channelVerticalLayout.addLayout(self.channelHorizontalLayout)
+        self.channelSlider = QtWidgets.QSlider(parent=self.channelWidget)
+        self.channelSlider.setOrientation(QtCore.Qt.Orientation.Horizontal)
+        self.channelSlider.setObjectName("channelSlider")
+        self.channelVerticalLayout.addWidget(self.channelSlider)
+        self.rightPanelVerticalLayout.addWidget(self.channelWidget)
+        self.centralHorizontalLayout.addLayout(self.rightPanelVerticalLayout)
+        self.centralHorizontalLayout.setStretch(0, 2)
+        self.verticalLayout.addLayout(self.centralHorizontalLayout)
+        self.bottomHorizontalLayout = QtWidgets.QHBoxLayout()
+        self.bottomHorizontalLayout.setObjectName("bottomHorizontalLayout")
+        self.outputFileLineEdit = QtWidgets.QLineEdit(parent=self.centralwidget)
+        self.outputFileLineEdit.setObjectName("outputFileLineEdit")
+        self.bottomHorizontalLayout.addWidget(self.outputFileLineEdit)
+        self.isRawExportCheckBox = QtWidgets.QCheckBox(parent=self.centralwidget)
+        self.isRawExportCheckBox.setObjectName("isRawExportCheckBox")
+        self.bottomHorizontalLayout.addWidget(self.isRawExportCheckBox)
+        self.savePushButton = QtWidgets.QPushButton(parent=self.centralwidget)
+        self.savePushButton.setObjectName("savePushButton")
+        self.bottomHorizontalLayout.addWidget(self.savePushButton)
+        self.saveAsPushButton = QtWidgets.QPushButton(parent=self.centralwidget)
+        self.saveAsPushButton.setObjectName("saveAsPushButton")
+        self.bottomHorizontalLayout.addWidget(self.saveAsPushButton)
+        self.verticalLayout.addLayout(self.bottomHorizontalLayout)
+        self.verticalLayout.setStretch(1, 1)
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.menubar = QtWidgets.QMenuBar(parent=MainWindow)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 850, 30))
+        self.menubar.setObjectName("menubar")
+        self.menuFile = QtWidgets.QMenu(parent=self.menubar)
+        self.menuFile.setObjectName("menuFile")
+        self.menuView = QtWidgets.QMenu(parent=self.menubar)
+        self.menuView.setObjectName("menuView")
+        self.menuHelp = QtWidgets.QMenu(parent=self.menubar)
+        self.menuHelp.setObjectName("menuHelp")
+        MainWindow.setMenuBar(self.menubar)
+        self.statusbar = QtWidgets.QStatusBar(parent=MainWindow)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+        self.actionAbout = QtGui.QAction(parent=MainWindow)
+        self.actionAbout.setObjectName("actionAbout")
+        self.actionOpen = QtGui.QAction(parent=MainWindow)
+        self.actionOpen.setObjectName("actionOpen")
+        self.actionLoad_Style = QtGui.QAction(parent=MainWindow)
+        self.actionLoad_Style.setObjectName("actionLoad_Style")
+        self.actionSave = QtGui.QAction(parent=MainWindow)
+        self.actionSave.setObjectName("actionSave")
+        self.actionSave_As = QtGui.QAction(parent=MainWindow)
+        self.actionSave_As.setObjectName("actionSave_As")
+        self.actionProfiles = QtGui.QAction(parent=MainWindow)
+        self.actionProfiles.setCheckable(True)
+        self.actionProfiles.setObjectName("actionProfiles")
+        self.actionQuit = QtGui.QAction(parent=MainWindow)
+        self.actionQuit.setObjectName("actionQuit")
+        self.menuFile.addAction(self.actionOpen)
+        self.menuFile.addAction(self.actionLoad_Style)
+        self.menuFile.addSeparator()
+        self.menuFile.addAction(self.actionSave)
+        self.menuFile.addAction(self.actionSave_As)
+        self.menuFile.addSeparator()
+        self.menuFile.addAction(self.actionQuit)
+        self.menuView.addAction(self.actionProfiles)
+        self.menuHelp.addAction(self.actionAbout)
+        self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuView.menuAction())
+        self.menubar.addAction(self.menuHelp.menuAction())
+
+        self.retranslateUi(MainWindow)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "Gleipnir"))
+        self.inputFileLineEdit.setPlaceholderText(_translate("MainWindow", "Input File..."))
+        self.openFilePushButton.setText(_translate("MainWindow", "Open"))
+        self.openAsFilePushButton.setText(_translate("MainWindow", "Open..."))
+        self.isInputFileWatchedCheckBox.setToolTip(_translate("MainWindow", "Reload the input file when it\'s changed (e.g. by a running simulation)"))
+        self.isInputFileWatchedCheckBox.setText(_translate("MainWindow", "Watch"))
+        self.titleLabel.setText(_translate("MainWindow", "Title"))
+        self.titleColorLabel.setText(_translate("MainWindow", "Title Color"))
+        self.xAxisNameLabel.setText(_translate("MainWindow", "X Axis Name"))
+        self.yAxisNameLabel.setText(_translate("MainWindow", "Y Axis Name"))
+        self.axesLabelsColorLabel.setText(_translate("MainWindow", "Axes Labels Color"))
+        self.axesColorLabel.setText(_translate("MainWindow", "Axes Color"))
+        self.ticksColorLabel.setText(_translate("MainWindow", "Ticks Color"))
+        self.isBackgroundTransparentCheckBox.setText(_translate("MainWindow", "Transparent Background"))
+        self.backgroundColorLabel.setText(_translate("MainWindow", "Background Color"))
+        self.isShowFrameCheckBox.setText(_translate("MainWindow", "Show Frame"))
+        self.frameColorLabel.setText(_translate("MainWindow", "Frame Color"))
+        self.isCenterLinesDisplayedCheckBox.setText(_translate("MainWindow", "Display Center Lines"))
+        self.centerLinesColorLabel.setText(_translate("MainWindow", "Center Lines Color"))
+        self.colormapLabel.setText(_translate("MainWindow", "Colormap"))
+        self.vMinLabel.setText(_translate("MainWindow", "V Min"))
+        self.vMaxLabel.setText(_translate("MainWindow", "V Max"))
+        self.autoContrastLabel.setText(_translate("MainWindow", "Auto"))
+        self.autoContrastComboBox.setToolTip(_translate("MainWindow", "Set V Min and V Max to keep this percent of values of every loaded file inside"))
+        self.dpiLabel.setText(_translate("MainWindow", "DPI"))
+        self.channelLabel.setText(_translate("MainWindow", "Channel"))
+        self.outputFileLineEdit.setPlaceholderText(_translate("MainWindow", "Output File..."))
+        self.isRawExportCheckBox.setToolTip(_translate("MainWindow", "Save only the colormapped image at grid resolution (PNG or TIFF), without axes, title and colorbar"))
+        self.isRawExportCheckBox.setText(_translate("MainWindow", "Raw"))
+        self.savePushButton.setText(_translate("MainWindow", "Save"))
+        self.saveAsPushButton.setText(_translate("MainWindow", "Save As..."))
+        self.menuFile.setTitle(_translate("MainWindow", "File"))
+        self.menuView.setTitle(_translate("MainWindow", "View"))
+        self.menuHelp.setTitle(_translate("MainWindow", "Help"))
+        self.actionAbout.setText(_translate("MainWindow", "About"))
+        self.actionAbout.setShortcut(_translate("MainWindow", "F1"))
+        self.actionOpen.setText(_translate("MainWindow", "Open..."))
+        self.actionOpen.setShortcut(_translate("MainWindow", "Ctrl+O"))
+        self.actionLoad_Style.setText(_translate("MainWindow", "Load Style..."))
+        self.actionLoad_Style.setShortcut(_translate("MainWindow", "Ctrl+L"))
+        self.actionSave.setText(_translate("MainWindow", "Save"))
+        self.actionSave.setShortcut(_translate("MainWindow", "Ctrl+S"))
+        self.actionSave_As.setText(_translate("MainWindow", "Save As..."))
+        self.actionSave_As.setShortcut(_translate("MainWindow", "Ctrl+Shift+S"))
+        self.actionProfiles.setText(_translate("MainWindow", "Profiles"))
+        self.actionProfiles.setToolTip(_translate("MainWindow", "Radial and azimuthal profiles of the disk"))
+        self.actionQuit.setText(_translate("MainWindow", "Quit"))
+        self.actionQuit.setToolTip(_translate("MainWindow", "Quit"))
+        self.actionQuit.setShortcut(_translate("MainWindow", "Ctrl+Q"))
+from gleipnir.ui.color_button.view import ColorButton
+from gleipnir.ui.colormap_combo_box.view import ColormapComboBox
+from gleipnir.ui.file_line_edit.view import FileLineEdit
+from gleipnir.ui.histogram_widget.view import HistogramWidget
+
+
+FORM_HASH = "cd32ee2fb7c2cb8b6962af5acd8c28f2d67617a8"
@@ -5,12 +5,26 @@ and view. It also contains some helper functions that helps to transform data.
 
 Development notes:
     1) You can initialize initial widget's value at
-    `MainWindowPresenter._set_view_initial_values`.
+    `MainWindowPresenter._set_view_initial_values` (plot widget is created
+    after the window is shown, see `MainWindowPresenter._init_plot_widget`).
     2) You can bind widget's value changes to a model using signals/slots at
     `MainWindowPresenter._bind_view_to_model` function.
     3) You can bind model's value changes to a view using signals/slots at
     `MainWindowPresenter._bind_model_to_view` function.
     4) You can add additional validators and helper data transformer methods.
+    5) Status bar shows the last durations of the main stages (see
+    `gleipnir/utils/instrumentation.py`), all timers are in its tooltip.
+    6) Watched input file is reloaded with `DataLoader` like an opened file,
+    reload errors are shown in the status bar (the file can be rewritten by a
+    simulation while it's read).
+    7) Images are saved in background by `DataExporter` from a snapshot of
+    the model (`Model.export_job`), so the plot can be edited while they are
+    saved. Pending exports are finished before the application quits.
+    8) Auto-contrast sets V Min and V Max of every loaded file from the
+    histogram of the data (`Model.auto_contrast`), the histogram widget shows
+    it and its limit lines can be dragged.
+    9) Panel of radial and azimuthal profiles (View > Profiles) is created
+    when it's opened for the first time, then it follows the displayed data.
 
 Author: Artem Shepelin
 License: GPLv3
@@ -19,14 +33,38 @@ License: GPLv3
 import os
 import sys
 
+from PyQt6.QtCore import QSignalBlocker
+from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QTimer
 from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QApplication
 from PyQt6.QtWidgets import QColorDialog
 from PyQt6.QtWidgets import QErrorMessage
 from PyQt6.QtWidgets import QFileDialog
 from PyQt6.QtWidgets import QMessageBox
 
 from gleipnir.__init__ import __version__
-from gleipnir.ui.plot_widget.view import PlotWidget
+import gleipnir.core.raster as raster
+from gleipnir.model.exporter import DataExporter
+from gleipnir.model.loader import DataLoader
+from gleipnir.model.watcher import FileWatcher
+import gleipnir.utils.instrumentation as instrumentation
+
+
+# Percents of data values inside of the color limits for auto-contrast.
+AUTO_CONTRAST = (100, 99.9, 99.5, 99, 98, 95)
+
+# Timers of the status bar summary: timer name, label.
+SUMMARY_TIMERS = {
+    "load": "load",
+    "parse": "parse",
+    "plot.image": "image",
+    "draw": "draw",
+    "export": "export",
+}
+
+# Interval (ms) of the status bar summary update.
+TIMINGS_INTERVAL = 1000
 
 
 class MainWindowPresenter:
@@ -34,9 +72,25 @@ class MainWindowPresenter:
         self.model = model
         self.view = view
 
+        self._exporter = DataExporter(self.view)
+        self._loader = DataLoader(self.view)
+        self._watcher = FileWatcher(self.view)
+        self._is_reloading = False # the watched file is being loaded
+        self._is_reload_pending = False
+        self._timings_timer = QTimer(self.view)
+        self._timings_timer.setInterval(TIMINGS_INTERVAL)
+
         self._set_view_initial_values()
         self._bind_view_to_model()
         self._bind_model_to_view()
+        self._bind_exporter()
+        self._bind_loader()
+        self._bind_watcher()
+        self._bind_timings()
+
+        # Matplotlib is imported after the window is shown
+        self.view.painted.connect(self._init_plot_widget,
+                                  Qt.ConnectionType.QueuedConnection)
 
 
     def _action_about(self):
@@ -50,53 +104,74 @@ class MainWindowPresenter:
             "Repository: https://github.com/deverte/gleipnir")
 
 
+    def _action_load_style(self):
+        file_name = QFileDialog.getOpenFileName(
+            self.view, "Load Style", "",
+            "Style Files (*.json);;All Files (*.*)")[0]
+        if file_name:
+            try:
+                self.model.style_read(file_name)
+            except (OSError, ValueError) as e:
+                QErrorMessage(self.view).showMessage(
+                    f"Can't load style {file_name}.\n{e}")
+                return
+            self._set_view_values()
+
+
     def _action_open_as_data(self):
-        try:
-            file_name = QFileDialog.getOpenFileName(
-                self.view, "Open File", "",
-                "Data Files (*.dat);;All Files (*.*)")[0]
-            if file_name:
-                self.model.data = file_name
-        except FileNotFoundError:
-            QErrorMessage(self.view).showMessage(
-                f"File {self.model.input_file.value} does not exist.")
-        except Exception:
-            QErrorMessage(self.view).showMessage(
-                f"File {self.model.input_file.value} has an incompatible format.")
+        file_name = QFileDialog.getOpenFileName(
+            self.view, "Open File", "",
+            "Data Files (*.dat);;All Files (*.*)")[0]
+        if file_name:
+            self.model.input_file = file_name
+            self._load(file_name)
 
 
     def _action_open_data(self):
-        try:
-            self.model.data = self.model.input_file.value
-        except FileNotFoundError:
-            QErrorMessage(self.view).showMessage(
-                f"File {self.model.input_file.value} does not exist.")
-        except Exception:
-            QErrorMessage(self.view).showMessage(
-                f"File {self.model.input_file.value} has an incompatible format.")
+        self._load(self.model.input_file.value)
+
+
+    def _action_profiles(self, is_checked):
+        if self.view.profileWidget is None:
+            if not is_checked:
+                return
+            profile_widget = self.view.createProfileWidget()
+            profile_widget.exportRequested.connect(self._action_save_profile)
+            profile_widget.setData(self.model.data.value)
+            self.model.data.changed.connect(profile_widget.setData)
+            # closing the panel unchecks the action
+            self.view.profileDockWidget.visibilityChanged.connect(
+                self.view.actionProfiles.setChecked)
+        self.view.profileDockWidget.setVisible(is_checked)
+
+
+    def _action_quit(self):
+        self._exporter.wait()
+        sys.exit()
 
 
     def _action_save_as_data(self):
         if not self.model.data.value:
             QErrorMessage(self.view).showMessage("Nothing to save.")
             return
-        ftypes = [f"{val} (*.{key})" for key, val
-                  in self.view.plotWidget.get_supported_filetypes().items()]
+        if self.model.is_raw_export.value:
+            ftypes = [f"Raw {name} image (*.{ext})"
+                      for ext, name in raster.FORMATS.items()]
+            selected = ftypes[0] # png
+        else:
+            ftypes = [f"{val} (*.{key})" for key, val
+                      in self.view.plotWidget.get_supported_filetypes().items()]
+            selected = ftypes[5] # png
         save_file_dialog = QFileDialog(self.view)
         file_path = os.path.split(self.model.input_file.value)[0]
         if os.path.exists(file_path):
             save_file_dialog.setDirectory(file_path)
         save_file_dialog.setNameFilter(";;".join(ftypes))
-        save_file_dialog.selectNameFilter(ftypes[5]) # png
+        save_file_dialog.selectNameFilter(selected)
         if save_file_dialog.exec():
             file_name = save_file_dialog.selectedFiles()[0]
             if file_name:
-                try:
-                    self.model.data_write(file_name,
-                                          self.view.plotWidget.figure)
-                except:
-                    QErrorMessage(self.view).showMessage(
-                        f"Can't save file {file_name}.")
+                self._export(file_name)
 
 
     def _action_save_data(self):
@@ -112,28 +187,53 @@ class MainWindowPresenter:
             QErrorMessage(self.view).showMessage(
                 f"Please, configure output file name.")
             return
-        try:
-            self.model.data_write(self.model.output_file.value,
-                                  self.view.plotWidget.figure)
-        except:
-            QErrorMessage(self.view).showMessage(
-                f"Can't save file {self.model.output_file.value}.")
+        self._export(self.model.output_file.value)
 
 
-    def _bind_model_to_view(self):
+    def _action_save_profile(self):
+        profile = self.view.profileWidget.profile
+        if profile is None:
+            QErrorMessage(self.view).showMessage("Nothing to save.")
+            return
+        name = os.path.splitext(self.model.output_file.value)[0]
+        file_name = QFileDialog.getSaveFileName(
+            self.view, "Save Profile",
+            f"{name}_{profile.kind}.csv" if name else "",
+            "CSV Files (*.csv);;NumPy Files (*.npy)")[0]
+        if file_name:
+            try:
+                profile.save(file_name)
+            except (OSError, ValueError) as e:
+                QErrorMessage(self.view).showMessage(
+                    f"Can't save file {file_name}.\n{e}")
+                return
+            self.view.statusbar.showMessage(f"Saved {file_name}", 5000)
+
+
+    def _bind_exporter(self):
+        self._exporter.failed.connect(self._on_export_failed)
+        self._exporter.finished.connect(self._on_export_finished)
+        self._exporter.progress.connect(self._on_export_progress)
+        QApplication.instance().aboutToQuit.connect(self._exporter.wait)
+
+
+    def _bind_loader(self):
+        self._loader.failed.connect(self._on_data_load_failed)
+        self._loader.loaded.connect(self._on_data_loaded)
+        self._loader.progress.connect(self._on_data_load_progress)
+
+
+    def _bind_model_to_plot_widget(self):
         self.model.axes_color.changed.connect(self.view.plotWidget.setAxesColor)
         self.model.axes_labels_color.changed.connect(self.view.plotWidget.setAxesLabelsColor)
         self.model.background_color.changed.connect(self.view.plotWidget.setBackgroundColor)
         self.model.center_lines_color.changed.connect(self.view.plotWidget.setCenterLinesColor)
         self.model.colormap.changed.connect(self.view.plotWidget.setColormap)
         self.model.data.changed.connect(self.view.plotWidget.setData)
-        self.model.dpi.changed.connect(self.view.plotWidget.setDpi)
         self.model.frame_color.changed.connect(self.view.plotWidget.setFrameColor)
-        self.model.input_file.changed.connect(self.view.inputFileLineEdit.setText)
         self.model.is_background_transparent.changed.connect(self.view.plotWidget.setIsBackgroundTransparent)
         self.model.is_center_lines_displayed.changed.connect(self.view.plotWidget.setIsCenterLinesDisplayed)
         self.model.is_show_frame.changed.connect(self.view.plotWidget.setIsShowFrame)
-        self.model.output_file.changed.connect(self.view.outputFileLineEdit.setText)
         self.model.ticks_color.changed.connect(self.view.plotWidget.setTicksColor)
         self.model.title.changed.connect(self.view.plotWidget.setTitle)
         self.model.title_color.changed.connect(self.view.plotWidget.setTitleColor)
@@ -143,23 +243,52 @@ class MainWindowPresenter:
         self.model.y_axis_name.changed.connect(self.view.plotWidget.setYAxisName)
 
 
+    def _bind_model_to_view(self):
+        self.model.channel.changed.connect(self._on_channel_changed)
+        self.model.channel_count.changed.connect(self._on_channel_count_changed)
+        self.model.data.changed.connect(self.view.histogramWidget.setData)
+        self.model.input_file.changed.connect(self.view.inputFileLineEdit.setText)
+        self.model.input_file.changed.connect(self._update_watcher)
+        self.model.is_input_file_watched.changed.connect(self._update_watcher)
+        self.model.output_file.changed.connect(self.view.outputFileLineEdit.setText)
+        self.model.v_max.changed.connect(self.view.histogramWidget.setVMax)
+        self.model.v_max.changed.connect(
+            lambda value: self._set_spin_box_value(self.view.vMaxDoubleSpinBox, value))
+        self.model.v_min.changed.connect(self.view.histogramWidget.setVMin)
+        self.model.v_min.changed.connect(
+            lambda value: self._set_spin_box_value(self.view.vMinDoubleSpinBox, value))
+
+
+    def _bind_timings(self):
+        self._timings_timer.timeout.connect(self._update_timings)
+        self._timings_timer.start()
+
+
     def _bind_view_to_model(self):
         self.view.actionAbout.triggered.connect(self._action_about)
+        self.view.actionLoad_Style.triggered.connect(self._action_load_style)
         self.view.actionOpen.triggered.connect(self._action_open_as_data)
-        self.view.actionQuit.triggered.connect(lambda : sys.exit())
+        self.view.actionProfiles.toggled.connect(self._action_profiles)
+        self.view.actionQuit.triggered.connect(self._action_quit)
         self.view.actionSave.triggered.connect(self._action_save_data)
         self.view.actionSave_As.triggered.connect(self._action_save_as_data)
+        self.view.autoContrastComboBox.activated.connect(self._on_auto_contrast_selected)
         self.view.axesColorColorButton.colorChanged.connect(self.model.axes_color.setValue)
         self.view.axesLabelsColorColorButton.colorChanged.connect(self.model.axes_labels_color.setValue)
         self.view.backgroundColorColorButton.colorChanged.connect(self.model.background_color.setValue)
         self.view.centerLinesColorColorButton.colorChanged.connect(self.model.center_lines_color.setValue)
-        self.view.colormapComboBox.currentTextChanged.connect(self.model.colormap.setValue)
+        self.view.channelSlider.valueChanged.connect(self._on_channel_selected)
+        self.view.colormapComboBox.textActivated.connect(self.model.colormap.setValue)
         self.view.dpiSpinBox.valueChanged.connect(self.model.dpi.setValue)
         self.view.frameColorColorButton.colorChanged.connect(self.model.frame_color.setValue)
+        self.view.histogramWidget.vMaxChanged.connect(self.model.v_max.setValue)
+        self.view.histogramWidget.vMinChanged.connect(self.model.v_min.setValue)
         self.view.inputFileLineEdit.dropped.connect(self.model.input_file.setValue)
         self.view.inputFileLineEdit.editingFinished.connect(lambda : self.model.input_file.setValue(self.view.inputFileLineEdit.text()))
         self.view.isBackgroundTransparentCheckBox.stateChanged.connect(self.model.is_background_transparent.setValue)
         self.view.isCenterLinesDisplayedCheckBox.stateChanged.connect(self.model.is_center_lines_displayed.setValue)
+        self.view.isInputFileWatchedCheckBox.toggled.connect(self.model.is_input_file_watched.setValue)
+        self.view.isRawExportCheckBox.toggled.connect(self.model.is_raw_export.setValue)
         self.view.isShowFrameCheckBox.stateChanged.connect(self.model.is_show_frame.setValue)
         self.view.openAsFilePushButton.clicked.connect(self._action_open_as_data)
         self.view.openFilePushButton.clicked.connect(self._action_open_data)
@@ -175,39 +304,191 @@ class MainWindowPresenter:
         self.view.yAxisNameLineEdit.textChanged.connect(self.model.y_axis_name.setValue)
 
 
+    def _bind_watcher(self):
+        self._watcher.changed.connect(self._on_watched_file_changed)
+
+
+    def _export(self, file_path):
+        plot_widget = self.view.plotWidget
+        self._exporter.export(self.model.export_job(
+            file_path, plot_widget.plotter.view if plot_widget else None))
+
+
+    def _finish_reload(self):
+        """
+        Returns True if the finished loading was a reload of the watched
+        file, starts the pending reload.
+        """
+        is_reloading = self._is_reloading
+        self._is_reloading = False
+        if self._is_reload_pending and self._watcher.is_watching:
+            self._is_reload_pending = False
+            QTimer.singleShot(0, lambda : self._on_watched_file_changed(
+                self._watcher.file_path))
+        return is_reloading
+
+
+    def _init_plot_widget(self):
+        plot_widget = self.view.createPlotWidget()
+        plot_widget.setProperties(self.model.get_style())
+        if self.model.data.value:
+            plot_widget.setData(self.model.data.value)
+        self._bind_model_to_plot_widget()
+
+
+    def _load(self, file_path):
+        self._is_reloading = False
+        self._is_reload_pending = False
+        self._loader.load(file_path)
+
+
+    def _on_auto_contrast_selected(self, index):
+        # the first item is manual limits, selecting a percent again
+        # applies it again (e.g. after limits are changed by hand)
+        self.model.auto_contrast = AUTO_CONTRAST[index - 1] if index else None
+
+
+    def _on_channel_changed(self, channel):
+        self.view.channelSlider.setValue(channel)
+        data = self.model.data.value
+        self.view.channelValueLabel.setText(
+            f"V = {data.V1 + channel * data.dV:g}" if data else "")
+
+
+    def _on_channel_count_changed(self, channel_count):
+        self.view.channelSlider.setMaximum(channel_count - 1)
+        self.view.channelWidget.setVisible(channel_count > 1)
+
+
+    def _on_channel_selected(self, channel):
+        self.model.channel = channel
+
+
+    def _on_data_load_failed(self, file_path, exception):
+        self.view.loadingProgressBar.hide()
+        if self._finish_reload():
+            # watched file can be rewritten while it's read, the next
+            # version is loaded on the next change
+            self.view.statusbar.showMessage(
+                f"Can't reload {file_path}: {exception}", 5000)
+            return
+        if isinstance(exception, FileNotFoundError):
+            QErrorMessage(self.view).showMessage(
+                f"File {file_path} does not exist.")
+        else:
+            QErrorMessage(self.view).showMessage(
+                f"File {file_path} has an incompatible format."
+                + (f"\n{exception}" if str(exception) else ""))
+
+
+    def _on_data_load_progress(self, stage, done, total):
+        self.view.loadingProgressBar.setFormat(
+            ("Reading" if stage == "read" else "Parsing") + " %p%")
+        self.view.loadingProgressBar.setValue(
+            int(1000 * done / total) if total else 1000)
+        self.view.loadingProgressBar.show()
+
+
+    def _on_data_loaded(self, file_path, data):
+        self.view.loadingProgressBar.hide()
+        self._finish_reload()
+        self.model.data_loaded(file_path, data)
+
+
+    def _on_export_failed(self, file_path, exception):
+        QErrorMessage(self.view).showMessage(
+            f"Can't save file {file_path}."
+            + (f"\n{exception}" if str(exception) else ""))
+
+
+    def _on_export_finished(self, file_path):
+        self.view.statusbar.showMessage(f"Saved {file_path}", 5000)
+
+
+    def _on_export_progress(self, done, total):
+        if done == total:
+            self.view.exportProgressBar.hide()
+            return
+        # a single export has no progress, the bar is busy indicator
+        self.view.exportProgressBar.setRange(0, total if total > 1 else 0)
+        self.view.exportProgressBar.setValue(done)
+        self.view.exportProgressBar.setFormat(f"Saving {done + 1} of {total}")
+        self.view.exportProgressBar.show()
+
+
+    def _on_watched_file_changed(self, file_path):
+        if self._loader.is_loading:
+            # don't cancel loading, reload after it (changes of a running
+            # simulation can be more frequent than loading of a big file)
+            self._is_reload_pending = True
+            return
+        self._is_reloading = True
+        self._loader.load(file_path)
+
+
+    def _set_spin_box_value(self, spin_box, value):
+        # The spin boxes round and clamp (4 decimals, 0..1), so model updates
+        # must not echo back through valueChanged and overwrite the computed
+        # limits; only user edits are pushed to the model.
+        with QSignalBlocker(spin_box):
+            spin_box.setValue(value)
+
+
     def _set_view_initial_values(self):
+        self.view.autoContrastComboBox.addItems(
+            ["Manual"] + [f"{percent:g}%" for percent in AUTO_CONTRAST])
+        self.view.channelWidget.setVisible(self.model.channel_count.value > 1)
+        self.view.colormapComboBox.addItems(self.model.colormaps)
+        self.view.colormapComboBox.setThumbnailCache(
+            self.model.colormap_thumbnails)
+        self._set_view_values()
+
+
+    def _set_view_values(self):
+        self.view.autoContrastComboBox.setCurrentIndex(
+            AUTO_CONTRAST.index(self.model.auto_contrast.value) + 1
+            if self.model.auto_contrast.value is not None else 0)
         self.view.axesColorColorButton.setColor(self.model.axes_color.value)
         self.view.axesLabelsColorColorButton.setColor(self.model.axes_labels_color.value)
         self.view.backgroundColorColorButton.setColor(self.model.background_color.value)
         self.view.centerLinesColorColorButton.setColor(self.model.center_lines_color.value)
-        self.view.colormapComboBox.addItems(self.model.colormaps)
         self.view.colormapComboBox.setCurrentIndex(self.model.colormaps.index(self.model.colormap.value))
         self.view.dpiSpinBox.setValue(self.model.dpi.value)
         self.view.frameColorColorButton.setColor(self.model.frame_color.value)
+        self.view.histogramWidget.setVMax(self.model.v_max.value)
+        self.view.histogramWidget.setVMin(self.model.v_min.value)
         self.view.inputFileLineEdit.setText(self.model.input_file.value)
         self.view.isBackgroundTransparentCheckBox.setChecked(self.model.is_background_transparent.value)
         self.view.isCenterLinesDisplayedCheckBox.setChecked(self.model.is_center_lines_displayed.value)
+        self.view.isInputFileWatchedCheckBox.setChecked(self.model.is_input_file_watched.value)
+        self.view.isRawExportCheckBox.setChecked(self.model.is_raw_export.value)
         self.view.isShowFrameCheckBox.setChecked(self.model.is_show_frame.value)
-        self.view.plotWidget.setAxesColor(self.model.axes_color.value)
-        self.view.plotWidget.setAxesLabelsColor(self.model.axes_labels_color.value)
-        self.view.plotWidget.setBackgroundColor(self.model.background_color.value)
-        self.view.plotWidget.setCenterLinesColor(self.model.center_lines_color.value)
-        self.view.plotWidget.setColormap(self.model.colormap.value)
-        self.view.plotWidget.setFrameColor(self.model.frame_color.value)
-        self.view.plotWidget.setIsBackgroundTransparent(self.model.is_background_transparent.value)
-        self.view.plotWidget.setIsCenterLinesDisplayed(self.model.is_center_lines_displayed.value)
-        self.view.plotWidget.setIsShowFrame(self.model.is_show_frame.value)
-        self.view.plotWidget.setTicksColor(self.model.ticks_color.value)
-        self.view.plotWidget.setTitle(self.model.title.value)
-        self.view.plotWidget.setTitleColor(self.model.title_color.value)
-        self.view.plotWidget.setVMax(self.model.v_max.value)
-        self.view.plotWidget.setVMin(self.model.v_min.value)
-        self.view.plotWidget.setXAxisName(self.model.x_axis_name.value)
-        self.view.plotWidget.setYAxisName(self.model.y_axis_name.value)
         self.view.ticksColorColorButton.setColor(self.model.ticks_color.value)
         self.view.titleColorColorButton.setColor(self.model.title_color.value)
         self.view.titleLineEdit.setText(self.model.title.value)
-        self.view.vMaxDoubleSpinBox.setValue(self.model.v_max.value)
-        self.view.vMinDoubleSpinBox.setValue(self.model.v_min.value)
+        self._set_spin_box_value(self.view.vMaxDoubleSpinBox, self.model.v_max.value)
+        self._set_spin_box_value(self.view.vMinDoubleSpinBox, self.model.v_min.value)
         self.view.xAxisNameLineEdit.setText(self.model.x_axis_name.value)
-        self.view.yAxisNameLineEdit.setText(self.model.y_axis_name.value)
\ No newline at end of file
+        self.view.yAxisNameLineEdit.setText(self.model.y_axis_name.value)
+
+
+    def _update_watcher(self):
+        file_path = self.model.input_file.value
+        if not self.model.is_input_file_watched.value or not file_path:
+            self._watcher.stop()
+        elif self._watcher.file_path != file_path:
+            self._watcher.start(file_path)
+
+
+    def _update_timings(self):
+        plot_widget = self.view.plotWidget
+        text = instrumentation.summary(SUMMARY_TIMERS)
+        if plot_widget and plot_widget.redraws:
+            text += (f"{', ' if text else ''}redraws {plot_widget.redraws} "
+                     f"({plot_widget.redraws_avoided} merged)")
+        if text != self.view.timingsLabel.text():
+            self.view.timingsLabel.setText(text)
+            self.view.timingsLabel.setToolTip("\n".join(
+                f"{name}: {stat.count} x, last {stat.last * 1000:.1f} ms, "
+                f"max {stat.max * 1000:.1f} ms, total {stat.total:.3f} s"
+                for name, stat in sorted(instrumentation.stats().items())))
@@ -0,0 +1,153 @@
+"""
+ProfileWidget View is a view class for the side panel with radial or
+azimuthal profile (mean and median) of the data disk, see
+`gleipnir/core/profiles.py`.
+
+Profile is computed and drawn on a redraw timer like the plot (several data
+changes, e.g. scrolling through velocity channels, are merged into one
+redraw). The widget is created only when the panel is opened (see
+`MainWindowView.createProfileWidget`), Matplotlib is already imported by the
+plot widget then.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+from PyQt6.QtCore import pyqtSignal as Signal
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QPalette
+from PyQt6.QtWidgets import QComboBox
+from PyQt6.QtWidgets import QHBoxLayout
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtWidgets import QPushButton
+from PyQt6.QtWidgets import QSpinBox
+from PyQt6.QtWidgets import QVBoxLayout
+from PyQt6.QtWidgets import QWidget
+
+import gleipnir.core.profiles as profiles
+
+
+# Profile kinds of the kind combo box: name, kind.
+KINDS = {"Radial": profiles.RADIAL, "Azimuthal": profiles.AZIMUTHAL}
+
+# Units of the profile axis by kind (radius is in units of the grid).
+AXIS_NAMES = {profiles.AZIMUTHAL: "Angle, deg", profiles.RADIAL: "Radius"}
+
+FIGSIZE = (4, 3)
+MAX_BINS = 1000
+
+
+class ProfileWidget(QWidget):
+    exportRequested = Signal()
+
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.profile = None
+        self._data = None
+
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setSingleShot(True)
+        self._redraw_timer.setInterval(0)
+        self._redraw_timer.timeout.connect(self._redraw)
+
+        self.profileKindComboBox = QComboBox(self)
+        self.profileKindComboBox.setObjectName("profileKindComboBox")
+        self.profileKindComboBox.addItems(KINDS)
+        self.profileKindComboBox.currentIndexChanged.connect(
+            self._on_kind_changed)
+        self.profileBinsLabel = QLabel("Bins", self)
+        self.profileBinsLabel.setObjectName("profileBinsLabel")
+        self.profileBinsSpinBox = QSpinBox(self)
+        self.profileBinsSpinBox.setObjectName("profileBinsSpinBox")
+        self.profileBinsSpinBox.setRange(1, MAX_BINS)
+        self.profileBinsSpinBox.setValue(profiles.DEFAULT_BINS[self.kind])
+        self.profileBinsSpinBox.valueChanged.connect(self.scheduleRedraw)
+        self.profileExportPushButton = QPushButton("Export...", self)
+        self.profileExportPushButton.setObjectName("profileExportPushButton")
+        self.profileExportPushButton.setToolTip("Save profile as CSV or NPY")
+        self.profileExportPushButton.setEnabled(False)
+        self.profileExportPushButton.clicked.connect(self.exportRequested)
+
+        self.figure = Figure(figsize=FIGSIZE, layout="constrained")
+        self.ax = self.figure.add_subplot()
+        self.canvas = FigureCanvas(self.figure)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.profileKindComboBox)
+        controls.addWidget(self.profileBinsLabel)
+        controls.addWidget(self.profileBinsSpinBox)
+        controls.addStretch()
+        controls.addWidget(self.profileExportPushButton)
+        layout = QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(self.canvas)
+
+
+    @property
+    def kind(self):
+        return KINDS[self.profileKindComboBox.currentText()]
+
+
+    def scheduleRedraw(self):
+        self._redraw_timer.start()
+
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.scheduleRedraw()
+
+
+    def setData(self, data):
+        if self._data is not data:
+            self._data = data
+            self.scheduleRedraw()
+
+
+    def _draw_profile(self):
+        palette = self.palette()
+        background = palette.color(QPalette.ColorRole.Window).name()
+        foreground = palette.color(QPalette.ColorRole.WindowText).name()
+        highlight = palette.color(QPalette.ColorRole.Highlight).name()
+
+        self.figure.set_facecolor(background)
+        self.ax.clear()
+        self.ax.set_facecolor(background)
+        self.ax.tick_params(colors=foreground)
+        for spine in self.ax.spines.values():
+            spine.set_color(foreground)
+        self.ax.set_xlabel(AXIS_NAMES[self.profile.kind], color=foreground)
+        if self.profile.count.any():
+            centers = self.profile.centers
+            self.ax.plot(centers, self.profile.mean, color=highlight,
+                         label="Mean")
+            self.ax.plot(centers, self.profile.median, color=foreground,
+                         linestyle="--", label="Median")
+            legend = self.ax.legend(facecolor=background,
+                                    edgecolor=foreground, labelcolor=foreground)
+            legend.set_draggable(True)
+        self.canvas.draw_idle()
+
+
+    def _on_kind_changed(self):
+        self.profileBinsSpinBox.blockSignals(True)
+        self.profileBinsSpinBox.setValue(profiles.DEFAULT_BINS[self.kind])
+        self.profileBinsSpinBox.blockSignals(False)
+        self.scheduleRedraw()
+
+
+    def _redraw(self):
+        if not self.isVisible():
+            return
+        if self._data:
+            self.profile = profiles.profile(self._data, self.kind,
+                                            self.profileBinsSpinBox.value())
+            self._draw_profile()
+        else:
+            self.profile = None
+            self.ax.clear()
+            self.canvas.draw_idle()
+        self.profileExportPushButton.setEnabled(self.profile is not None)
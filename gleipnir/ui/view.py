@@ -2,23 +2,114 @@
 MainWindowView View is a view class for application main window.
 It loads and shows form designed in Qt Designer.
 
+Form is created from the compiled module main_ui.py if it's up to date (see
+`gleipnir/ui/compile_ui.py`) or loaded from main.ui. Plot widget imports
+Matplotlib, that takes most of startup time, so the form has a placeholder
+instead of it and `createPlotWidget` is called after the window is painted
+(`painted` signal). Panel of profiles is created when it's opened for the
+first time (`createProfileWidget`).
+
 Author: Artem Shepelin
 License: GPLv3
 """
 
 import os
 
-from PyQt6 import uic
+from PyQt6.QtCore import pyqtSignal as Signal
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QDockWidget
+from PyQt6.QtWidgets import QLabel
 from PyQt6.QtWidgets import QMainWindow
+from PyQt6.QtWidgets import QProgressBar
+
+import gleipnir.ui.compile_ui as compile_ui
 
 
 class MainWindowView(QMainWindow):
+    painted = Signal() # the first paint of the window
+    plotWidgetCreated = Signal()
+
+
     def __init__(self):
         super().__init__()
-        uic.loadUi(os.path.join(os.path.dirname(__file__), "main.ui"), self)
+        self.plotWidget = None
+        self.profileDockWidget = None
+        self.profileWidget = None
+        self._is_painted = False
+
+        _setup_form(self)
 
         theme_file = os.path.join(os.path.dirname(__file__), "dark_theme.qss")
         if os.path.exists(theme_file):
             self.setStyleSheet(open(theme_file, "r").read())
 
-        self.show()
\ No newline at end of file
+        self.loadingProgressBar = QProgressBar(self.statusbar)
+        self.loadingProgressBar.setRange(0, 1000)
+        self.loadingProgressBar.setMaximumWidth(200)
+        self.loadingProgressBar.hide()
+        self.statusbar.addPermanentWidget(self.loadingProgressBar)
+
+        self.exportProgressBar = QProgressBar(self.statusbar)
+        self.exportProgressBar.setMaximumWidth(200)
+        self.exportProgressBar.hide()
+        self.statusbar.addPermanentWidget(self.exportProgressBar)
+
+        self.timingsLabel = QLabel(self.statusbar)
+        self.statusbar.addPermanentWidget(self.timingsLabel)
+
+        self.show()
+
+
+    def createPlotWidget(self):
+        """
+        Replaces plot widget placeholder with `PlotWidget`.
+        """
+        from gleipnir.ui.plot_widget.view import PlotWidget
+
+        self.plotWidget = PlotWidget()
+        self.plotWidget.setObjectName("plotWidget")
+        self.centralHorizontalLayout.replaceWidget(self.plotWidgetPlaceholder,
+                                                   self.plotWidget)
+        self.plotWidgetPlaceholder.deleteLater()
+        self.plotWidgetPlaceholder = None
+        self.plotWidgetCreated.emit()
+        return self.plotWidget
+
+
+    def createProfileWidget(self):
+        """
+        Creates `ProfileWidget` in a dock widget (the panel of profiles).
+        """
+        from gleipnir.ui.profile_widget.view import ProfileWidget
+
+        self.profileWidget = ProfileWidget()
+        self.profileWidget.setObjectName("profileWidget")
+        self.profileDockWidget = QDockWidget("Profiles", self)
+        self.profileDockWidget.setObjectName("profileDockWidget")
+        self.profileDockWidget.setWidget(self.profileWidget)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea,
+                           self.profileDockWidget)
+        return self.profileWidget
+
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._is_painted:
+            self._is_painted = True
+            self.painted.emit()
+
+
+def _setup_form(window):
+    try:
+        import gleipnir.ui.main_ui as main_ui
+        is_compiled = main_ui.FORM_HASH == compile_ui.form_hash()
+    except (ImportError, AttributeError):
+        is_compiled = False
+    if is_compiled:
+        form = main_ui.Ui_MainWindow()
+        form.setupUi(window)
+        for name, value in vars(form).items():
+            setattr(window, name, value)
+    else:
+        from PyQt6 import uic
+        uic.loadUi(compile_ui.FORM_FILE, window)
@@ -0,0 +1,367 @@
+"""
+Animation is a module for headless rendering of animations of absorption maps
+(`python -m gleipnir animate ...`): frames are velocity channels of a data
+file or a sequence of data files (e.g. simulation time steps).
+
+Frames are rendered by a pool of worker processes, every worker reuses one
+plotter (see `gleipnir/utils/render.py`). Frames are streamed in order into
+a writer:
+    *.gif - animated GIF (Pillow), frames are encoded one by one;
+    *.png - PNG sequence, file name must contain frame number format, e.g.
+    "frames/frame_%04d.png" (PNG files are written by workers);
+    other extensions (*.mp4, *.webm, *.mkv, ...) - video encoded by ffmpeg
+    (must be installed), frames are written to its standard input.
+Only a few frames per worker are in flight at a time, so memory doesn't
+depend on the number of frames.
+
+Data files aren't stored in the binary cache unless `--cache` is given. A
+single file with velocity channels is read by every worker, so it's parsed
+once into a temporary cache (removed after rendering) and workers map it.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+from PIL import GifImagePlugin
+from PIL import Image
+
+import gleipnir.core.cache as cache
+import gleipnir.core.parser as parser
+from gleipnir.core.plotter import Plotter
+from gleipnir.core.style import load_style
+import gleipnir.utils.render as render
+
+
+DEFAULT_FPS = 10
+
+# Number of frames in flight per worker.
+FRAMES_PER_WORKER = 2
+
+# GIF frames are streamed with Pillow's legacy encoder helpers (a header and
+# a single frame), they're checked because they aren't part of the public API.
+GIF_STREAMING = all(hasattr(GifImagePlugin, name)
+                    for name in ("getdata", "getheader"))
+
+# Plotter of the worker process (see `_init_worker`).
+_data_cache = None # `DataCache` of data files or None to parse them
+_plotter = None
+_style = None
+_data = (None, None) # the last read file path and its data
+_workers = None # parser threads (1 in pool workers, see `render._workers`)
+
+
+class FfmpegWriter:
+    def __init__(self, file_path, fps):
+        self._ffmpeg = shutil.which("ffmpeg")
+        if self._ffmpeg is None:
+            raise RuntimeError("ffmpeg is not found, it's required for "
+                               f"{os.path.splitext(file_path)[1]} files "
+                               "(use *.gif or *.png instead)")
+        self._file_path = file_path
+        self._fps = fps
+        self._process = None
+
+
+    def close(self):
+        if self._process is None:
+            return
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(
+                f"ffmpeg failed with exit code {self._process.returncode}")
+
+
+    def write(self, frame):
+        if self._process is None: # frame size is known from the first frame
+            height, width = frame.shape[:2]
+            self._process = subprocess.Popen(
+                [self._ffmpeg, "-y", "-loglevel", "error",
+                 "-f", "rawvideo", "-pix_fmt", "rgba",
+                 "-s", f"{width}x{height}", "-r", str(self._fps), "-i", "-",
+                 "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p",
+                 self._file_path],
+                stdin=subprocess.PIPE)
+        self._process.stdin.write(frame.tobytes())
+
+
+class GifWriter:
+    """
+    Frames are encoded into the file one by one (see `GIF_STREAMING`), without
+    the helpers they're kept and saved with `Image.save` on close. The file
+    is removed if no frame was written (an empty GIF isn't valid).
+    """
+    def __init__(self, file_path, fps):
+        self._duration = round(1000 / fps)
+        self._file_path = file_path
+        self._file = open(file_path, "wb")
+        self._frame_count = 0
+        self._frames = [] # frames to save on close without streaming
+
+
+    def close(self):
+        if self._frames:
+            self._frames[0].save(
+                self._file, "GIF", save_all=True,
+                append_images=self._frames[1:], loop=0,
+                duration=self._duration)
+            self._frames = []
+        elif self._frame_count:
+            self._file.write(b";") # GIF trailer
+        self._file.close()
+        if not self._frame_count:
+            os.remove(self._file_path)
+
+
+    def write(self, frame):
+        image = Image.fromarray(frame).convert("RGB").quantize(256)
+        self._frame_count += 1
+        if not GIF_STREAMING:
+            self._frames.append(image)
+            return
+        if self._frame_count == 1:
+            header, _ = GifImagePlugin.getheader(
+                image, info={"loop": 0, "duration": self._duration})
+            self._file.write(b"".join(header))
+        # every frame has its own (local) palette
+        self._file.write(b"".join(GifImagePlugin.getdata(
+            image, duration=self._duration, include_color_table=True)))
+
+
+class PngSequenceWriter:
+    """
+    Frames are written by workers, the writer only creates the directory.
+    """
+    def __init__(self, file_path, fps):
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+
+    def close(self):
+        pass
+
+
+    def write(self, frame):
+        pass
+
+
+def frame_path(file_path, index):
+    """
+    Returns path of the frame `index` for PNG sequence `file_path` (or None
+    if the output isn't a PNG sequence).
+    """
+    if os.path.splitext(file_path)[1].lower() != ".png":
+        return None
+    return file_path % index
+
+
+def frames_of(files, channel=None, data_cache=None):
+    """
+    Returns list of frames (file path, channel index or None) with velocity
+    channels of a single data file or `channel` of every file of a sequence.
+    A single file is read through `data_cache` (if specified).
+    """
+    if len(files) == 1 and channel is None:
+        data = _read_file(files[0], data_cache)
+        if data.channels is not None:
+            return [(files[0], index) for index in range(len(data.channels))]
+    return [(file_path, channel) for file_path in files]
+
+
+def open_writer(file_path, fps):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".gif":
+        return GifWriter(file_path, fps)
+    if ext == ".png":
+        return PngSequenceWriter(file_path, fps)
+    return FfmpegWriter(file_path, fps)
+
+
+def ordered_map(executor, function, items, window):
+    """
+    Like `executor.map`, but only `window` items are submitted ahead of the
+    consumer, so results don't pile up in memory.
+    """
+    pending = collections.deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def render_animation(frames, file_path, style, fps=DEFAULT_FPS, title=None,
+                     jobs=None, data_cache=None):
+    """
+    Renders `frames` (see `frames_of`) into animation `file_path` with `jobs`
+    worker processes (CPU count by default, 1 renders in the current
+    process), data files are read through `data_cache` (if specified).
+    Yields indices of written frames.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(frames)))
+    tasks = [(file_path_, channel, title, frame_path(file_path, index))
+             for index, (file_path_, channel) in enumerate(frames)]
+
+    writer = open_writer(file_path, fps)
+    try:
+        if jobs == 1:
+            _init_worker(style, data_cache)
+            results = map(_render_frame, tasks)
+            yield from _write_frames(writer, results)
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                    jobs, initializer=_init_worker,
+                    initargs=(style, data_cache, 1)) as executor:
+                results = ordered_map(executor, _render_frame, tasks,
+                                      jobs * FRAMES_PER_WORKER)
+                yield from _write_frames(writer, results)
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="gleipnir animate",
+        description="Render animation of velocity channels of a data file or "
+                    "of a sequence of data files without GUI.")
+    parser.add_argument("inputs", nargs="+",
+                        help="data files, glob patterns or directories "
+                             "(frames are sorted by file name)")
+    parser.add_argument("-o", "--output", required=True,
+                        help="animation file: *.gif, *.png sequence (e.g. "
+                             "frames/frame_%%04d.png) or video (*.mp4, "
+                             "*.webm, ..., requires ffmpeg)")
+    parser.add_argument("--cache", action="store_true",
+                        help="read data files through the binary cache "
+                             "(faster repeated renders of the same files)")
+    parser.add_argument("-c", "--channel", type=int,
+                        help="velocity channel of every file (default: all "
+                             "channels of a single file)")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS,
+                        help=f"frames per second (default: {DEFAULT_FPS})")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="search directories and ** patterns recursively")
+    parser.add_argument("-s", "--style", help="style config (JSON file)")
+    parser.add_argument("-t", "--title",
+                        help="title template, {name}, {channel} and "
+                             "{velocity} are replaced with the data file "
+                             "name, channel index and velocity "
+                             "(default: style title)")
+    args = parser.parse_args(argv)
+
+    try:
+        style = load_style(args.style)
+    except (OSError, ValueError) as e:
+        parser.error(f"can't load style {args.style}: {e}")
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("number of jobs must be positive")
+    if args.fps <= 0:
+        parser.error("fps must be positive")
+    if (os.path.splitext(args.output)[1].lower() == ".png"
+            and "%" not in args.output):
+        parser.error("PNG sequence file name must contain frame number "
+                     "format, e.g. frame_%04d.png")
+    files = sorted(render.find_files(args.inputs, args.recursive))
+    if not files:
+        parser.error("no data files found")
+
+    try:
+        with contextlib.ExitStack() as stack:
+            if args.cache:
+                data_cache = cache.default_cache()
+            elif len(files) == 1 and args.channel is None:
+                # channels are read by every worker from a temporary cache
+                data_cache = cache.DataCache(
+                    stack.enter_context(tempfile.TemporaryDirectory(
+                        prefix="gleipnir-")), max_size=float("inf"))
+            else:
+                data_cache = None
+            frames = frames_of(files, args.channel, data_cache)
+            for index in render_animation(frames, args.output, style,
+                                          args.fps, args.title, args.jobs,
+                                          data_cache):
+                print(f"\r{index + 1}/{len(frames)} frames", end="",
+                      file=sys.stderr, flush=True)
+    except Exception as e:
+        print(f"\nerror: {e}", file=sys.stderr)
+        return 1
+    print(f"\n{args.output}", file=sys.stderr)
+    return 0
+
+
+def _init_worker(style, data_cache=None, workers=None):
+    global _data_cache, _plotter, _style, _workers
+    _data_cache = data_cache
+    _plotter = Plotter.offscreen(style)
+    _style = style
+    _workers = workers
+
+
+def _read(file_path):
+    """
+    Returns data of `file_path`, the last file is kept (frames of the same
+    file are usually rendered by the same worker one after another).
+    """
+    global _data
+    if _data[0] != file_path:
+        _data = (file_path, _read_file(file_path, _data_cache, _workers))
+    return _data[1]
+
+
+def _read_file(file_path, data_cache, workers=None):
+    if data_cache is None:
+        return parser.read_absorp_plot(file_path, workers=workers)
+    return data_cache.read(file_path, workers=workers)
+
+
+def _render_frame(task):
+    file_path, channel, title, out_path = task
+    data = _read(file_path)
+    velocity = data.V1
+    if channel is not None:
+        if data.channels is None:
+            if channel != 0:
+                raise ValueError(f"{file_path} has no velocity channels")
+        elif not 0 <= channel < len(data.channels):
+            raise ValueError(f"{file_path} has no channel {channel}")
+        else:
+            data = data.with_abs_plot(data.channels[channel])
+        velocity += channel * data.dV
+    if title is not None:
+        _plotter.set_title(render.format_title(
+            title, file_path, channel=channel or 0, velocity=f"{velocity:g}"))
+    _plotter.set_data(data)
+    if out_path:
+        _plotter.save(out_path, _style["dpi"],
+                      _style["is_background_transparent"])
+        return None
+    canvas = _plotter.figure.canvas
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def _write_frames(writer, results):
+    for index, frame in enumerate(results):
+        if frame is not None:
+            writer.write(frame)
+        yield index
@@ -0,0 +1,193 @@
+"""
+Instrumentation is a module with named timers and counters of the application
+stages (file reading, parsing, drawing, export), so it's possible to tell
+which stage of a slow action takes the time.
+
+Timers are used as context managers or decorators:
+    with instrumentation.timer("parse"):
+        ...
+    @instrumentation.timed("plot.image")
+    def _draw_image(self): ...
+Durations of repeated parts (e.g. chunks of a file) are added with
+`add_time`, counters are incremented with `count`. `stats` returns count,
+total, last and max duration of every timer, `summary` formats the last
+durations (it's shown in the status bar of the main window).
+
+Timers are thread-safe and cheap (a couple of `perf_counter` calls), so they
+are always enabled. Optionally (`configure` or environment variables):
+    GLEIPNIR_TRACE=trace.jsonl - every finished timer is appended to the file
+    as a JSON line (name, parent timer, start, duration, thread and process);
+    GLEIPNIR_PROFILE=<timer name> - the first action of the timer is run under
+    cProfile, statistics are saved to "gleipnir-<timer name>.prof" (it can be
+    viewed with `python -m pstats` or snakeviz) and the top functions are
+    printed to stderr.
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+
+
+PROFILE_TOP = 25
+
+_lock = threading.Lock()
+_local = threading.local() # stack of the running timers of a thread
+_profile = None # timer name to profile
+_stats = {} # name: Stat
+_trace = None # trace file
+
+
+class Stat:
+    __slots__ = ("count", "last", "max", "total")
+
+
+    def __init__(self):
+        self.count = 0
+        self.last = 0.0
+        self.max = 0.0
+        self.total = 0.0
+
+
+    def __repr__(self):
+        return (f"Stat(count={self.count}, last={self.last:.6f}, "
+                f"max={self.max:.6f}, total={self.total:.6f})")
+
+
+    def add(self, seconds):
+        self.count += 1
+        self.last = seconds
+        self.max = max(self.max, seconds)
+        self.total += seconds
+
+
+def add_time(name, seconds):
+    """
+    Adds `seconds` to timer `name` (without trace record).
+    """
+    with _lock:
+        _stats.setdefault(name, Stat()).add(seconds)
+
+
+def configure(trace=None, profile=None):
+    """
+    Enables trace of timers to JSON lines file `trace` and profiling of the
+    first action of timer `profile` (None disables them).
+    """
+    global _profile, _trace
+    with _lock:
+        if _trace is not None:
+            _trace.close()
+        _trace = open(trace, "a", buffering=1) if trace else None
+        _profile = profile or None
+
+
+def count(name, value=1):
+    """
+    Increments counter `name` (a timer without durations).
+    """
+    with _lock:
+        stat = _stats.setdefault(name, Stat())
+        stat.count += value
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def stats():
+    """
+    Returns dict of copies of timer stats by their names.
+    """
+    with _lock:
+        copies = {}
+        for name, stat in _stats.items():
+            copies[name] = Stat()
+            for attribute in Stat.__slots__:
+                setattr(copies[name], attribute, getattr(stat, attribute))
+        return copies
+
+
+def summary(names):
+    """
+    Returns summary of the last durations of timers `names` (dict of labels
+    by timer names), e.g. "parse 40 ms, draw 80 ms".
+    """
+    with _lock:
+        return ", ".join(f"{label} {_stats[name].last * 1000:.0f} ms"
+                         for name, label in names.items()
+                         if name in _stats and _stats[name].total)
+
+
+def timed(name):
+    """
+    Decorator that runs the function inside `timer(name)`.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def timer(name):
+    """
+    Context manager that measures duration of the block as timer `name`.
+    """
+    global _profile
+    stack = _local.__dict__.setdefault("stack", [])
+    profiler = None
+    if _profile == name:
+        with _lock:
+            if _profile == name:
+                _profile = None
+                profiler = cProfile.Profile()
+    stack.append(name)
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        duration = time.perf_counter() - start
+        stack.pop()
+        with _lock:
+            _stats.setdefault(name, Stat()).add(duration)
+            if _trace is not None:
+                _trace.write(json.dumps({
+                    "name": name,
+                    "parent": stack[-1] if stack else None,
+                    "start": time.time() - duration,
+                    "duration": duration,
+                    "thread": threading.current_thread().name,
+                    "pid": os.getpid()}) + "\n")
+        if profiler:
+            _save_profile(profiler, name)
+
+
+def _save_profile(profiler, name):
+    file_path = f"gleipnir-{name}.prof"
+    profiler.dump_stats(file_path)
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats(
+        "cumulative").print_stats(PROFILE_TOP)
+    print(f"Profile of {name!r} is saved to {file_path}\n{output.getvalue()}",
+          file=sys.stderr)
+
+
+configure(os.environ.get("GLEIPNIR_TRACE"), os.environ.get("GLEIPNIR_PROFILE"))
@@ -1,6 +1,10 @@
 """
 Property is a helper class for data binding ability, very useful for Model data.
 
+Emission of `changed` can be deferred (see `Model.batch`): between `defer` and
+`commit` calls values are stored silently, and `commit` reports whether the
+final value differs from the value before deferring.
+
 Author: Artem Shepelin
 License: GPLv3
 """
@@ -16,6 +20,8 @@ class Property(QObject):
     def __init__(self, value):
         super().__init__()
 
+        self._deferred = False
+        self._initial_value = None
         self._value = value
 
 
@@ -24,6 +30,37 @@ class Property(QObject):
         return self._value
 
 
+    def commit(self):
+        """
+        Stops deferring, returns True if the value is changed (`changed` isn't
+        emitted, it's up to the caller).
+        """
+        self._deferred = False
+        is_changed = _is_changed(self._initial_value, self._value)
+        self._initial_value = None
+        return is_changed
+
+
+    def defer(self):
+        if not self._deferred:
+            self._deferred = True
+            self._initial_value = self._value
+
+
+    def emit(self):
+        self.changed.emit(self._value)
+
+
     def setValue(self, value):
         self._value = value
-        self.changed.emit(value)
\ No newline at end of file
+        if not self._deferred:
+            self.changed.emit(value)
+
+
+def _is_changed(value, other):
+    if value is other:
+        return False
+    try:
+        return bool(value != other)
+    except (TypeError, ValueError): # e.g. dicts with arrays
+        return True
@@ -0,0 +1,255 @@
+"""
+Render is a module for headless rendering of data files to images without
+Qt and display (`python -m gleipnir render ...`). It uses the same drawing
+code as the application (`Plotter`) on Agg canvas.
+
+Files are rendered by a pool of worker processes (`--jobs`). Every worker
+creates its plotter (figure, axes, colorbar) once and only swaps image data
+and labels for each file. Results are reported in the order of files.
+With `--raw` only the colormapped image is written at grid resolution, no
+figure is drawn (see `gleipnir/core/raster.py`). Files are parsed without the
+binary cache (every file is read once), `--cache` reads them through it.
+
+Style config is a JSON file with plot style properties (names match `Model`
+properties, see `DEFAULT_STYLE` at `gleipnir/core/style.py`), missing
+properties have default values, e.g.:
+    {"colormap": "ViewerStandard", "v_min": 0.0, "v_max": 0.5, "dpi": 150,
+     "title": "Absorption", "is_show_frame": true}
+
+Author: Artem Shepelin
+License: GPLv3
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import os
+import sys
+
+from gleipnir.core.api import load
+from gleipnir.core.plotter import Plotter
+import gleipnir.core.raster as raster
+from gleipnir.core.style import load_style
+
+
+DATA_FILE_PATTERN = "*.dat"
+
+# Plotter of the worker process (see `_init_worker`), None for raw images.
+_plotter = None
+_style = None
+_use_cache = False
+_workers = None # parser threads, 1 in pool workers (they run in parallel)
+
+
+def find_files(patterns, recursive=False):
+    """
+    Returns list of data files from `patterns` (file paths, glob patterns or
+    directories, directories are searched for `DATA_FILE_PATTERN` files).
+    """
+    files = []
+    seen = set() # the same file can be matched by several patterns
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "**" if recursive else "",
+                                   DATA_FILE_PATTERN)
+            paths = sorted(glob.glob(pattern, recursive=recursive))
+        elif glob.has_magic(pattern):
+            paths = sorted(glob.glob(pattern, recursive=recursive))
+        else:
+            paths = [pattern]
+        for path in paths:
+            key = os.path.normcase(os.path.abspath(path))
+            if key not in seen:
+                seen.add(key)
+                files.append(path)
+    return files
+
+
+def format_title(title, file_path, **fields):
+    """
+    Returns `title` template with "{name}" replaced with the name of data
+    `file_path` and "{<field>}" replaced with `fields` values (other braces
+    are kept as is, e.g. for mathtext).
+    """
+    fields["name"] = os.path.splitext(os.path.basename(file_path))[0]
+    for field, value in fields.items():
+        title = title.replace("{" + field + "}", str(value))
+    return title
+
+
+def output_path(file_path, output_dir=None, image_format="png"):
+    """
+    Returns image path for data `file_path`: the same name with `image_format`
+    extension inside `output_dir` (or next to the data file).
+    """
+    path_head, path_tail = os.path.split(file_path)
+    name, ext = os.path.splitext(path_tail)
+    return os.path.join(output_dir if output_dir else path_head,
+                        name + "." + image_format)
+
+
+def output_paths(files, output_dir=None, image_format="png"):
+    """
+    Returns image paths for data `files` (see `output_path`). Inside
+    `output_dir` subdirectories of the files relative to their common
+    directory are kept (e.g. "run1/AbsorpPlot.dat" and "run2/AbsorpPlot.dat"
+    of `-r` inputs don't overwrite each other).
+    Raises ValueError if several files have the same image path.
+    """
+    directories = [os.path.dirname(os.path.abspath(file_path))
+                   for file_path in files]
+    root = None
+    if output_dir and directories:
+        try:
+            root = os.path.commonpath(directories)
+        except ValueError: # different drives
+            pass
+    paths = []
+    seen = {}
+    for file_path, directory in zip(files, directories):
+        if root:
+            directory = os.path.normpath(os.path.join(
+                output_dir, os.path.relpath(directory, root)))
+        else:
+            directory = output_dir
+        path = output_path(file_path, directory, image_format)
+        key = os.path.normcase(os.path.abspath(path))
+        if key in seen:
+            raise ValueError(f"{seen[key]} and {file_path} have the same "
+                             f"output image {path}")
+        seen[key] = file_path
+        paths.append(path)
+    return paths
+
+
+def render_file(plotter, file_path, out_path, style, title=None,
+                use_cache=False, workers=None):
+    """
+    Renders data `file_path` to `out_path` image with `plotter` (created with
+    `Plotter.offscreen(style)`). `title` template replaces style title, "{name}"
+    is replaced with the data file name. `use_cache` reads the file through
+    the binary cache, `workers` is the number of parser threads.
+    """
+    if title is not None:
+        plotter.set_title(format_title(title, file_path))
+    plotter.set_data(load(file_path, use_cache, workers=workers))
+    plotter.save(out_path, style["dpi"], style["is_background_transparent"])
+
+
+def render_files(files, style, output_dir=None, image_format="png",
+                 title=None, jobs=None, raw=False, use_cache=False):
+    """
+    Renders data `files` with `jobs` worker processes (CPU count by default,
+    1 renders in the current process), `raw` writes raw images instead of
+    figures, `use_cache` reads files through the binary cache. Worker
+    processes parse files in a single thread.
+    Yields (file path, image path, error message or None) in the order of
+    `files`. Image paths are `output_paths`, missing directories are created.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(files)))
+    out_paths = output_paths(files, output_dir, image_format)
+    for directory in set(map(os.path.dirname, out_paths)):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    tasks = [(file_path, out_path, title)
+             for file_path, out_path in zip(files, out_paths)]
+    if jobs == 1:
+        _init_worker(style, raw, use_cache)
+        yield from map(_render_task, tasks)
+        return
+    with concurrent.futures.ProcessPoolExecutor(
+            jobs, initializer=_init_worker,
+            initargs=(style, raw, use_cache, 1)) as executor:
+        yield from executor.map(_render_task, tasks)
+
+
+def render_raw_file(file_path, out_path, style, use_cache=False,
+                    workers=None):
+    """
+    Writes colormapped image of data `file_path` at grid resolution to PNG or
+    TIFF `out_path` (only colormap, v_min and v_max of `style` are used).
+    """
+    raster.write_raster(out_path, load(file_path, use_cache, workers=workers),
+                        style["colormap"], style["v_min"], style["v_max"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="gleipnir render",
+        description="Render data files to images without GUI.")
+    parser.add_argument("inputs", nargs="+",
+                        help="data files, glob patterns or directories")
+    parser.add_argument("-s", "--style", help="style config (JSON file)")
+    parser.add_argument("--cache", action="store_true",
+                        help="read data files through the binary cache "
+                             "(faster repeated renders of the same files)")
+    parser.add_argument("-o", "--output-dir",
+                        help="output directory (default: next to data files)")
+    parser.add_argument("-f", "--format", default="png",
+                        help="image format (default: png)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="search directories and ** patterns recursively")
+    parser.add_argument("--raw", action="store_true",
+                        help="write only the colormapped image at grid "
+                             "resolution (png or tif, without axes, title "
+                             "and colorbar)")
+    parser.add_argument("-t", "--title",
+                        help="title template, {name} is replaced with the "
+                             "data file name (default: style title)")
+    args = parser.parse_args(argv)
+
+    try:
+        style = load_style(args.style)
+    except (OSError, ValueError) as e:
+        parser.error(f"can't load style {args.style}: {e}")
+    files = find_files(args.inputs, args.recursive)
+    if not files:
+        parser.error("no data files found")
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("number of jobs must be positive")
+    if args.raw and args.format.lower() not in raster.FORMATS:
+        parser.error(f"raw image format must be one of "
+                     f"{', '.join(raster.FORMATS)}")
+    try:
+        output_paths(files, args.output_dir, args.format)
+    except ValueError as e:
+        parser.error(str(e))
+
+    failed = 0
+    for file_path, out_path, error in render_files(
+            files, style, args.output_dir, args.format, args.title, args.jobs,
+            args.raw, args.cache):
+        if error:
+            failed += 1
+            print(f"{file_path}: error: {error}", file=sys.stderr)
+        else:
+            print(f"{file_path} -> {out_path}", flush=True)
+
+    print(f"{len(files) - failed} of {len(files)} files rendered",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+def _init_worker(style, raw=False, use_cache=False, workers=None):
+    global _plotter, _style, _use_cache, _workers
+    _plotter = None if raw else Plotter.offscreen(style)
+    _style = style
+    _use_cache = use_cache
+    _workers = workers
+
+
+def _render_task(task):
+    file_path, out_path, title = task
+    try:
+        if _plotter is None:
+            render_raw_file(file_path, out_path, _style, _use_cache, _workers)
+        else:
+            render_file(_plotter, file_path, out_path, _style, title,
+                        _use_cache, _workers)
+    except Exception as e:
+        return file_path, out_path, str(e) or type(e).__name__
+    return file_path, out_path, None
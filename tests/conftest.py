@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from gleipnir.core.dataset import Dataset
+from gleipnir.core.dataset import HEADER
+
+
+def make_header(n, channels=1):
+    values = (n, n, 0.1, 0.2, -3.0, -6.0, -100.0, -100.0 + 10 * (channels - 1),
+              10.0, 90.0, 1.0, 1.0)
+    return dict(zip(HEADER, values))
+
+
+def make_dataset(n=100, seed=0, nan_fraction=0.1):
+    rng = np.random.default_rng(seed)
+    array = rng.random((n + 1, n + 1))
+    array[rng.random(array.shape) < nan_fraction] = np.nan
+    return Dataset(make_header(n), array)
+
+
+def write_data_file(file_path, header, values, fmt):
+    """
+    Writes "AbsorpPlot.dat" file with `values` (all channels in file order)
+    formatted with `fmt` in the layout the simulation writes.
+    """
+    with open(file_path, "wb") as f:
+        for name in HEADER:
+            f.write(f"{name} {header[name]}\n".encode())
+        f.write(b"arrays\nAbsPlot\n")
+        f.write("".join(fmt % value + " " for value in values).encode())
+        f.write(b"\n")
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
@@ -0,0 +1,35 @@
+import numpy as np
+from PIL import Image
+import pytest
+
+import gleipnir.utils.animation as animation
+
+
+COLORS = [(255, 0, 0), (0, 128, 255), (40, 200, 40)]
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_gif_frames(tmp_path, monkeypatch, streaming):
+    if streaming and not animation.GIF_STREAMING:
+        pytest.skip("Pillow has no GIF streaming helpers")
+    monkeypatch.setattr(animation, "GIF_STREAMING", streaming)
+    file_path = str(tmp_path / "a.gif")
+    writer = animation.GifWriter(file_path, 20)
+    for color in COLORS:
+        frame = np.zeros((30, 40, 4), np.uint8)
+        frame[...] = color + (255,)
+        writer.write(frame)
+    writer.close()
+    with Image.open(file_path) as image:
+        assert image.n_frames == len(COLORS)
+        assert image.size == (40, 30)
+        assert image.info["duration"] == 50
+        for index, color in enumerate(COLORS):
+            image.seek(index)
+            assert image.convert("RGB").getpixel((20, 15)) == color
+
+
+def test_gif_without_frames_is_removed(tmp_path):
+    file_path = tmp_path / "a.gif"
+    animation.GifWriter(str(file_path), 10).close()
+    assert not file_path.exists()
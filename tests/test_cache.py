@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+
+from gleipnir.core.cache import DataCache
+import gleipnir.core.parser as parser
+from tests.conftest import make_header
+from tests.conftest import write_data_file
+
+
+def write_file(file_path, value=0.5, n=10):
+    write_data_file(file_path, make_header(n), [value] * (n + 1) ** 2, "%.6f")
+
+
+def set_mtime(file_path, seconds):
+    os.utime(file_path, ns=(seconds * 10**9, seconds * 10**9))
+
+
+def test_read_stores_entry(tmp_path):
+    file_path = tmp_path / "a.dat"
+    write_file(file_path)
+    data_cache = DataCache(tmp_path / "cache")
+    assert data_cache.get(file_path) is None
+    data = data_cache.read(file_path)
+    cached = data_cache.get(file_path)
+    assert isinstance(cached.abs_plot, np.memmap)
+    np.testing.assert_array_equal(cached.abs_plot, data.abs_plot)
+    assert cached.header == data.header
+
+
+def test_changed_file_is_invalidated(tmp_path):
+    file_path = tmp_path / "a.dat"
+    write_file(file_path, 0.5)
+    data_cache = DataCache(tmp_path / "cache")
+    data_cache.read(file_path)
+    write_file(file_path, 0.25) # the same size, new mtime
+    assert data_cache.get(file_path) is None
+    assert data_cache.read(file_path).abs_plot[0, 0] == 0.25
+
+
+def test_hash_detects_content_with_the_same_mtime(tmp_path):
+    file_path = tmp_path / "a.dat"
+    write_file(file_path, 0.5)
+    set_mtime(file_path, 1000)
+    for verify_hash in (False, True):
+        data_cache = DataCache(tmp_path / str(verify_hash),
+                               verify_hash=verify_hash)
+        data_cache.read(file_path)
+    write_file(file_path, 0.25)
+    set_mtime(file_path, 1000)
+    assert DataCache(tmp_path / "False").get(file_path) is not None
+    assert DataCache(tmp_path / "True", verify_hash=True).get(
+        file_path) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    files = [tmp_path / f"{name}.dat" for name in "abc"]
+    directory = tmp_path / "cache"
+    data_cache = DataCache(directory)
+    for seconds, file_path in enumerate(files[:2]):
+        write_file(file_path)
+        data_cache.read(file_path)
+        for name in os.listdir(directory):
+            set_mtime(directory / name, 1000 + seconds)
+    entry_size = sum(os.path.getsize(directory / name)
+                     for name in os.listdir(directory)) // 2
+
+    assert data_cache.get(files[0]) is not None # "a" is used again
+    data_cache.max_size = entry_size * 2
+    write_file(files[2])
+    data_cache.read(files[2])
+    assert data_cache.get(files[1]) is None
+    assert data_cache.get(files[0]) is not None
+    assert data_cache.get(files[2]) is not None
+
+
+def test_clear(tmp_path):
+    file_path = tmp_path / "a.dat"
+    write_file(file_path)
+    data_cache = DataCache(tmp_path / "cache")
+    data_cache.read(file_path)
+    data_cache.clear()
+    assert os.listdir(tmp_path / "cache") == []
+
+
+def test_file_changed_while_parsing_is_not_stored(tmp_path, monkeypatch):
+    file_path = tmp_path / "a.dat"
+    write_file(file_path, 0.5)
+    set_mtime(file_path, 1000)
+    data_cache = DataCache(tmp_path / "cache")
+    read_absorp_plot = parser.read_absorp_plot
+
+    def read_and_change(*args):
+        data = read_absorp_plot(*args)
+        write_file(file_path, 0.25) # the simulation writes the next step
+        return data
+
+    monkeypatch.setattr(parser, "read_absorp_plot", read_and_change)
+    assert data_cache.read(file_path).abs_plot[0, 0] == 0.5
+    assert data_cache.get(file_path) is None
+
+
+def test_failed_write_leaves_no_temporary_files(tmp_path, monkeypatch):
+    file_path = tmp_path / "a.dat"
+    write_file(file_path)
+    data_cache = DataCache(tmp_path / "cache")
+
+    def save(f, array):
+        f.write(b"partial")
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(np, "save", save)
+    data_cache.read(file_path)
+    assert os.listdir(tmp_path / "cache") == []
@@ -0,0 +1,50 @@
+import numpy as np
+
+from gleipnir.core.histogram import Histogram
+
+
+def test_percentiles_of_sample(rng):
+    array = rng.normal(size=(300, 300))
+    array[rng.random(array.shape) < 0.1] = np.nan
+    histogram = Histogram.of(array)
+    bin_width = histogram.edges[1] - histogram.edges[0]
+    assert histogram.total == np.count_nonzero(~np.isnan(array))
+    assert histogram.nan_count == array.size - histogram.total
+    assert not histogram.is_sampled
+    q = [0, 0.5, 1, 25, 50, 75, 99, 99.5, 100]
+    np.testing.assert_allclose(histogram.percentile(q),
+                               np.nanpercentile(array, q), atol=bin_width)
+
+
+def test_limits(rng):
+    array = rng.random((200, 200))
+    histogram = Histogram.of(array)
+    bin_width = histogram.edges[1] - histogram.edges[0]
+    assert histogram.limits(100) == (array.min(), array.max())
+    np.testing.assert_allclose(histogram.limits(99),
+                               np.percentile(array, [0.5, 99.5]),
+                               atol=bin_width)
+
+
+def test_big_arrays_are_sampled(rng):
+    array = rng.random((400, 400))
+    histogram = Histogram.of(array, sample_size=10000)
+    assert histogram.is_sampled
+    assert histogram.total <= 10000
+    np.testing.assert_allclose(histogram.limits(90), (0.05, 0.95), atol=0.02)
+
+
+def test_constant_values():
+    histogram = Histogram.of(np.full((10, 10), 0.3))
+    assert histogram.edges[0] < 0.3 < histogram.edges[-1]
+    low, high = histogram.limits(99)
+    bin_width = histogram.edges[1] - histogram.edges[0]
+    assert abs(low - 0.3) <= bin_width and abs(high - 0.3) <= bin_width
+
+
+def test_all_nan_values():
+    histogram = Histogram.of(np.full((10, 10), np.nan))
+    assert histogram.total == 0
+    assert histogram.nan_count == 100
+    assert np.isnan(histogram.percentile(50))
+    assert all(np.isnan(histogram.limits(99)))
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+import gleipnir.core.parser as parser
+from tests.conftest import make_header
+from tests.conftest import write_data_file
+
+
+def test_aligned_tokens_of_other_widths():
+    # the second "token" of the stride is "0.5 0.25 0.125 0.1"
+    buffer = b"0.1234567890123456 0.5 0.25 0.125 0.1 \n"
+    np.testing.assert_array_equal(
+        parser.parse_floats(buffer),
+        [0.1234567890123456, 0.5, 0.25, 0.125, 0.1])
+
+
+def test_aligned_tokens_of_other_widths_by_chunks(tmp_path, monkeypatch):
+    values = [0.1234567890123456, 0.5, 0.25, 0.125, 0.1, 1.0]
+    file_path = tmp_path / "AbsorpPlot.dat"
+    file_path.write_bytes(
+        b"nR 1\nnZ 2\ndr 1\ndz 1\nr0 0\nz0 0\nV1 0\nV2 0\ndV 0\nIncl 0\n"
+        b"ENA 0\nCoeff 1\narrays\nAbsPlot\n"
+        + b" ".join(repr(value).encode() for value in values) + b" \n")
+    monkeypatch.setattr(parser, "CHUNK_SIZE", 40)
+    data = parser.read_absorp_plot(file_path, workers=1)
+    np.testing.assert_array_equal(
+        data.abs_plot, np.array(values)[::-1].reshape(2, 3).T)
+
+
+def test_header_error_is_decoded(tmp_path):
+    file_path = tmp_path / "AbsorpPlot.dat"
+    file_path.write_bytes(b"garbage\n")
+    with pytest.raises(parser.FormatError, match="got 'garbage'$"):
+        parser.read_absorp_plot(file_path)
+
+
+def legacy_read(file_path):
+    # the reader of the first versions (a single map)
+    f = open(file_path, "r")
+    f_list = f.read().split("\n")
+    f.close()
+    nR = int(f_list[0].split(" ")[-1])
+    nZ = int(f_list[1].split(" ")[-1])
+    AbsPlot = np.array([float(i) for i in f_list[-2].split(" ")[:-1]])
+    AbsPlot = AbsPlot[::-1].reshape(nR + 1, nZ + 1).T
+    AbsPlot[AbsPlot == 0] = None
+    return AbsPlot
+
+
+def make_values(rng, size, signed=False):
+    values = rng.random(size)
+    values[rng.random(size) < 0.2] = 0 # no absorption
+    if signed:
+        values[rng.random(size) < 0.3] *= -1e3
+    return values
+
+
+@pytest.mark.parametrize("fmt, signed", [
+    ("%.6f", False), # fixed width
+    ("%.17g", False), # different widths, exact conversion of patterns
+    ("%.6e", True), # exponents and signs
+    ("%g", True)]) # mixed patterns
+def test_matches_legacy_reader(tmp_path, rng, fmt, signed):
+    n = 60
+    file_path = tmp_path / "AbsorpPlot.dat"
+    write_data_file(file_path, make_header(n),
+                    make_values(rng, (n + 1) ** 2, signed), fmt)
+    data = parser.read_absorp_plot(file_path)
+    np.testing.assert_array_equal(data.abs_plot, legacy_read(file_path))
+
+
+def test_fixed_width_path(rng):
+    values = rng.random(1000)
+    buffer = "".join("%.6f " % value for value in values).encode()
+    chars = np.frombuffer(buffer, dtype=np.uint8)
+    np.testing.assert_array_equal(parser._parse_fixed_width(chars),
+                                  [float("%.6f" % value) for value in values])
+    buffer = "".join("%.17g " % value for value in values).encode()
+    assert parser._parse_fixed_width(
+        np.frombuffer(buffer, dtype=np.uint8)) is None
+
+
+@pytest.mark.parametrize("fmt", ["%.6f", "%.17g"])
+def test_chunks_match_legacy_reader(tmp_path, rng, monkeypatch, fmt):
+    n = 60
+    file_path = tmp_path / "AbsorpPlot.dat"
+    write_data_file(file_path, make_header(n),
+                    make_values(rng, (n + 1) ** 2), fmt)
+    monkeypatch.setattr(parser, "CHUNK_SIZE", 1000)
+    data = parser.read_absorp_plot(file_path, workers=1)
+    np.testing.assert_array_equal(data.abs_plot, legacy_read(file_path))
+
+
+@pytest.mark.parametrize("fmt", ["%.6f", "%.17g"])
+def test_parallel_matches_legacy_reader(tmp_path, rng, monkeypatch, fmt):
+    n = 60
+    file_path = tmp_path / "AbsorpPlot.dat"
+    write_data_file(file_path, make_header(n),
+                    make_values(rng, (n + 1) ** 2), fmt)
+    monkeypatch.setattr(parser, "CHUNK_SIZE", 1000)
+    monkeypatch.setattr(parser, "PARALLEL_MIN_SIZE", 0)
+    data = parser.read_absorp_plot(file_path, workers=4)
+    np.testing.assert_array_equal(data.abs_plot, legacy_read(file_path))
+
+
+def test_channels(tmp_path, rng):
+    n, channels = 20, 3
+    size = (n + 1) ** 2
+    values = make_values(rng, size * channels)
+    file_path = tmp_path / "AbsorpPlot.dat"
+    write_data_file(file_path, make_header(n, channels), values, "%.6f")
+    data = parser.read_absorp_plot(file_path)
+    assert data.channels.shape == (channels, n + 1, n + 1)
+    for channel in range(channels):
+        expected = np.array([float("%.6f" % value) for value
+                             in values[channel * size:(channel + 1) * size]])
+        expected[expected == 0] = np.nan
+        np.testing.assert_array_equal(
+            data.channels[channel],
+            expected[::-1].reshape(n + 1, n + 1).T)
+    np.testing.assert_array_equal(data.abs_plot, data.channels[0])
+
+
+def test_wrong_number_of_values(tmp_path):
+    file_path = tmp_path / "AbsorpPlot.dat"
+    write_data_file(file_path, make_header(2), [0.5] * 8, "%.6f")
+    with pytest.raises(parser.FormatError, match="8 values"):
+        parser.read_absorp_plot(file_path)
+
+
+def test_invalid_value(tmp_path):
+    file_path = tmp_path / "AbsorpPlot.dat"
+    write_data_file(file_path, make_header(2), [0.5] * 9, "%.6f")
+    file_path.write_bytes(file_path.read_bytes().replace(b"0.500000 \n",
+                                                         b"0.5x0000 \n"))
+    with pytest.raises(parser.FormatError, match="0.5x0000"):
+        parser.read_absorp_plot(file_path)
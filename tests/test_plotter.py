@@ -0,0 +1,41 @@
+import gc
+import weakref
+
+import numpy as np
+
+from gleipnir.core.dataset import Dataset
+from gleipnir.core.plotter import Plotter
+
+
+HEADER = {"nR": 99, "nZ": 99, "dr": 1.0, "dz": 1.0, "r0": 0.0, "z0": 0.0,
+          "V1": 0.0, "V2": 0.0, "dV": 0.0, "Incl": 0.0, "ENA": 0.0,
+          "Coeff": 1.0}
+
+
+def make_data(seed):
+    return Dataset(HEADER, np.random.default_rng(seed).random((100, 100)))
+
+
+def test_pyramids_of_replaced_data_are_freed():
+    plotter = Plotter.offscreen()
+    plotter.lod = True
+    data = make_data(0)
+    plotter.set_data(data)
+    array = weakref.ref(data.abs_plot)
+    del data
+    plotter.set_data(make_data(1))
+    gc.collect()
+    assert array() is None
+    assert len(plotter._pyramids) == 1
+
+
+def test_pyramids_of_channels_are_kept():
+    plotter = Plotter.offscreen()
+    plotter.lod = True
+    header = dict(HEADER, V2=2.0, dV=1.0)
+    cube = np.random.default_rng(0).random((3, 100, 100))
+    data = Dataset(header, cube[0], cube)
+    channels = [data.with_abs_plot(channel) for channel in cube]
+    for channel in channels:
+        plotter.set_data(channel)
+    assert len(plotter._pyramids) == 3
@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+import pytest
+
+import gleipnir.core.profiles as profiles
+import gleipnir.core.raster as raster
+from tests.conftest import make_dataset
+
+
+def brute_force_profile(data, kind, bins, center):
+    """
+    Returns counts, means and medians of values of the disk pixels by bins
+    computed pixel by pixel.
+    """
+    mask = raster.clip_mask(data)
+    z = data.z[::-1]
+    pixels = [(row, column) for row in range(mask.shape[0])
+              for column in range(mask.shape[1]) if mask[row, column]]
+    if kind == profiles.RADIAL:
+        coordinates = [math.hypot(data.r[column] - center[0],
+                                  z[row] - center[1])
+                       for row, column in pixels]
+        maximum = max(coordinates)
+    else:
+        coordinates = [math.degrees(math.atan2(z[row] - center[1],
+                                               data.r[column] - center[0]))
+                       % 360 for row, column in pixels]
+        maximum = 360
+    values = [[] for _ in range(bins)]
+    for (row, column), coordinate in zip(pixels, coordinates):
+        value = data.abs_plot[row, column]
+        if not math.isnan(value):
+            values[min(int(coordinate / maximum * bins), bins - 1)].append(
+                value)
+    count = np.array([len(bin_values) for bin_values in values])
+    mean = np.array([np.mean(bin_values) if bin_values else np.nan
+                     for bin_values in values])
+    median = np.array([np.median(bin_values) if bin_values else np.nan
+                       for bin_values in values])
+    return count, mean, median
+
+
+@pytest.mark.parametrize("kind, bins", [(profiles.RADIAL, 47),
+                                        (profiles.RADIAL, 10),
+                                        (profiles.AZIMUTHAL, 36),
+                                        (profiles.AZIMUTHAL, 7)])
+def test_matches_brute_force(kind, bins):
+    data = make_dataset()
+    center = profiles.disk_center(data)
+    profile = profiles.profile(data, kind, bins)
+    count, mean, median = brute_force_profile(data, kind, bins, center)
+    np.testing.assert_array_equal(profile.count, count)
+    np.testing.assert_allclose(profile.mean, mean, rtol=1e-12)
+    np.testing.assert_allclose(profile.median, median, rtol=1e-12)
+
+
+def test_other_center():
+    data = make_dataset(seed=1)
+    center = (data.r[40], data.z[60])
+    profile = profiles.profile(data, profiles.AZIMUTHAL, 12, center)
+    count, mean, median = brute_force_profile(data, profiles.AZIMUTHAL, 12,
+                                              center)
+    np.testing.assert_array_equal(profile.count, count)
+    np.testing.assert_allclose(profile.mean, mean, rtol=1e-12)
+    np.testing.assert_allclose(profile.median, median, rtol=1e-12)
+
+
+def test_binning_is_shared_by_maps_of_the_grid():
+    data = make_dataset()
+    other = data.with_abs_plot(data.abs_plot * 2)
+    profile = profiles.profile(data)
+    np.testing.assert_allclose(profiles.profile(other).mean,
+                               profile.mean * 2)
+    assert (profiles._get_binning(data, profiles.RADIAL, 47,
+                                  profiles.disk_center(data))
+            is profiles._get_binning(other, profiles.RADIAL, 47,
+                                     profiles.disk_center(other)))
+
+
+def test_save(tmp_path):
+    profile = profiles.profile(make_dataset(), profiles.AZIMUTHAL)
+    profile.save(tmp_path / "profile.npy")
+    table = np.load(tmp_path / "profile.npy")
+    np.testing.assert_array_equal(table["count"], profile.count)
+    profile.save(tmp_path / "profile.csv")
+    rows = np.genfromtxt(tmp_path / "profile.csv", delimiter=",",
+                         names=True)
+    assert rows.dtype.names == table.dtype.names
+    np.testing.assert_allclose(rows["mean"], profile.mean, rtol=1e-9)
+    with pytest.raises(ValueError):
+        profile.save(tmp_path / "profile.txt")
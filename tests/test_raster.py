@@ -0,0 +1,46 @@
+import matplotlib
+from matplotlib.colors import Normalize
+import numpy as np
+from PIL import Image
+import pytest
+
+import gleipnir.core.colormaps as cmap
+import gleipnir.core.raster as raster
+from tests.conftest import make_dataset
+
+
+@pytest.mark.parametrize("colormap", ["viridis", "gray", "ViewerStandard"])
+def test_colorize_matches_matplotlib(rng, colormap):
+    cmap.add_viewer_standard_colormap()
+    array = rng.uniform(-0.2, 1.2, (50, 60))
+    array[rng.random(array.shape) < 0.1] = np.nan
+    image = raster.colorize(array, colormap, 0.1, 0.9)
+    # colors `imshow` gives to the values (NaN values are transparent)
+    expected = matplotlib.colormaps[colormap](Normalize(0.1, 0.9)(array),
+                                              bytes=True)
+    is_nan = np.isnan(array)
+    assert (image[is_nan] == 0).all()
+    different = (image[~is_nan] != expected[~is_nan]).any(axis=1)
+    # values at the bounds of colors can be rounded to the neighbor color
+    assert different.mean() < 0.001
+    assert (np.abs(image[~is_nan].astype(int)
+                   - expected[~is_nan]).max() <= 3)
+
+
+def test_colorize_mask(rng):
+    array = rng.random((20, 20))
+    mask = rng.random(array.shape) < 0.5
+    image = raster.colorize(array, "viridis", 0, 1, mask)
+    assert (image[~mask] == 0).all()
+    assert (image[mask, 3] == 255).all()
+
+
+def test_write_raster(tmp_path):
+    data = make_dataset()
+    raster.write_raster(tmp_path / "map.png", data, "viridis", 0, 1)
+    image = np.asarray(Image.open(tmp_path / "map.png"))
+    np.testing.assert_array_equal(
+        image, raster.colorize(data.abs_plot, "viridis", 0, 1,
+                               raster.clip_mask(data)))
+    with pytest.raises(ValueError):
+        raster.write_raster(tmp_path / "map.jpg", data, "viridis", 0, 1)
@@ -0,0 +1,61 @@
+import concurrent.futures
+import os
+
+import numpy as np
+import pytest
+
+import gleipnir.core.parser as parser
+from gleipnir.core.style import load_style
+import gleipnir.utils.render as render
+from tests.conftest import make_header
+from tests.conftest import write_data_file
+
+
+def test_output_paths_keep_subdirectories():
+    files = [os.path.join("runs", "1", "AbsorpPlot.dat"),
+             os.path.join("runs", "2", "AbsorpPlot.dat")]
+    assert render.output_paths(files, "out") == [
+        os.path.join("out", "1", "AbsorpPlot.png"),
+        os.path.join("out", "2", "AbsorpPlot.png")]
+
+
+def test_output_paths_of_one_directory():
+    files = [os.path.join("runs", "a.dat"), os.path.join("runs", "b.dat")]
+    assert render.output_paths(files, "out", "tif") == [
+        os.path.join("out", "a.tif"), os.path.join("out", "b.tif")]
+    assert render.output_paths(files) == [os.path.join("runs", "a.png"),
+                                          os.path.join("runs", "b.png")]
+
+
+def test_output_paths_of_the_same_name():
+    with pytest.raises(ValueError, match="the same output image"):
+        render.output_paths(["a.dat", "a.dat"], "out")
+
+
+def test_find_files_skips_duplicates(tmp_path):
+    (tmp_path / "a.dat").touch()
+    (tmp_path / "b.dat").touch()
+    files = render.find_files([str(tmp_path / "a.dat"), str(tmp_path),
+                               os.path.join(str(tmp_path), ".", "b.dat")])
+    assert files == [str(tmp_path / "a.dat"), str(tmp_path / "b.dat")]
+
+
+def test_pool_workers_parse_in_one_thread(tmp_path, monkeypatch):
+    files = []
+    for name in ("a.dat", "b.dat"):
+        file_path = str(tmp_path / name)
+        write_data_file(file_path, make_header(4), np.arange(25) / 25, "%.4f")
+        files.append(file_path)
+    workers = []
+    read_absorp_plot = parser.read_absorp_plot
+    def read(*args, **kwargs):
+        workers.append(kwargs.get("workers"))
+        return read_absorp_plot(*args, **kwargs)
+    monkeypatch.setattr(parser, "read_absorp_plot", read)
+    # threads share the patched parser, initializer and initargs are the same
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor",
+                        concurrent.futures.ThreadPoolExecutor)
+    results = list(render.render_files(files, load_style(None), jobs=2,
+                                       raw=True))
+    assert [error for _, _, error in results] == [None, None]
+    assert workers == [1, 1]